@@ -1,7 +1,38 @@
+import atexit
+import itertools
 import json
 import os
+import queue
 import subprocess
 import sys
+import threading
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+
+import pass_backend
+from listing_snapshot import load_snapshot, save_snapshot, snapshot_path
+from pass_backend import PROTOCOL_VERSION, SERVE_WORKERS
+from pass_store import parse_secret
+from secret_cache import SecretCache
+
+# Where backend commands run: "process" (a `pass_backend.py serve` child, the default) or
+# "inprocess" (the same commands on a thread pool inside the client, without the pipe and JSON).
+BACKEND_MODE = os.environ.get("PASS_KB_BACKEND", "process")
+# Opt-in cache of decrypted secrets: PASS_KB_SECRET_CACHE_TTL seconds (0, the default, disables it)
+# and at most PASS_KB_SECRET_CACHE_SIZE secrets. Entries die early when their .gpg file changes.
+SECRET_CACHE_TTL = float(os.environ.get("PASS_KB_SECRET_CACHE_TTL", "0"))
+SECRET_CACHE_SIZE = int(os.environ.get("PASS_KB_SECRET_CACHE_SIZE", "32"))
+# Opt-in prefetch (PASS_KB_PREFETCH=1): the GUI decrypts the highlighted secret once the selection has
+# rested for PASS_KB_PREFETCH_DELAY ms, with at most PASS_KB_PREFETCH_WORKERS decryptions at a time.
+PREFETCH_ENABLED = os.environ.get("PASS_KB_PREFETCH") == "1"
+PREFETCH_DELAY_MS = int(os.environ.get("PASS_KB_PREFETCH_DELAY", "150"))
+PREFETCH_WORKERS = int(os.environ.get("PASS_KB_PREFETCH_WORKERS", "2"))
+# Opt-in background indexing (PASS_KB_BACKGROUND_INDEX=1, needs the metadata index): the GUI decrypts
+# every secret the index doesn't cover yet, PASS_KB_INDEX_WORKERS at a time, pausing for interactive shows.
+BACKGROUND_INDEX_ENABLED = os.environ.get("PASS_KB_BACKGROUND_INDEX") == "1"
+INDEX_WORKERS = int(os.environ.get("PASS_KB_INDEX_WORKERS", "2"))
+# The GUI saves the names it lists on exit and shows them at the next start while it relists the store
+# (PASS_KB_LISTING_SNAPSHOT=0 disables it). Names only, under $XDG_CACHE_HOME/pass-kb like the listing index.
+LISTING_SNAPSHOT_ENABLED = os.environ.get("PASS_KB_LISTING_SNAPSHOT", "1") != "0"
 
 
 def get_backend_command(command_name):
@@ -10,62 +41,505 @@ def get_backend_command(command_name):
     return [python_executable, backend_script, command_name]
 
 
-def get_list_from_backend():
+class BackendError(Exception):
+    """Raised when the backend answers a request with an error frame."""
+
+
+class BackendProcess:
+    """
+    One warm `pass_backend.py serve` child shared by every backend call.
+    Requests carry an id and are pipelined: any number can be in flight, and a reader thread resolves
+    each Future as its response arrives, in whatever order the backend finishes them. Items of
+    streaming commands are handed to the request's `on_item` callback on the reader thread as they
+    arrive. Read-only requests caught in a child that died are resent once to a fresh child; others
+    fail, since the dead child may already have applied them and the caller has to look at the store.
+    """
+
+    def __init__(self):
+        self._process = None
+        self._lock = threading.Lock()  # Guards the child, the pending table and writes to its stdin
+        self._pending = {}  # request id -> [future, request line, attempts, child it was sent to, on_item, command]
+        self._closed = False  # After close(), requests are refused instead of spawning a new child
+        self._ids = itertools.count(1)
+
+    def _ensure_started(self):
+        if self._process is not None and self._process.poll() is None:
+            return
+        self._process = subprocess.Popen(
+            get_backend_command("serve"),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        threading.Thread(target=self._read_responses, args=(self._process,), daemon=True).start()
+
+    def _send(self, entry):
+        entry[3] = self._process
+        try:
+            self._process.stdin.write(entry[1])
+            self._process.stdin.flush()
+        except OSError:
+            pass  # The reader sees EOF on this child and resends
+
+    def submit(self, command, data=None, on_item=None):
+        """Sends a request without waiting; returns a Future for its result."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise BackendError("Backend was shut down.")
+            request_id = next(self._ids)
+            future.request_id = request_id
+            frame = {"v": PROTOCOL_VERSION, "id": request_id, "command": command, "data": data}
+            entry = [future, json.dumps(frame, separators=(",", ":")) + "\n", 1, None, on_item, command]
+            self._pending[request_id] = entry
+            self._ensure_started()
+            self._send(entry)
+        return future
+
+    def cancel(self, future):
+        """Stops a streaming request (or forgets a pending one); its Future ends up cancelled."""
+        future.cancel()
+        with self._lock:
+            if self._pending.pop(future.request_id, None) is None or self._process is None:
+                return
+            target = {"id": future.request_id}
+            frame = {"v": PROTOCOL_VERSION, "id": next(self._ids), "command": "cancel", "data": target}
+            try:
+                self._process.stdin.write(json.dumps(frame, separators=(",", ":")) + "\n")
+                self._process.stdin.flush()
+            except OSError:
+                pass
+
+    def request(self, command, data=None, timeout=None):
+        """Sends one request and waits for its result, raising BackendError on an error frame."""
+        return self.submit(command, data).result(timeout)
+
+    def _read_responses(self, process):
+        for line in process.stdout:
+            try:
+                response = json.loads(line)
+            except ValueError:
+                continue
+            streaming = response.get("status") == "stream"
+            with self._lock:
+                if streaming:
+                    entry = self._pending.get(response.get("id"))
+                else:
+                    entry = self._pending.pop(response.get("id"), None)
+            if entry is None:
+                continue
+            if streaming:
+                if entry[4] is not None:
+                    for item in response.get("result") or []:
+                        entry[4](item)
+            elif response.get("v") != PROTOCOL_VERSION:
+                _resolve(entry[0], error=BackendError(f"Backend speaks protocol {response.get('v')!r}."))
+            elif response.get("status") == "error":
+                _resolve(entry[0], error=BackendError(response.get("message", "Unknown error")))
+            elif response.get("status") == "cancelled":
+                _resolve(entry[0], error=BackendError("Request was cancelled."))
+            else:
+                _resolve(entry[0], result=response.get("result"))
+        self._on_child_exit(process)
+
+    def _on_child_exit(self, process):
+        process.wait()
+        failed = []
+        with self._lock:
+            orphans = [(rid, entry) for rid, entry in self._pending.items() if entry[3] is process]
+            for request_id, entry in orphans:
+                if entry[2] >= 2 or entry[5] not in pass_backend.READ_ONLY_COMMANDS:
+                    failed.append(self._pending.pop(request_id))
+                    continue
+                entry[2] += 1
+                self._ensure_started()
+                self._send(entry)
+        for entry in failed:
+            _resolve(entry[0], error=BackendError("Backend process exited unexpectedly."))
+
+    def start(self):
+        """Spawns the child ahead of the first request so the first click doesn't pay for it."""
+        with self._lock:
+            if not self._closed:
+                self._ensure_started()
+
+    def close(self):
+        """Stops the child by closing its stdin, which ends the serve loop. Later requests are refused."""
+        with self._lock:
+            self._closed = True
+            process, self._process = self._process, None
+            pending, self._pending = self._pending, {}
+        for entry in pending.values():
+            _resolve(entry[0], error=BackendError("Backend was shut down."))
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+
+
+class InProcessBackend:
+    """
+    Drop-in replacement for BackendProcess that runs the backend's commands on a thread pool of
+    this process, against the PassStore pass_backend builds from the environment. Requests go
+    through the same dispatch as `serve`, so results, errors and streams look exactly the same;
+    they just skip the interpreter start, the pipe and the JSON round trip.
+    """
+
+    def __init__(self):
+        self._pool = None
+        self._lock = threading.Lock()  # Guards the pool and the cancel events
+        self._cancel_events = {}  # request id -> (Event that stops its stream, command)
+        self._ids = itertools.count(1)
+        self._closed = False  # After close(), requests are refused instead of reopening the session
+
+    def _ensure_started(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=SERVE_WORKERS, thread_name_prefix="pass-backend")
+            pass_backend.get_store().open_session()
+
+    def submit(self, command, data=None, on_item=None):
+        """Starts a request without waiting; returns a Future for its result."""
+        future = Future()
+        cancelled = threading.Event()
+        with self._lock:
+            if self._closed:
+                raise BackendError("Backend was shut down.")
+            request_id = next(self._ids)
+            future.request_id = request_id
+            self._cancel_events[request_id] = (cancelled, command)
+            self._ensure_started()
+            request = {"v": PROTOCOL_VERSION, "id": request_id, "command": command, "data": data}
+            self._pool.submit(self._run, request, future, cancelled, on_item)
+        return future
+
+    def _run(self, request, future, cancelled, on_item):
+        def respond(response):
+            if response.get("status") == "stream":
+                if on_item is not None:
+                    for item in response.get("result") or []:
+                        on_item(item)
+            elif response.get("status") == "error":
+                _resolve(future, error=BackendError(response.get("message", "Unknown error")))
+            elif response.get("status") == "cancelled":
+                _resolve(future, error=BackendError("Request was cancelled."))
+            else:
+                _resolve(future, result=response.get("result"))
+
+        try:
+            if not cancelled.is_set():
+                pass_backend.dispatch_request(request, respond, cancelled)
+        finally:
+            with self._lock:
+                self._cancel_events.pop(request["id"], None)
+
+    def cancel(self, future):
+        """Stops a streaming request (or drops a queued one); its Future ends up cancelled."""
+        future.cancel()
+        with self._lock:
+            event, _ = self._cancel_events.get(future.request_id, (None, None))
+        if event is not None:
+            event.set()
+
+    def request(self, command, data=None, timeout=None):
+        """Runs one request and waits for its result, raising BackendError on an error."""
+        return self.submit(command, data).result(timeout)
+
+    def start(self):
+        """Opens the store session (replays journaled commits) ahead of the first request."""
+        with self._lock:
+            if not self._closed:
+                self._ensure_started()
+
+    def close(self):
+        """Stops open-ended streams, waits for running requests and commits deferred saves. Refuses later requests."""
+        with self._lock:
+            self._closed = True
+            pool, self._pool = self._pool, None
+            events = list(self._cancel_events.values())
+        if pool is None:
+            return
+        for event, command in events:
+            if command in pass_backend.OPEN_ENDED_COMMANDS:  # Finite streams run to completion
+                event.set()
+        pool.shutdown(wait=True)
+        pass_backend.get_store().close()
+
+
+def _resolve(future, result=None, error=None):
+    """Completes a Future unless its caller already cancelled it."""
     try:
-        cmd = get_backend_command("list")
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return json.loads(result.stdout)
-    except Exception as e:
-        print(f"Error fetching list from backend: {e}", file=sys.stderr)
-        return None
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
 
 
-def get_secret_from_backend(namespace, resource):
+_backend = InProcessBackend() if BACKEND_MODE == "inprocess" else BackendProcess()
+atexit.register(_backend.close)
+_secret_cache = SecretCache(SECRET_CACHE_TTL, SECRET_CACHE_SIZE) if SECRET_CACHE_TTL > 0 else None
+_prefetch_pool = None
+_interactive_idle = threading.Condition()
+_interactive_shows = 0
+
+
+def start_backend():
+    """
+    Starts the backend (the child, or the in-process session) on a background thread, so the caller
+    isn't held up by it; requests made meanwhile wait for it. Returns a Future for the start.
+    """
+    future = Future()
+
+    def run():
+        try:
+            _backend.start()
+        except Exception as e:
+            print(f"Error starting the backend: {e}", file=sys.stderr)
+            _resolve(future, error=e)
+        else:
+            _resolve(future)
+
+    threading.Thread(target=run, name="backend-start", daemon=True).start()
+    return future
+
+
+def shutdown_backend():
+    if _prefetch_pool is not None:
+        _prefetch_pool.shutdown(wait=False, cancel_futures=True)
+    _backend.close()
+    wipe_secret_cache()
+
+
+def wipe_secret_cache():
+    """Forgets (and overwrites) every cached decrypted secret."""
+    if _secret_cache is not None:
+        _secret_cache.clear()
+
+
+def _secret_stamp(namespace, resource):
+    """What a cached secret is validated against: the stat of its .gpg file, or None if it is gone."""
     try:
-        cmd = get_backend_command("show")
-        input_data = json.dumps({"namespace": namespace, "resource": resource})
-        result = subprocess.run(cmd, input=input_data, capture_output=True, text=True, check=True)
-        return json.loads(result.stdout)
-    except Exception as e:
-        print(f"Error fetching secret from backend: {e}", file=sys.stderr)
+        st = os.stat(pass_backend.get_store().secret_file(namespace, resource))
+    except (OSError, ValueError):
         return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+_STREAM_END = object()
 
 
-def save_secret_to_backend(namespace, resource, content):
+def _iter_stream(command, data=None):
+    """Runs a streaming command and yields its items as they arrive; closing the generator cancels it."""
+    items = queue.Queue()
+    future = _backend.submit(command, data, on_item=items.put)
+    future.add_done_callback(lambda _: items.put(_STREAM_END))
     try:
-        cmd = get_backend_command("create")  # 'create' uses 'pass insert' which handles updates
-        input_data = json.dumps({"namespace": namespace, "resource": resource, "content": content})
-        result = subprocess.run(cmd, input=input_data, capture_output=True, text=True)
+        while True:
+            item = items.get()
+            if item is _STREAM_END:
+                break
+            yield item
+        future.result()  # Raise the stream's error frame, if it ended with one
+    finally:
+        if not future.done():
+            _backend.cancel(future)
 
-        if result.returncode == 0:
-            return {"status": "success"}
-        else:
-            # Try to parse JSON from stderr for a more detailed error message
-            try:
-                error_data = json.loads(result.stderr)
-                return {"status": "error", "message": error_data.get("error", result.stderr)}
-            except json.JSONDecodeError:
-                return {"status": "error", "message": result.stderr or result.stdout}
 
+def show_many_from_backend(items, workers=None):
+    """
+    Decrypts many {"namespace", "resource"} pairs on the backend's worker pool.
+    Yields one result dict per secret as it completes; failed items carry status "error" and a message.
+    """
+    return _iter_stream("show-many", {"items": list(items), "workers": workers})
+
+
+def load_listing_snapshot():
+    """({namespace: [resource, ...]}, {namespace: color}) the GUI listed when it last exited, or None."""
+    if not LISTING_SNAPSHOT_ENABLED:
+        return None
+    store_path = pass_backend.PASSWORD_STORE_PATH
+    return load_snapshot(snapshot_path(store_path, pass_backend.CACHE_DIR), store_path)
+
+
+def save_listing_snapshot(namespace_resources, namespace_colors):
+    if LISTING_SNAPSHOT_ENABLED:
+        store_path = pass_backend.PASSWORD_STORE_PATH
+        path = snapshot_path(store_path, pass_backend.CACHE_DIR)
+        save_snapshot(path, store_path, namespace_resources, namespace_colors)
+
+
+def watch_store_from_backend(on_delta):
+    """
+    Subscribes to listing deltas; `on_delta(dict)` runs on the backend reader thread.
+    Returns a Future that completes only if the watch ends; pass it to stop_watch() to stop watching.
+    """
+    return _backend.submit("watch", on_item=on_delta)
+
+
+def stop_watch(future):
+    _backend.cancel(future)
+
+
+def iter_list_from_backend(rebuild=False):
+    """
+    Streams the listing: yields one {"namespace", "resources"} dict per namespace while the backend
+    is still walking the store. Raises BackendError if the listing fails.
+    """
+    return _iter_stream("list", {"stream": True, "rebuild": rebuild})
+
+
+def get_metadata_from_backend():
+    """{"enabled", "entries": [{"namespace", "resource", "fields"}, ...]} of the backend's metadata index."""
+    try:
+        return _backend.request("metadata")
     except Exception as e:
-        print(f"Error saving secret to backend: {e}", file=sys.stderr)
-        return {"status": "error", "message": str(e)}
+        print(f"Error fetching metadata from backend: {e}", file=sys.stderr)
+        return {"enabled": False, "entries": []}
+
+
+def _begin_interactive_show():
+    global _interactive_shows
+    with _interactive_idle:
+        _interactive_shows += 1
+
+
+def _end_interactive_show():
+    global _interactive_shows
+    with _interactive_idle:
+        _interactive_shows -= 1
+        _interactive_idle.notify_all()
+
+
+def wait_for_interactive_shows(timeout=None):
+    """Blocks while secrets the user asked for are being decrypted; background work calls it between batches."""
+    with _interactive_idle:
+        return _interactive_idle.wait_for(lambda: _interactive_shows == 0, timeout)
+
+
+def get_secret_from_backend(namespace, resource):
+    return load_secret(namespace, resource).result()
+
+
+def load_secret(namespace, resource):
+    """
+    Starts decrypting a secret the user asked for and returns a Future for it: the secret, or None
+    if it couldn't be read. A cached copy resolves it at once. Stop it with cancel_secret_load().
+    """
+    future = Future()
+    stamp = None
+    if _secret_cache is not None:
+        stamp = _secret_stamp(namespace, resource)  # Taken before decrypting: a concurrent write only causes a miss
+        cached = _secret_cache.get((namespace, resource), stamp) if stamp is not None else None
+        if cached is not None:
+            future.set_result(cached)
+            return future
+
+    def finished(request):
+        _end_interactive_show()
+        if request.cancelled():
+            return
+        try:
+            secret = request.result()
+        except Exception as e:
+            print(f"Error fetching secret from backend: {e}", file=sys.stderr)
+            secret = None
+        if stamp is not None and secret:
+            _secret_cache.put((namespace, resource), stamp, secret)
+        _resolve(future, result=secret)
+
+    _begin_interactive_show()  # Before submitting: a quick answer must not end the show before it began
+    try:
+        future.request = _backend.submit("show", {"namespace": namespace, "resource": resource})
+    except BaseException:
+        _end_interactive_show()  # Or background indexing would wait for this show forever
+        raise
+    future.request.add_done_callback(finished)
+    return future
+
+
+def cancel_secret_load(future):
+    """
+    Gives up on a load_secret() Future: it ends up cancelled and the backend's answer is dropped.
+    A gpg process that already started still runs to completion in the backend.
+    """
+    future.cancel()
+    request = getattr(future, "request", None)
+    if request is not None:
+        _backend.cancel(request)
+
+
+def prefetch_secret(namespace, resource):
+    """
+    Starts decrypting a secret in the background, on a pool of PREFETCH_WORKERS threads, and returns
+    a Future. Cancelling it drops the prefetch if it hasn't started; a started one just finishes.
+    Read the result with prefetched_secret().
+    """
+    global _prefetch_pool
+    if _prefetch_pool is None:
+        _prefetch_pool = ThreadPoolExecutor(max_workers=max(1, PREFETCH_WORKERS), thread_name_prefix="prefetch")
+    return _prefetch_pool.submit(_prefetch, namespace, resource)
+
+
+def _prefetch(namespace, resource):
+    stamp = _secret_stamp(namespace, resource)
+    return stamp, get_secret_from_backend(namespace, resource)
+
+
+def prefetched_secret(future, namespace, resource):
+    """
+    The secret a prefetch decrypted, waiting for it if it is still running. None if the prefetch was
+    cancelled or failed, or the .gpg file changed since it was decrypted.
+    """
+    if future.cancelled():
+        return None
+    stamp, secret = future.result()
+    if secret is None or stamp is None or stamp != _secret_stamp(namespace, resource):
+        return None
+    return secret
+
+
+def save_secret(namespace, resource, content):
+    """
+    Starts writing a secret ('create' uses 'pass insert', which handles updates) and returns a Future
+    for {"status": "success"} or {"status": "error", "message": ...}. It never raises.
+    """
+    future = Future()
+    if _secret_cache is not None:
+        _secret_cache.discard((namespace, resource))
+
+    def finished(request):
+        try:
+            request.result()
+        except BackendError as e:
+            _resolve(future, result={"status": "error", "message": str(e)})
+            return
+        except Exception as e:
+            print(f"Error saving secret to backend: {e}", file=sys.stderr)
+            _resolve(future, result={"status": "error", "message": str(e)})
+            return
+        if _secret_cache is not None:
+            # We know what was just encrypted: showing it again needn't decrypt it.
+            stamp = _secret_stamp(namespace, resource)
+            if stamp is not None:
+                _secret_cache.put((namespace, resource), stamp, parse_secret(content))
+        _resolve(future, result={"status": "success"})
+
+    _backend.submit("create", {"namespace": namespace, "resource": resource, "content": content}).add_done_callback(
+        finished
+    )
+    return future
 
 
 def git_push_to_backend():
     """Push local changes to remote git repository."""
     try:
-        cmd = get_backend_command("git-push")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode == 0:
-            return json.loads(result.stdout)
-        else:
-            try:
-                error_data = json.loads(result.stderr)
-                return {"status": "error", "message": error_data.get("message", result.stderr)}
-            except json.JSONDecodeError:
-                return {"status": "error", "message": result.stderr or result.stdout}
+        return _backend.request("git-push")
     except Exception as e:
         print(f"Error pushing to git: {e}", file=sys.stderr)
         return {"status": "error", "message": str(e)}
@@ -74,32 +548,19 @@ def git_push_to_backend():
 def git_pull_from_backend():
     """Pull changes from remote git repository."""
     try:
-        cmd = get_backend_command("git-pull")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode == 0:
-            return json.loads(result.stdout)
-        else:
-            try:
-                error_data = json.loads(result.stderr)
-                return {"status": "error", "message": error_data.get("message", result.stderr)}
-            except json.JSONDecodeError:
-                return {"status": "error", "message": result.stderr or result.stdout}
+        return _backend.request("git-pull")
     except Exception as e:
         print(f"Error pulling from git: {e}", file=sys.stderr)
         return {"status": "error", "message": str(e)}
 
 
-def git_status_from_backend():
-    """Check git status of password store."""
+def git_status_from_backend(fetch="auto"):
+    """
+    Check git status of password store.
+    `fetch` is "auto" (fetch only when the last one is older than PASS_KB_FETCH_INTERVAL), "force" or "never".
+    """
     try:
-        cmd = get_backend_command("git-status")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode == 0:
-            return json.loads(result.stdout)
-        else:
-            return {"status": "success", "has_remote": False, "needs_push": False, "needs_pull": False}
+        return _backend.request("git-status", {"fetch": fetch})
     except Exception as e:
         print(f"Error checking git status: {e}", file=sys.stderr)
         return {"status": "success", "has_remote": False, "needs_push": False, "needs_pull": False}
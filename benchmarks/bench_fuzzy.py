@@ -0,0 +1,85 @@
+"""
+Benchmark: ranking the search list with FuzzyMatcher vs. the previous substring filter, keystroke by keystroke.
+
+    python benchmarks/bench_fuzzy.py --entries 100000
+
+Builds synthetic "[namespace]: resource" entries; every query is typed one character at a time, so
+later keystrokes narrow the previous result like they do in the search bar.
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fuzzy_matcher import FuzzyMatcher  # noqa: E402
+
+QUERIES = ["github", "ml prod", "srvdb", "a"]
+
+
+def substring_filter(texts, needle):
+    """The previous search, kept here as the baseline: case-insensitive substring, list order."""
+    needle = needle.lower()
+    return [text for text in texts if needle in text.lower()]
+
+
+def build_entries(count, seed):
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(5000)]
+    words += ["github", "gitlab", "mail", "prod", "server", "db", "vpn"]
+    namespaces = rng.sample(words, 50)
+    texts = {f"[{rng.choice(namespaces)}]: {rng.choice(words)}/{rng.choice(words)}" for _ in range(count)}
+    return sorted(texts)
+
+
+def keystroke(matcher, texts, typed):
+    """Time of the search for `typed` right after the one for everything typed before it."""
+    matcher.reset(texts)  # Forget the narrowing state of the previous run
+    if len(typed) > 1:
+        matcher.search(typed[:-1])
+    start = time.perf_counter()
+    matcher.search(typed)
+    return time.perf_counter() - start
+
+
+def best_of(runs, func):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    texts = build_entries(args.entries, args.seed)
+    start = time.perf_counter()
+    matcher = FuzzyMatcher(texts)
+    print(f"{len(texts)} entries, keys built in {(time.perf_counter() - start) * 1000:.1f} ms (best of {args.runs})")
+
+    for query in QUERIES:
+        print(f"  {query!r}")
+        for length in range(1, len(query) + 1):
+            typed = query[:length]
+
+            fuzzy_time = min(keystroke(matcher, texts, typed) for _ in range(args.runs))
+            substring_time = best_of(args.runs, lambda typed=typed: substring_filter(texts, typed))
+            matches = len(matcher.search(typed)[0])
+            print(
+                f"    {typed!r:12} {matches:7} matches  fuzzy {fuzzy_time * 1000:7.1f} ms"
+                f"  substring {substring_time * 1000:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark: git-status through `pass git` subprocesses vs. reading the repository in-process.
+
+    python benchmarks/bench_git_status.py --commits 20000 --secrets 2000 --ahead 3 --behind 2
+
+Builds a store with a long history via `git fast-import`, packs it, and leaves HEAD a few commits
+ahead of and behind its upstream. Only the local half of git-status is timed (no fetch).
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from git_inspect import GitInspector  # noqa: E402
+
+
+def git(repo, *args, **kwargs):
+    return subprocess.run(["git", "-C", repo, *args], capture_output=True, check=True, **kwargs)
+
+
+def fast_import_stream(commits, secrets):
+    """One commit per line of history, each rewriting one secret; every secret exists by the end."""
+    out = []
+    stamp = 1_600_000_000
+    for n in range(commits):
+        path = f"ns{n % secrets // 100:03d}/secret{n % secrets:05d}.gpg"
+        content = f"encrypted blob {n}\n".encode()
+        message = f"Edit password for {path} using pass_kb.".encode()
+        out.append(b"commit refs/heads/main\n")
+        out.append(b"committer Bench <bench@example.com> %d +0000\n" % (stamp + n))
+        out.append(b"data %d\n%s\n" % (len(message), message))
+        out.append(b"M 100644 inline %s\ndata %d\n%s\n" % (path.encode(), len(content), content))
+    return b"".join(out)
+
+
+def build_repo(root, commits, secrets, ahead, behind):
+    repo = os.path.join(root, "store")
+    git(root, "init", "-q", "-b", "main", repo)
+    git(repo, "fast-import", "--quiet", input=fast_import_stream(commits, secrets))
+    base = git(repo, "rev-parse", "main").stdout.strip().decode()
+    git(repo, "reset", "-q", "--hard", "main")
+
+    def commit_files(prefix, count):
+        for n in range(count):
+            with open(os.path.join(repo, f"{prefix}{n}.gpg"), "w") as f:
+                f.write(prefix)
+            git(repo, "add", "-A")
+            git(repo, "commit", "-qm", f"{prefix} {n}")
+
+    # Upstream: `behind` commits on top of the shared history, stored as a remote-tracking ref.
+    commit_files("upstream", behind)
+    git(repo, "update-ref", "refs/remotes/origin/main", "HEAD")
+    git(repo, "reset", "-q", "--hard", base)
+    commit_files("local", ahead)
+    git(repo, "config", "remote.origin.url", os.path.join(root, "nowhere.git"))
+    git(repo, "config", "remote.origin.fetch", "+refs/heads/*:refs/remotes/origin/*")
+    git(repo, "config", "branch.main.remote", "origin")
+    git(repo, "config", "branch.main.merge", "refs/heads/main")
+    git(repo, "gc", "-q")
+    # Age the work tree past the racy window, like a store that wasn't edited in the last seconds,
+    # then let git refresh the index once, as any earlier git call would have.
+    stamp = time.time() - 60
+    for dir_path, dir_names, file_names in os.walk(repo):
+        if ".git" in dir_names:
+            dir_names.remove(".git")
+        for name in file_names:
+            os.utime(os.path.join(dir_path, name), (stamp, stamp))
+        os.utime(dir_path, (stamp, stamp))
+    git(repo, "status", "--porcelain")
+    return repo
+
+
+def status_with_pass_git(repo):
+    """The previous git-status minus its fetch: two `pass git` runs, each a bash script starting git."""
+    env = {**os.environ, "PASSWORD_STORE_DIR": repo}
+    status = subprocess.run(["pass", "git", "status", "--porcelain"], capture_output=True, text=True, env=env)
+    counts = subprocess.run(
+        ["pass", "git", "rev-list", "--left-right", "--count", "HEAD...@{u}"], capture_output=True, text=True, env=env
+    )
+    return bool(status.stdout.strip()), tuple(int(c) for c in counts.stdout.split())
+
+
+def status_with_git(repo):
+    status = subprocess.run(["git", "-C", repo, "status", "--porcelain"], capture_output=True, text=True)
+    counts = subprocess.run(
+        ["git", "-C", repo, "rev-list", "--left-right", "--count", "HEAD...@{u}"], capture_output=True, text=True
+    )
+    return bool(status.stdout.strip()), tuple(int(c) for c in counts.stdout.split())
+
+
+def best_of(runs, func):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--commits", type=int, default=20000)
+    parser.add_argument("--secrets", type=int, default=1000)
+    parser.add_argument("--ahead", type=int, default=3)
+    parser.add_argument("--behind", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        repo = build_repo(root, args.commits, args.secrets, args.ahead, args.behind)
+        inspector = GitInspector(repo)
+
+        def inspect_status():
+            return inspector.has_local_changes(), inspector.ahead_behind()
+
+        def cold_inspect_status():
+            fresh = GitInspector(repo)  # First call of a new backend: no packs mapped, no commits parsed
+            return fresh.has_local_changes(), fresh.ahead_behind()
+
+        expected = status_with_git(repo)
+        if inspect_status() != expected:
+            sys.exit(f"Mismatch: git says {expected}, inspector says {inspect_status()}")
+
+        print(f"{args.commits} commits, {args.secrets} secrets, {args.ahead} ahead / {args.behind} behind")
+        print(f"(best of {args.runs})")
+        candidates = {}
+        if shutil.which("pass"):
+            candidates["pass git x2"] = lambda: status_with_pass_git(repo)
+        else:
+            print("  pass git x2   : skipped (pass not on PATH)")
+        candidates["git x2"] = lambda: status_with_git(repo)
+        candidates["inspect, cold"] = cold_inspect_status
+        candidates["inspect, warm"] = inspect_status
+        baseline = None
+        for name, func in candidates.items():
+            elapsed = best_of(args.runs, func)
+            baseline = baseline or elapsed
+            print(f"  {name:14}: {elapsed * 1000:8.1f} ms  ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: listing the store with the old pair of `find -L` subprocesses vs. the os.scandir walker
+and the persistent listing index.
+
+    python benchmarks/bench_list.py --namespaces 200 --per-namespace 100
+
+Builds a synthetic store (empty .gpg files are enough, nothing is decrypted) in a temporary directory.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from listing_index import ListingIndex, scan_store  # noqa: E402
+
+
+def list_with_find(store_path):
+    """The previous implementation of `list`, kept here as the baseline."""
+    cmd = ["find", "-L", store_path, "-type", "f", "-name", "*.gpg"]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    namespaces_map = defaultdict(list)
+    base_path = os.path.join(store_path, "")
+    for path in result.stdout.strip().split("\n"):
+        if not path:
+            continue
+        resource_path = path.replace(base_path, "", 1).replace(".gpg", "", 1)
+        if os.path.sep not in resource_path:
+            continue
+        parts = resource_path.split(os.path.sep, 1)
+        namespaces_map[parts[0]].append(parts[1])
+
+    dir_cmd = ["find", "-L", store_path, "-mindepth", "1", "-maxdepth", "1", "-type", "d"]
+    dir_result = subprocess.run(dir_cmd, capture_output=True, text=True, check=True)
+    for dir_path in dir_result.stdout.strip().split("\n"):
+        if dir_path and os.path.basename(dir_path) not in namespaces_map:
+            namespaces_map[os.path.basename(dir_path)] = []
+    return dict(namespaces_map)
+
+
+def build_store(root, namespaces, per_namespace):
+    for n in range(namespaces):
+        ns_dir = os.path.join(root, f"ns{n:04d}")
+        os.makedirs(os.path.join(ns_dir, "nested"))
+        for r in range(per_namespace):
+            # Every tenth entry lives one level deeper, like `ns/nested/resource`
+            target_dir = os.path.join(ns_dir, "nested") if r % 10 == 0 else ns_dir
+            open(os.path.join(target_dir, f"resource{r:05d}.gpg"), "w").close()
+    os.makedirs(os.path.join(root, ".git", "objects"))
+    open(os.path.join(root, ".gpg-id"), "w").close()
+
+
+def best_of(runs, func, *args):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--namespaces", type=int, default=100)
+    parser.add_argument("--per-namespace", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        build_store(root, args.namespaces, args.per_namespace)
+
+        found = {ns: sorted(res) for ns, res in list_with_find(root).items() if not ns.startswith(".")}
+        if found != scan_store(root):
+            sys.exit("Mismatch between find and scandir listings")
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # Age the store past the racy window so the index trusts every directory record.
+            stamp = time.time() - 60
+            for dir_path, _, _ in os.walk(root):
+                os.utime(dir_path, (stamp, stamp))
+
+            cache_path = ListingIndex.default_cache_path(root, cache_dir)
+            ListingIndex(root, cache_path).scan()  # Cold run writes the index
+
+            def warm_index_scan():
+                return ListingIndex(root, cache_path).scan()  # Fresh process: load from disk, stat dirs
+
+            if warm_index_scan() != found:
+                sys.exit("Mismatch between find and indexed listings")
+
+            entries = args.namespaces * args.per_namespace
+            find_time = best_of(args.runs, list_with_find, root)
+            scan_time = best_of(args.runs, scan_store, root)
+            index_time = best_of(args.runs, warm_index_scan)
+            print(f"{entries} entries in {args.namespaces} namespaces (best of {args.runs})")
+            print(f"  find -L x2 : {find_time * 1000:8.1f} ms")
+            print(f"  os.scandir : {scan_time * 1000:8.1f} ms  ({find_time / scan_time:.1f}x)")
+            print(f"  warm index : {index_time * 1000:8.1f} ms  ({find_time / index_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: substring lookup through the trigram index vs. a linear scan of every entry.
+
+    python benchmarks/bench_ngram.py --sizes 10000 100000 1000000
+
+Builds synthetic "[namespace]: resource" entries of each size and reports the index build time,
+the size of its posting lists, incremental add/remove cost, and lookup latency for rare and
+common terms.
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from itertools import repeat
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ngram_index import NgramIndex  # noqa: E402
+
+TERMS = ["github", "prod-db", "vpn", "mail", "zzzq"]
+
+
+def build_entries(count, seed):
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(20000)]
+    words += ["github", "gitlab", "mail", "prod-db", "server", "vpn"]
+    namespaces = rng.sample(words, 200)
+    return [f"[{rng.choice(namespaces)}]: {rng.choice(words)}/{rng.choice(words)}".lower() for _ in range(count)]
+
+
+def scan(texts, term):
+    """The baseline: a C-level `in` over every entry."""
+    return [i for i, found in enumerate(map(str.__contains__, texts, repeat(term))) if found]
+
+
+def best_of(runs, func, *args):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        texts = build_entries(size, args.seed)
+        start = time.perf_counter()
+        index = NgramIndex()
+        for text in texts:
+            index.add(text)
+        build_time = time.perf_counter() - start
+        trigrams, posting_bytes = index.stats()
+        print(f"{size} entries: built in {build_time:.2f} s, {trigrams} trigrams, {posting_bytes / 2**20:.1f} MiB")
+
+        start = time.perf_counter()
+        new_ids = [index.add(f"[bench]: added{n}/entry") for n in range(1000)]
+        add_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for doc_id in new_ids:
+            index.remove(doc_id)
+        remove_time = time.perf_counter() - start
+        print(f"  add {add_time * 1000:.2f} us/entry, remove {remove_time * 1000:.2f} us/entry")
+
+        for term in TERMS:
+            if index.search(term) != scan(texts, term):
+                sys.exit(f"Mismatch between index and scan for {term!r}")
+            matches = len(index.search(term))
+            index_time = best_of(args.runs, index.search, term)
+            scan_time = best_of(args.runs, scan, texts, term)
+            print(
+                f"  {term!r:10} {matches:7} matches  index {index_time * 1000:8.2f} ms"
+                f"  scan {scan_time * 1000:8.2f} ms  ({scan_time / max(index_time, 1e-9):.0f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
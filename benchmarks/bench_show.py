@@ -0,0 +1,95 @@
+"""
+Benchmark: decrypting one secret through `pass show` vs. the backend's gpg and gpgme engines.
+
+    python benchmarks/bench_show.py --runs 20
+
+Uses a throwaway GNUPGHOME with a passphrase-less key, so gpg-agent never prompts. Engines that
+aren't available here (no `pass` on PATH, no gpgme bindings) are reported and skipped.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from gpg_engine import EngineUnavailable, create_engine, gpg_binary  # noqa: E402
+
+SECRET = "correct horse battery staple\nemail: bench@example.com\nurl: https://example.com\n"
+
+
+def setup_store(root):
+    gnupg_home = os.path.join(root, "gnupg")
+    store = os.path.join(root, "store")
+    os.makedirs(gnupg_home, mode=0o700)
+    os.makedirs(os.path.join(store, "bench"))
+    os.environ["GNUPGHOME"] = gnupg_home
+    os.environ["PASSWORD_STORE_DIR"] = store
+
+    gpg = gpg_binary()
+    subprocess.run(
+        [gpg, "--batch", "--passphrase", "", "--quick-gen-key", "bench@example.com", "default", "default", "never"],
+        capture_output=True,
+        check=True,
+    )
+    with open(os.path.join(store, ".gpg-id"), "w") as f:
+        f.write("bench@example.com\n")
+    path = os.path.join(store, "bench", "secret.gpg")
+    subprocess.run(
+        [gpg, "--batch", "--yes", "--trust-model", "always", "-e", "-r", "bench@example.com", "-o", path],
+        input=SECRET.encode(),
+        check=True,
+    )
+    return path
+
+
+def median_ms(runs, func):
+    func()  # Warm-up: starts gpg-agent and loads the key
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = setup_store(root)
+        try:
+            candidates = {}
+            if shutil.which("pass"):
+                candidates["pass show"] = lambda: subprocess.run(
+                    ["pass", "show", "bench/secret"], capture_output=True, text=True, check=True
+                )
+            else:
+                print("  pass show : skipped (pass not on PATH)")
+            for name in ("gpg", "gpgme"):
+                try:
+                    engine = create_engine(name)
+                except EngineUnavailable as e:
+                    print(f"  {name:9} : skipped ({e})")
+                    continue
+                candidates[name] = lambda engine=engine: engine.decrypt_file(path)
+
+            print(f"median of {args.runs} decryptions")
+            baseline = None
+            for name, func in candidates.items():
+                elapsed = median_ms(args.runs, func)
+                baseline = baseline or elapsed
+                print(f"  {name:9} : {elapsed:8.1f} ms  ({baseline / elapsed:.1f}x)")
+        finally:
+            subprocess.run(["gpgconf", "--kill", "gpg-agent"], capture_output=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -94,6 +94,7 @@ class HotkeyCheatsheetDialog(QDialog):
                     ("Enter", "View selected secret"),
                     ("Ctrl+N", "Create new secret"),
                     ("Ctrl+R", "Sync with remote repository"),
+                    ("Ctrl+P", "Pause/resume background indexing"),
                     ("Ctrl+G", "Generate password (simple)"),
                     ("Ctrl+Shift+G", "Generate password (advanced)"),
                 ],
@@ -147,6 +147,7 @@ class SecretCreateWidget(QWidget):
         self.current_focus_index = 0  # Track current focused element (0 = tags, 1 = resource_input, 2+ = field_rows)
         self.current_tag_index = 0  # Track current focused tag
         self.tags_interaction_mode = False  # Track if in tags interaction mode
+        self.creating = None  # (namespace, resource) while the backend writes the submitted secret
 
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setSpacing(0)
@@ -773,6 +774,9 @@ class SecretCreateWidget(QWidget):
 
     def _prompt_to_save(self):
         """Prompt to save the new secret"""
+        if self.creating is not None:
+            self.show_status("Still creating the previous secret…", "info")
+            return
         namespace = self.selected_namespace
         resource = self.resource_input.text().strip()
 
@@ -863,13 +867,20 @@ class SecretCreateWidget(QWidget):
 
         final_content = "\n".join(content_lines)
 
-        result = self.save_callback(namespace, resource, final_content)
-        if result and result.get("status") == "success":
+        # The list shows the new secret at once; the form keeps it until the backend confirms the write
+        self.creating = (namespace, resource)
+        self.show_status(f"Creating '[{namespace}] {resource}'…", "info")
+        self.save_callback(namespace, resource, final_content, self._on_created)
+        self.back_callback()
+
+    def _on_created(self, result):
+        self.creating = None
+        if result.get("status") == "success":
             self.show_status("Secret created successfully!", "success")
             self.reset_form()
-            QTimer.singleShot(1500, self.back_callback)
         else:
-            self.show_status(f"Save failed: {result.get('message', 'Unknown error')}", "error")
+            message = result.get("message", "Unknown error")
+            self.show_status(f"Save failed: {message}. The form still holds it (Ctrl+N).", "error")
 
     def reset_form(self):
         """Reset the form to initial state"""
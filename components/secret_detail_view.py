@@ -15,7 +15,6 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from backend_utils import get_secret_from_backend
 from components.confirmation_dialog import ConfirmationDialog
 from ui_components import StyledLineEdit
 from ui_theme import extra
@@ -36,6 +35,7 @@ class SecretDetailWidget(QWidget):
         self.is_dirty = False
         self.namespace = ""
         self.resource = ""
+        self.saves_in_flight = set()  # (namespace, resource) of the saves the backend is still writing
 
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setSpacing(0)
@@ -81,19 +81,7 @@ class SecretDetailWidget(QWidget):
         self.main_layout.addWidget(scroll_area)
 
     def populate_data(self, secret_data, secret_name, namespace, resource):
-        self.title_label.setText(secret_name)
-        self.namespace = namespace
-        self.resource = resource
-        self._set_dirty(False)
-
-        for row in self.new_rows:
-            row["widget"].deleteLater()
-        self.new_rows = []
-
-        while self.form_layout.count():
-            self.form_layout.removeRow(0)
-
-        self.field_rows = []
+        self._reset_form(secret_name, namespace, resource)
 
         if not secret_data:
             self.form_layout.addRow(QLabel("Could not load secret details."))
@@ -109,6 +97,35 @@ class SecretDetailWidget(QWidget):
         if self.field_rows:
             QTimer.singleShot(0, lambda: self._focus_field(0))
 
+    def show_loading(self, secret_name, namespace, resource):
+        """Skeleton shown while the secret is decrypted: the title and placeholder rows, replaced by populate_data()."""
+        self._reset_form(secret_name, namespace, resource)
+        status = QLabel("Decrypting…")
+        status.setStyleSheet(f"color: {extra['secondaryTextColor']}; font-size: 12pt;")
+        self.form_layout.addRow(status)
+        for _ in range(3):
+            key_bar, value_bar = QWidget(), QWidget()
+            for bar in (key_bar, value_bar):
+                bar.setFixedHeight(32)
+                bar.setStyleSheet("background-color: rgba(205, 214, 244, 0.08); border-radius: 6px;")
+            key_bar.setFixedWidth(80)
+            self.form_layout.addRow(key_bar, value_bar)
+
+    def _reset_form(self, secret_name, namespace, resource):
+        self.title_label.setText(secret_name)
+        self.namespace = namespace
+        self.resource = resource
+        self._set_dirty(False)
+
+        for row in self.new_rows:
+            row["widget"].deleteLater()
+        self.new_rows = []
+
+        while self.form_layout.count():
+            self.form_layout.removeRow(0)
+
+        self.field_rows = []
+
     def _add_form_row(self, key, value, is_password=False):
         row_container = QWidget()
         row_container.setStyleSheet(
@@ -407,7 +424,7 @@ class SecretDetailWidget(QWidget):
         delete_button.setIcon(qta.icon("fa5s.minus-circle", color="#f38ba8"))
         delete_button.setToolTip("Delete field (Ctrl+D)")
         delete_button.setFixedSize(36, 36)
-        delete_button.clicked.connect(lambda: self._prompt_for_delete(index))
+        delete_button.clicked.connect(lambda: self._prompt_for_delete(self.field_rows.index(row)))
         row["value_layout"].addWidget(delete_button)
         row["delete_button"] = delete_button
 
@@ -581,6 +598,9 @@ class SecretDetailWidget(QWidget):
     def _prompt_to_save(self):
         if not self.is_dirty:
             return
+        if (self.namespace, self.resource) in self.saves_in_flight:
+            self.show_status("Still saving the previous changes…", "info")
+            return
         if self.new_rows:
             # Check for partially filled fields
             for row_data in self.new_rows:
@@ -641,11 +661,28 @@ class SecretDetailWidget(QWidget):
 
         final_content = "\n".join(content_lines)
 
-        result = self.save_callback(self.namespace, self.resource, final_content)
-        if result and result.get("status") == "success":
+        # The rows already show what is being written: mark them saved now and undo that if the save fails
+        key = (self.namespace, self.resource)
+        deleted = [row for row in self.field_rows if row.get("deleted", False)]
+        self.saves_in_flight.add(key)
+        self._set_dirty(False)
+        self.show_status("Saving…", "info")
+        self.save_callback(*key, final_content, lambda result: self._on_saved(key, deleted, result))
+
+    def _on_saved(self, key, deleted, result):
+        self.saves_in_flight.discard(key)
+        success = result.get("status") == "success"
+        if key == (self.namespace, self.resource):  # Still showing the saved secret
+            if success:
+                for row in deleted:
+                    if row in self.field_rows:
+                        self.field_rows.remove(row)
+                        self.form_layout.removeRow(row["container"])
+                self.current_field_index = min(self.current_field_index, max(len(self.field_rows) - 1, 0))
+            else:
+                self._set_dirty(True)  # The edits are still on screen, unsaved: keep them for another try
+        if success:
             self.show_status("Saved!", "success")
-            new_details = get_secret_from_backend(self.namespace, self.resource)
-            self.populate_data(new_details, self.title_label.text(), self.namespace, self.resource)
         else:
             self.show_status(f"Save failed: {result.get('message', 'Unknown error')}", "error")
 
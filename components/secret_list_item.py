@@ -1,50 +1,108 @@
+from itertools import groupby
+
 import qtawesome as qta
-from PySide6.QtCore import QSize, Qt
-from PySide6.QtWidgets import QHBoxLayout, QLabel, QPushButton, QWidget
+from PySide6.QtCore import QEvent, QModelIndex, QRect, QSize, Qt, Signal
+from PySide6.QtGui import QColor, QFont, QFontMetrics
+from PySide6.QtWidgets import QStyle, QStyledItemDelegate, QToolTip
 
+from components.secret_list_model import HIGHLIGHT_ROLE, NAMESPACE_COLOR_ROLE
 from ui_theme import extra
 
+ROW_HEIGHT = 44
+MARGIN = 12
+SPACING = 8
+BUTTON_SIZE = 32
+ICON_SIZE = 16
+
+
+class SecretListDelegate(QStyledItemDelegate):
+    """
+    Paints the rows of the search result list: "[namespace]" in its color, the resource in bold, the
+    characters matched by the search underlined, and a view (eye) button on the selected row.
+    Nothing is created per row, so only the rows on screen cost anything.
+    """
+
+    view_requested = Signal(QModelIndex)  # The eye button of a row was clicked
 
-class SecretListItem(QWidget):
-    def __init__(self, namespace, resource, namespace_color, view_callback):
-        super().__init__()
-        self.view_callback = view_callback
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.view_icon = qta.icon("fa5s.eye", color=extra["primaryTextColor"])
+        self.namespace_font = QFont()
+        self.namespace_font.setPixelSize(16)
+        self.resource_font = QFont(self.namespace_font)
+        self.resource_font.setBold(True)
 
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(12, 0, 12, 0)
-        layout.setSpacing(8)
-        layout.setAlignment(Qt.AlignVCenter)
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
 
-        ns_label = QLabel(f"[{namespace}]")
-        ns_label.setStyleSheet(f"color: {namespace_color}; font-size: 16px;")
-        ns_label.setAlignment(Qt.AlignVCenter)
-        layout.addWidget(ns_label)
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect
+        selected = bool(option.state & QStyle.State_Selected)
+        if selected:
+            painter.fillRect(rect, QColor(137, 180, 250, 51))
+            painter.fillRect(QRect(rect.left(), rect.top(), 3, rect.height()), QColor(extra["primaryColor"]))
+        elif option.state & QStyle.State_MouseOver:
+            painter.fillRect(rect, QColor(137, 180, 250, 26))
 
-        resource_label = QLabel(resource)
-        resource_label.setStyleSheet(f"color: {extra['primaryTextColor']}; font-size: 16px; font-weight: bold;")
-        resource_label.setWordWrap(False)
-        resource_label.setAlignment(Qt.AlignVCenter)
-        layout.addWidget(resource_label, stretch=1)
+        item_data = index.data(Qt.UserRole)
+        highlight = set(index.data(HIGHLIGHT_ROLE) or ())
+        ns_text = f"[{item_data['namespace']}]"
+        right = rect.right() - MARGIN - (BUTTON_SIZE + SPACING if selected else 0)
+        painter.setClipRect(QRect(rect.left(), rect.top(), right - rect.left(), rect.height()))
+        ns_color = index.data(NAMESPACE_COLOR_ROLE)
+        x = self._draw_runs(painter, rect, rect.left() + MARGIN, ns_text, 0, highlight, self.namespace_font, ns_color)
+        resource_offset = len(ns_text) + 2  # After "[namespace]: "
+        resource_font, resource_color = self.resource_font, extra["primaryTextColor"]
+        resource = item_data["resource"]
+        self._draw_runs(painter, rect, x + SPACING, resource, resource_offset, highlight, resource_font, resource_color)
+        painter.setClipping(False)
 
-        self.buttons_widget = QWidget()
-        self.buttons_widget.setVisible(False)
-        buttons_layout = QHBoxLayout(self.buttons_widget)
-        buttons_layout.setContentsMargins(0, 0, 0, 0)
-        buttons_layout.setSpacing(4)
+        if selected:
+            self.view_icon.paint(painter, self._icon_rect(rect))
+        painter.restore()
 
-        view_btn = QPushButton()
-        view_btn.setIcon(qta.icon("fa5s.eye", color=extra["primaryTextColor"]))
-        view_btn.setToolTip("View (Enter)")
-        view_btn.setFixedSize(32, 32)
-        view_btn.clicked.connect(self.view_callback)
-        buttons_layout.addWidget(view_btn)
+    def editorEvent(self, event, model, option, index):
+        if (
+            event.type() == QEvent.MouseButtonRelease
+            and event.button() == Qt.LeftButton
+            and option.state & QStyle.State_Selected
+            and self._button_rect(option.rect).contains(event.position().toPoint())
+        ):
+            self.view_requested.emit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
 
-        layout.addWidget(self.buttons_widget)
+    def helpEvent(self, event, view, option, index):
+        if option.state & QStyle.State_Selected and self._button_rect(option.rect).contains(event.pos()):
+            QToolTip.showText(event.globalPos(), "View (Enter)", view)
+            return True
+        return super().helpEvent(event, view, option, index)
 
-        self.setMinimumHeight(44)
+    @staticmethod
+    def _button_rect(rect):
+        top = rect.top() + (rect.height() - BUTTON_SIZE) // 2
+        return QRect(rect.right() - MARGIN - BUTTON_SIZE + 1, top, BUTTON_SIZE, BUTTON_SIZE)
 
-    def set_selected(self, selected):
-        self.buttons_widget.setVisible(selected)
+    def _icon_rect(self, rect):
+        button = self._button_rect(rect)
+        margin = (BUTTON_SIZE - ICON_SIZE) // 2
+        return button.adjusted(margin, margin, -margin, -margin)
 
-    def sizeHint(self):
-        return QSize(self.width(), 44)
+    @staticmethod
+    def _draw_runs(painter, rect, x, text, offset, highlight, font, color):
+        """
+        Draws `text` from `x`, its characters at `highlight` (indices shifted by `offset`) underlined in
+        the accent color. Returns the x after the text.
+        """
+        underlined = QFont(font)
+        underlined.setUnderline(True)
+        chars = enumerate(text, offset)
+        for matched, run in groupby(chars, key=lambda char: char[0] in highlight):
+            run_text = "".join(char for _, char in run)
+            run_font = underlined if matched else font
+            painter.setFont(run_font)
+            painter.setPen(QColor(extra["primaryColor"] if matched else color))
+            painter.drawText(QRect(x, rect.top(), rect.right() - x, rect.height()), Qt.AlignVCenter, run_text)
+            x += QFontMetrics(run_font).horizontalAdvance(run_text)
+        return x
@@ -0,0 +1,85 @@
+import bisect
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from fuzzy_matcher import FuzzyMatcher
+from ui_theme import extra
+
+# Extra data roles, next to Qt.DisplayRole (the entry text) and Qt.UserRole (its {"namespace", "resource"})
+NAMESPACE_COLOR_ROLE = Qt.UserRole + 1
+HIGHLIGHT_ROLE = Qt.UserRole + 2  # Indices into the entry text of the characters the search matched
+
+
+class SecretListModel(QAbstractListModel):
+    """
+    The rows of the search result list: (text, {"namespace", "resource"}) entries, each with the rank
+    it is sorted by. Rows hold no widgets; the view asks for the data of the rows it paints, so a new
+    search only swaps the lists and repaints what is visible.
+    """
+
+    def __init__(self, namespace_colors, parent=None):
+        super().__init__(parent)
+        self.namespace_colors = namespace_colors  # Shared with the window, which assigns the colors
+        self.entries = []
+        self.ranks = []  # Sort key of each row: (search score, text)
+        self.query = ""
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.entries):
+            return None
+        text, item_data = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            return text
+        if role == Qt.UserRole:
+            return item_data
+        if role == NAMESPACE_COLOR_ROLE:
+            return self.namespace_colors.get(item_data["namespace"], extra["secondaryTextColor"])
+        if role == HIGHLIGHT_ROLE:
+            return FuzzyMatcher.positions(self.query, text) if self.query else []
+        return None
+
+    def set_rows(self, ranked_entries, query):
+        """Replaces every row with [(rank, entry), ...], already in order, matched by the search `query`."""
+        self.beginResetModel()
+        self.ranks = [rank for rank, _ in ranked_entries]
+        self.entries = [entry for _, entry in ranked_entries]
+        self.query = query
+        self.endResetModel()
+
+    def insert_entry(self, rank, entry):
+        """Adds one row at the place its rank sorts to."""
+        row = bisect.bisect_left(self.ranks, rank)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.ranks.insert(row, rank)
+        self.entries.insert(row, entry)
+        self.endInsertRows()
+
+    def insert_entries(self, ranked_entries):
+        """
+        Adds rows from [(rank, entry), ...], in rank order. When they all sort after the current rows
+        (a listing arriving in order), they are added in one go instead of one by one.
+        """
+        if not ranked_entries:
+            return
+        if self.ranks and ranked_entries[0][0] < self.ranks[-1]:
+            for rank, entry in ranked_entries:
+                self.insert_entry(rank, entry)
+            return
+        first = len(self.entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(ranked_entries) - 1)
+        self.ranks.extend(rank for rank, _ in ranked_entries)
+        self.entries.extend(entry for _, entry in ranked_entries)
+        self.endInsertRows()
+
+    def remove_entry(self, text):
+        """Removes the row of the entry with this text, if it is shown."""
+        for row, (entry_text, _) in enumerate(self.entries):
+            if entry_text == text:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.ranks[row]
+                del self.entries[row]
+                self.endRemoveRows()
+                return
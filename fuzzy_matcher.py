@@ -0,0 +1,196 @@
+import operator
+from itertools import compress, repeat
+
+from ngram_index import NgramIndex
+
+# A match starting right after one of these begins a word ("[ns]: res", "a-b", "a/b", "a.b", ...).
+WORD_BOUNDARIES = frozenset(" []/:-_.@")
+# Score weights; lower scores rank first. A gap is a key character skipped inside the match.
+GAP_PENALTY = 16
+MID_WORD_PENALTY = 8
+# Larger than any real score; rules out the contiguous variant of a term that only matches fuzzily.
+_NO_MATCH = 1 << 30
+# search() packs (score, index) into one int to sort; indices stay below 2 ** _INDEX_BITS.
+_INDEX_BITS = 32
+_INDEX_MASK = (1 << _INDEX_BITS) - 1
+
+
+class FuzzyMatcher:
+    """
+    Ranked fuzzy search over a list of strings, in the spirit of fzf. A query is split into terms
+    on whitespace; a string matches when each term's characters appear in it in order. As in fzf,
+    a term starting with ' must appear as is (exact substring). Matches are ranked by the sum of
+    their term scores (see _match()), then by their position in the list.
+
+    Keys are lower-cased once, when added. Every pass over the candidates is a C-level map over
+    plain lists (no per-key Python code), and a query that extends the previous one only searches
+    the previous result, so typing narrows an ever smaller set. Exact terms are looked up in a
+    trigram index (built on the first exact search, then kept up to date), so they only touch the
+    strings that contain them.
+
+    The list mirrors the caller's: keep it in step with insert()/remove() (or reset()).
+    """
+
+    def __init__(self, texts=()):
+        self.reset(texts)
+
+    def reset(self, texts):
+        # A leading space gives every match a "character before it" to test for a word boundary.
+        self._keys = [f" {text.lower()}" for text in texts]
+        self._index = None  # NgramIndex of the keys, once an exact term needed it
+        self._ids = None  # Index id of each key, parallel to _keys
+        self._positions = None  # Index id -> position in _keys, rebuilt after changes
+        self._forget()
+
+    def insert(self, index, text):
+        key = f" {text.lower()}"
+        self._keys.insert(index, key)
+        if self._index is not None:
+            self._ids.insert(index, self._index.add(key))
+            self._positions = None
+        self._forget()
+
+    def remove(self, index):
+        del self._keys[index]
+        if self._index is not None:
+            self._index.remove(self._ids.pop(index))
+            self._positions = None
+        self._forget()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def search(self, query):
+        """
+        (indices, scores) of every string matching `query`, best first: two parallel lists, lower
+        scores being better. An empty query matches everything, in list order.
+        """
+        query = query.lower()
+        steps = _steps(query)
+        if not steps:
+            return list(range(len(self._keys))), [0] * len(self._keys)
+        if self._last_query is not None and query.startswith(self._last_query):
+            candidates = self._last_result  # Extending the query can only drop matches
+        else:
+            candidates = self._lookup(steps)
+        keys = self._keys if isinstance(candidates, range) else list(map(self._keys.__getitem__, candidates))
+        (term, match), rest = steps[0], steps[1:]
+        indices, scores = match(term, keys, candidates)
+        for term, match in rest:
+            kept, term_scores = match(term, list(map(self._keys.__getitem__, indices)), range(len(indices)))
+            indices = list(map(indices.__getitem__, kept))
+            scores = list(map(operator.add, map(scores.__getitem__, kept), term_scores))
+        self._last_query = query
+        self._last_result = indices
+        # Sorting plain ints is several times faster than sorting (score, index) tuples.
+        ranked = sorted(map(operator.or_, map(operator.lshift, scores, repeat(_INDEX_BITS)), indices))
+        indices = list(map(operator.and_, ranked, repeat(_INDEX_MASK)))
+        return indices, list(map(operator.rshift, ranked, repeat(_INDEX_BITS)))
+
+    @staticmethod
+    def score(query, text):
+        """Score of one string against `query` (lower is better), or None if it doesn't match."""
+        key = f" {text.lower()}"
+        total = 0
+        for term, match in _steps(query.lower()):
+            kept, term_scores = match(term, [key], [0])
+            if not kept:
+                return None
+            total += term_scores[0]
+        return total
+
+    @staticmethod
+    def positions(query, text):
+        """Sorted indices of the characters of `text` matched by `query`, for highlighting."""
+        key = text.lower()
+        found = set()
+        for term, match in _steps(query.lower()):
+            start = key.find(term)
+            if start >= 0:
+                found.update(range(start, start + len(term)))
+                continue
+            if match is _match_exact:
+                continue
+            matched = []
+            position = -1
+            for char in term:
+                position = key.find(char, position + 1)
+                if position < 0:
+                    break
+                matched.append(position)
+            else:
+                found.update(matched)
+        return sorted(found)
+
+    def _lookup(self, steps):
+        """Positions of the keys that can match, narrowed by the longest exact term through the index."""
+        exact = [term for term, match in steps if match is _match_exact]
+        longest = max(exact, key=len, default="")
+        if self._index is None and longest:
+            self._index = NgramIndex()
+            self._ids = list(map(self._index.add, self._keys))
+        ids = self._index.search(longest) if longest else None
+        if ids is None:
+            return range(len(self._keys))  # Too short to look up: scan everything
+        if self._positions is None:
+            self._positions = dict(zip(self._ids, range(len(self._ids))))
+        return sorted(map(self._positions.__getitem__, ids))
+
+    def _forget(self):
+        self._last_query = None
+        self._last_result = None
+
+
+def _steps(query):
+    """
+    [(term, matching function), ...] of a lower-cased query: exact terms ('term) first, as they
+    narrow the candidates fastest, then fuzzy ones. A lone ' is ignored.
+    """
+    terms = [term for term in query.split() if term != "'"]
+    exact = [(term[1:], _match_exact) for term in terms if term.startswith("'")]
+    return exact + [(term, _match) for term in terms if not term.startswith("'")]
+
+
+def _match(term, keys, ids):
+    """
+    (the `ids` of the keys matching `term`, their scores); `ids` runs parallel to `keys`. A key's
+    score is GAP_PENALTY per character skipped between the first and last matched character, plus
+    MID_WORD_PENALTY if the match doesn't start a word. The match is the leftmost one (each character found as early as
+    possible), or a contiguous occurrence of the whole term when that scores better.
+    """
+    kept = ids
+    starts = ends = None
+    for char in term:
+        after = repeat(0) if ends is None else map(operator.add, ends, repeat(1))
+        found = list(map(str.find, keys, repeat(char), after))
+        present = list(map(operator.ge, found, repeat(0)))
+        kept = list(compress(kept, present))
+        keys = list(compress(keys, present))
+        ends = list(compress(found, present))
+        starts = ends if starts is None else list(compress(starts, present))
+    if len(term) == 1:
+        return kept, list(_mid_word_penalties(keys, starts))
+    widths = map(operator.sub, ends, starts)
+    gaps = map(operator.sub, widths, repeat(len(term) - 1))
+    fuzzy = map(operator.add, map(operator.mul, gaps, repeat(GAP_PENALTY)), _mid_word_penalties(keys, starts))
+
+    offsets = list(map(str.find, keys, repeat(term)))
+    missing = map(operator.mul, map(operator.lt, offsets, repeat(0)), repeat(_NO_MATCH))
+    contiguous = map(operator.add, missing, _mid_word_penalties(keys, offsets))
+    return kept, list(map(min, fuzzy, contiguous))
+
+
+def _match_exact(term, keys, ids):
+    """Like _match() for a term that must appear as is: scored on whether its first occurrence starts a word."""
+    offsets = list(map(str.find, keys, repeat(term)))
+    present = list(map(operator.ge, offsets, repeat(0)))
+    keys = list(compress(keys, present))
+    offsets = list(compress(offsets, present))
+    return list(compress(ids, present)), list(_mid_word_penalties(keys, offsets))
+
+
+def _mid_word_penalties(keys, starts):
+    """MID_WORD_PENALTY for each start that doesn't follow a word boundary, else 0."""
+    before = map(str.__getitem__, keys, map(operator.sub, starts, repeat(1)))
+    mid_word = map(operator.not_, map(WORD_BOUNDARIES.__contains__, before))
+    return map(operator.mul, mid_word, repeat(MID_WORD_PENALTY))
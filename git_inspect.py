@@ -0,0 +1,732 @@
+import heapq
+import mmap
+import os
+import stat
+import struct
+import threading
+import time
+import zlib
+from hashlib import sha1
+
+from listing_index import RACY_WINDOW_NS
+
+# Object types as numbered in pack files.
+_PACK_TYPES = {1: b"commit", 2: b"tree", 3: b"blob", 4: b"tag"}
+_OFS_DELTA = 6
+_REF_DELTA = 7
+
+# Attributes that change how a file's contents are hashed; a store that sets any of them is left to git.
+_CONTENT_ATTRIBUTES = {"text", "eol", "crlf", "filter", "ident", "working-tree-encoding"}
+# Index extensions that only cache or annotate (any upper-case one is optional by definition);
+# lower-case ones such as "link" (split index) and "sdir" (sparse index) are refused.
+_SKIPPABLE_EXTENSIONS = {b"TREE", b"REUC", b"UNTR", b"FSMN", b"EOIE", b"IEOT"}
+# Config given through the environment instead of files.
+_CONFIG_ENV = ("GIT_CONFIG_PARAMETERS", "GIT_CONFIG_COUNT")
+
+# Ahead/behind walks stop once every queued commit is reachable from both tips; like `git rev-list`,
+# keep popping a few more so a commit with a skewed (too new) date can't hide a shared ancestor.
+_WALK_SLOP = 5
+_LEFT = 1
+_RIGHT = 2
+_BOTH = _LEFT | _RIGHT
+
+_DELTA_BASE_CACHE_SIZE = 256
+
+
+class InspectUnsupported(Exception):
+    """The repository uses something this reader doesn't handle; callers fall back to running git."""
+
+
+def _read_file(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        raise InspectUnsupported(str(e)) from e
+
+
+def _has_rules(path):
+    """True when an ignore/attributes file holds anything besides blank lines and comments."""
+    content = _read_file(path)
+    if content is None:
+        return False
+    return any(line.strip() and not line.lstrip().startswith(b"#") for line in content.splitlines())
+
+
+def _config_home():
+    return os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+
+
+def parse_config(content, values):
+    """
+    Minimal git-config reader: adds "section.subsection.key" -> [values] to `values`.
+    Section and key names are lower-cased; subsections keep their case. Includes are not followed.
+    """
+    section = None
+    for raw_line in content.decode("utf-8", "surrogateescape").splitlines():
+        line = raw_line.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            header, _, rest = line[1:].partition("]")
+            if rest.strip() and rest.strip()[0] not in "#;":
+                raise InspectUnsupported("Unsupported git config syntax.")
+            name, _, subsection = header.strip().partition(" ")
+            subsection = subsection.strip()
+            if subsection:
+                if len(subsection) < 2 or subsection[0] != '"' or subsection[-1] != '"' or "\\" in subsection:
+                    raise InspectUnsupported("Unsupported git config section header.")
+                section = f"{name.lower()}.{subsection[1:-1]}"
+            else:
+                section = header.strip().lower()  # [section.sub] is the legacy spelling
+            continue
+        if section is None:
+            raise InspectUnsupported("Malformed git config.")
+        key, has_value, value = line.partition("=")
+        key = f"{section}.{key.strip().lower()}"
+        if not has_value:
+            value = "true"  # A bare key is a boolean true
+        else:
+            value = _config_value(value)
+        if key.startswith("include.") or key.startswith("includeif."):
+            raise InspectUnsupported("git config includes are not followed.")
+        values.setdefault(key, []).append(value)
+    return values
+
+
+def _config_value(raw):
+    """Unquotes a config value and strips a trailing comment; continued lines are refused."""
+    result = []
+    quoted = False
+    i = 0
+    raw = raw.strip()
+    while i < len(raw):
+        c = raw[i]
+        if c == '"':
+            quoted = not quoted
+        elif c == "\\":
+            i += 1
+            if i >= len(raw):
+                raise InspectUnsupported("Multi-line git config values are not supported.")
+            result.append({"n": "\n", "t": "\t", "b": "\b"}.get(raw[i], raw[i]))
+        elif c in "#;" and not quoted:
+            break
+        else:
+            result.append(c)
+        i += 1
+    return "".join(result).strip()
+
+
+def _config_bool(value, default):
+    if value is None:
+        return default
+    return value.lower() in ("true", "yes", "on", "1")
+
+
+class _Pack:
+    """One pack file and its version 2 index, both memory-mapped."""
+
+    def __init__(self, pack_path):
+        idx_path = pack_path[: -len(".pack")] + ".idx"
+        with open(idx_path, "rb") as f:
+            self._idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(pack_path, "rb") as f:
+            self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._idx[:8] != b"\xfftOc\x00\x00\x00\x02" or self._pack[:4] != b"PACK":
+            raise InspectUnsupported(f"Unsupported pack format: {pack_path}")
+        self._fanout = struct.unpack_from(">256I", self._idx, 8)
+        self._count = self._fanout[255]
+        self._names_at = 8 + 256 * 4
+        self._offsets_at = self._names_at + self._count * 24  # names (20) + crc32 (4) per object
+        self._large_offsets_at = self._offsets_at + self._count * 4
+        self._bases = {}  # pack offset -> (type, data) of recently used delta bases
+
+    def find(self, sha):
+        """Offset of `sha` (20 raw bytes) in this pack, or None."""
+        low = self._fanout[sha[0] - 1] if sha[0] else 0
+        high = self._fanout[sha[0]]
+        idx = self._idx
+        names_at = self._names_at
+        while low < high:
+            mid = (low + high) // 2
+            name = idx[names_at + mid * 20 : names_at + mid * 20 + 20]
+            if name < sha:
+                low = mid + 1
+            elif name > sha:
+                high = mid
+            else:
+                offset = struct.unpack_from(">I", idx, self._offsets_at + mid * 4)[0]
+                if offset & 0x80000000:
+                    offset = struct.unpack_from(">Q", idx, self._large_offsets_at + (offset & 0x7FFFFFFF) * 8)[0]
+                return offset
+        return None
+
+    def read(self, offset, resolve_ref):
+        """Returns (type, data) of the object at `offset`, applying delta chains."""
+        chain = []
+        while True:
+            cached = self._bases.get(offset)
+            if cached is not None:
+                obj_type, data = cached
+                break
+            obj_type, data, base = self._read_raw(offset)
+            if obj_type == _OFS_DELTA:
+                chain.append((offset, data))
+                offset = base
+            elif obj_type == _REF_DELTA:
+                chain.append((offset, data))
+                obj_type, data = resolve_ref(base)
+                break
+            else:
+                obj_type = _PACK_TYPES[obj_type]
+                break
+        for delta_offset, delta in reversed(chain):
+            data = _apply_delta(data, delta)
+            if len(self._bases) >= _DELTA_BASE_CACHE_SIZE:
+                self._bases.pop(next(iter(self._bases)))
+            self._bases[delta_offset] = (obj_type, data)
+        return obj_type, data
+
+    def _read_raw(self, offset):
+        pack = self._pack
+        c = pack[offset]
+        obj_type = (c >> 4) & 7
+        size = c & 0x0F
+        shift = 4
+        pos = offset + 1
+        while c & 0x80:
+            c = pack[pos]
+            pos += 1
+            size |= (c & 0x7F) << shift
+            shift += 7
+        base = None
+        if obj_type == _OFS_DELTA:
+            c = pack[pos]
+            pos += 1
+            distance = c & 0x7F
+            while c & 0x80:
+                c = pack[pos]
+                pos += 1
+                distance = ((distance + 1) << 7) | (c & 0x7F)
+            base = offset - distance
+        elif obj_type == _REF_DELTA:
+            base = pack[pos : pos + 20]
+            pos += 20
+        elif obj_type not in _PACK_TYPES:
+            raise InspectUnsupported(f"Unknown pack object type {obj_type}.")
+        return obj_type, _inflate(pack, pos, size), base
+
+
+def _inflate(buffer, pos, size):
+    decompressor = zlib.decompressobj()
+    chunk = max(size + 64, 4096)
+    data = b""
+    while not decompressor.eof:
+        if pos >= len(buffer):
+            raise InspectUnsupported("Truncated pack object.")
+        data += decompressor.decompress(buffer[pos : pos + chunk])
+        pos += chunk
+    return data
+
+
+def _delta_varint(delta, pos):
+    value = shift = 0
+    while True:
+        c = delta[pos]
+        pos += 1
+        value |= (c & 0x7F) << shift
+        shift += 7
+        if not c & 0x80:
+            return value, pos
+
+
+def _apply_delta(base, delta):
+    source_size, pos = _delta_varint(delta, 0)
+    target_size, pos = _delta_varint(delta, pos)
+    if source_size != len(base):
+        raise InspectUnsupported("Delta does not match its base object.")
+    out = bytearray()
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:  # Copy a range of the base
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (1 << (4 + i)):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset : offset + (size or 0x10000)]
+        elif op:  # Insert the next `op` bytes
+            out += delta[pos : pos + op]
+            pos += op
+        else:
+            raise InspectUnsupported("Invalid delta opcode.")
+    if len(out) != target_size:
+        raise InspectUnsupported("Delta produced the wrong size.")
+    return bytes(out)
+
+
+class _IndexEntry:
+    __slots__ = ("path", "ctime", "mtime", "ino", "mode", "size", "sha", "stage", "assume_valid", "skip", "intent")
+
+
+class _IndexState:
+    """A parsed index plus what the status checks precompute from it."""
+
+    def __init__(self, stamp, entries, root_tree, root):
+        self.stamp = stamp
+        self.entries = entries
+        self.root_tree = root_tree  # Root of a valid cache-tree extension, or None
+        self.root = root  # Work tree path with a trailing slash, as bytes
+        self.tracked = {entry.path for entry in entries}
+        mtime = stamp[0] if stamp else 0
+        self.checks = []  # (full path, expected stat tuple or None, mode bits, mode mask, entry)
+        self.attributes_files = []
+        for entry in entries:
+            name = entry.path.rpartition(b"/")[2]
+            if name == b".gitignore":
+                raise InspectUnsupported("Ignore rules in .gitignore are not supported.")
+            if name == b".gitattributes":
+                self.attributes_files.append(root + entry.path)
+            if entry.assume_valid or entry.skip:
+                continue
+            if stat.S_IFMT(entry.mode) == 0o160000:
+                raise InspectUnsupported("Submodules are not supported.")
+            # A file written in the same tick as the index is "racily clean": its stat data proves nothing.
+            expected = None if entry.mtime >= mtime else (entry.mtime, entry.ctime, entry.ino, entry.size)
+            regular = stat.S_ISREG(entry.mode)
+            mode_bits = stat.S_IFMT(entry.mode) | (entry.mode & 0o100 if regular else 0)
+            self.checks.append((root + entry.path, expected, mode_bits, 0o170100 if regular else 0o170000, entry))
+
+
+class GitInspector:
+    """
+    Answers the two questions `git-status` asks — "are there local changes?" and "how far apart are
+    HEAD and its upstream?" — by reading the store's .git directly instead of forking git.
+    Understands loose and packed refs and objects (with deltas) and index versions 2-3. Anything
+    else (ignore rules, content filters, sha256/reftable repos, worktrees, shallow or grafted
+    history, missing objects, ...) raises InspectUnsupported so the caller can run git instead.
+    Objects are immutable, so parsed commits and loaded packs are kept between calls.
+    """
+
+    def __init__(self, worktree):
+        self.worktree = worktree
+        self.git_dir = os.path.join(worktree, ".git")
+        self.objects_dir = os.path.join(self.git_dir, "objects")
+        self._lock = threading.Lock()
+        self._packs = {}  # pack path -> _Pack
+        self._packs_stamp = None
+        self._commits = {}  # sha -> (commit time, parent shas)
+        self._index = None  # (index file stamp, parsed index)
+        self._clean_dirs = {}  # dir prefix -> ((mtime, inode), subdir prefixes) of dirs without untracked files
+
+    # --- repository layout ---
+
+    def _check_layout(self):
+        """Refuses repositories whose layout this reader doesn't model. Returns the merged config."""
+        if not os.path.isdir(self.git_dir):
+            raise InspectUnsupported("The store is not the top of a git repository.")
+        if os.stat(self.worktree).st_uid != os.getuid():
+            raise InspectUnsupported("Repository owned by someone else; let git apply safe.directory.")
+        for env in ("GIT_DIR", "GIT_WORK_TREE", "GIT_INDEX_FILE", "GIT_OBJECT_DIRECTORY", *_CONFIG_ENV):
+            if os.environ.get(env):
+                raise InspectUnsupported(f"{env} is set.")
+        for name in ("shallow", "info/grafts", "objects/info/alternates", "commondir"):
+            if os.path.exists(os.path.join(self.git_dir, name)):
+                raise InspectUnsupported(f"Repositories with {name} are not supported.")
+        if self._has_replace_refs():
+            raise InspectUnsupported("Replace refs are not supported.")
+        config = self._config()
+        if any(key.startswith("extensions.") for key in config):
+            raise InspectUnsupported("Repository extensions are not supported.")
+        if config.get("core.bare", ["false"])[-1].lower() == "true" or "core.worktree" in config:
+            raise InspectUnsupported("Unusual work tree configuration.")
+        return config
+
+    def _has_replace_refs(self):
+        replace_dir = os.path.join(self.git_dir, "refs", "replace")
+        if os.path.isdir(replace_dir) and any(files for _, _, files in os.walk(replace_dir)):
+            return True
+        packed = _read_file(os.path.join(self.git_dir, "packed-refs")) or b""
+        return b" refs/replace/" in packed
+
+    def _config(self):
+        values = {}
+        paths = []
+        if not os.environ.get("GIT_CONFIG_NOSYSTEM"):
+            paths.append(os.environ.get("GIT_CONFIG_SYSTEM") or "/etc/gitconfig")
+        if os.environ.get("GIT_CONFIG_GLOBAL"):
+            paths.append(os.environ["GIT_CONFIG_GLOBAL"])
+        else:
+            paths += [os.path.join(_config_home(), "git", "config"), os.path.expanduser("~/.gitconfig")]
+        paths.append(os.path.join(self.git_dir, "config"))
+        for path in paths:
+            content = _read_file(path)
+            if content is not None:
+                parse_config(content, values)
+        return values
+
+    # --- refs ---
+
+    def _read_ref(self, name, depth=0):
+        """Resolves a ref name to a raw sha, or None if it doesn't exist."""
+        if depth > 5:
+            raise InspectUnsupported("Symbolic ref loop.")
+        content = _read_file(os.path.join(self.git_dir, name))
+        if content is not None:
+            content = content.strip()
+            if content.startswith(b"ref: "):
+                return self._read_ref(content[5:].decode("utf-8", "surrogateescape"), depth + 1)
+            return bytes.fromhex(content.decode("ascii"))
+        packed = _read_file(os.path.join(self.git_dir, "packed-refs")) or b""
+        target = name.encode("utf-8", "surrogateescape")
+        for line in packed.splitlines():
+            if line[:1] in (b"#", b"^"):
+                continue
+            sha, _, ref = line.partition(b" ")
+            if ref == target:
+                return bytes.fromhex(sha.decode("ascii"))
+        return None
+
+    def _head_branch(self):
+        """Branch name HEAD points at, or None when detached."""
+        head = (_read_file(os.path.join(self.git_dir, "HEAD")) or b"").strip()
+        if head.startswith(b"ref: refs/heads/"):
+            return head[len(b"ref: refs/heads/") :].decode("utf-8", "surrogateescape")
+        return None
+
+    def _upstream_ref(self, config, branch):
+        """The remote-tracking ref @{u} resolves to, following the remote's fetch refspecs."""
+        remote = config.get(f"branch.{branch}.remote", [None])[-1]
+        merge = config.get(f"branch.{branch}.merge", [None])[-1]
+        if not remote or not merge:
+            return None
+        if remote == ".":
+            return merge
+        destination = None
+        for refspec in config.get(f"remote.{remote}.fetch", []):
+            if refspec.startswith("^"):
+                continue
+            source, _, target = refspec.lstrip("+").partition(":")
+            if "*" in source:
+                prefix, _, suffix = source.partition("*")
+                if merge.startswith(prefix) and merge.endswith(suffix) and len(merge) >= len(prefix) + len(suffix):
+                    destination = target.replace("*", merge[len(prefix) : len(merge) - len(suffix)], 1)
+            elif source == merge and target:
+                destination = target
+        return destination
+
+    # --- objects ---
+
+    def _refresh_packs(self):
+        pack_dir = os.path.join(self.objects_dir, "pack")
+        try:
+            stamp = os.stat(pack_dir).st_mtime_ns
+            names = os.listdir(pack_dir) if stamp != self._packs_stamp else None
+        except FileNotFoundError:
+            stamp, names = None, []
+        if names is None:
+            return
+        packs = {}
+        for name in names:
+            if name.endswith(".pack"):
+                path = os.path.join(pack_dir, name)
+                packs[path] = self._packs.get(path) or _Pack(path)
+        self._packs = packs
+        self._packs_stamp = stamp
+
+    def read_object(self, sha):
+        """Returns (type, data) for a raw 20-byte sha."""
+        loose = _read_file(os.path.join(self.objects_dir, sha[:1].hex(), sha[1:].hex()))
+        if loose is not None:
+            raw = zlib.decompress(loose)
+            header, _, data = raw.partition(b"\0")
+            return header.split(b" ", 1)[0], data
+        for _ in range(2):  # A gc may have repacked the object since we last listed the packs
+            for pack in self._packs.values():
+                offset = pack.find(sha)
+                if offset is not None:
+                    return pack.read(offset, self.read_object)
+            self._packs_stamp = None
+            self._refresh_packs()
+        raise InspectUnsupported(f"Object {sha.hex()} is missing.")
+
+    def _commit(self, sha):
+        commit = self._commits.get(sha)
+        if commit is None:
+            obj_type, data = self.read_object(sha)
+            if obj_type != b"commit":
+                raise InspectUnsupported(f"{sha.hex()} is not a commit.")
+            parents = []
+            commit_time = 0
+            for line in data.split(b"\n\n", 1)[0].split(b"\n"):
+                if line.startswith(b"parent "):
+                    parents.append(bytes.fromhex(line[7:].decode("ascii")))
+                elif line.startswith(b"committer "):
+                    commit_time = int(line.rsplit(b" ", 2)[1])
+            commit = self._commits[sha] = (commit_time, parents)
+        return commit
+
+    def _tree_entries(self, sha, prefix, out):
+        """Flattens a tree into {path: (mode, sha)} the way the index lists files."""
+        obj_type, data = self.read_object(sha)
+        if obj_type != b"tree":
+            raise InspectUnsupported(f"{sha.hex()} is not a tree.")
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            mode = int(data[pos:space], 8)
+            name = data[space + 1 : nul]
+            entry_sha = data[nul + 1 : nul + 21]
+            pos = nul + 21
+            if mode == 0o40000:
+                self._tree_entries(entry_sha, prefix + name + b"/", out)
+            else:
+                out[prefix + name] = (mode, entry_sha)
+        return out
+
+    # --- index ---
+
+    def _load_index(self):
+        """The parsed index, reparsed only when the file changed (git always replaces it with a new inode)."""
+        path = os.path.join(self.git_dir, "index")
+        try:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            stamp = None
+        if self._index is None or self._index.stamp != stamp:
+            entries, root_tree = self._read_index(path) if stamp else ([], None)
+            self._index = _IndexState(stamp, entries, root_tree, os.fsencode(self.worktree) + b"/")
+            self._clean_dirs = {}  # What counts as untracked depends on the index
+        return self._index
+
+    def _read_index(self, path):
+        """Returns (entries, root cache-tree sha or None) of an index file."""
+        with open(path, "rb") as f:
+            data = f.read()
+        signature, version, count = struct.unpack_from(">4sII", data, 0)
+        if signature != b"DIRC" or version not in (2, 3):
+            raise InspectUnsupported(f"Index version {version} is not supported.")
+        entries = []
+        pos = 12
+        for _ in range(count):
+            fields = struct.unpack_from(">10I20sH", data, pos)
+            flags = fields[11]
+            entry = _IndexEntry()
+            entry.ctime = fields[0] * 1_000_000_000 + fields[1]
+            entry.mtime = fields[2] * 1_000_000_000 + fields[3]
+            entry.ino = fields[5]
+            entry.mode = fields[6]
+            entry.size = fields[9]
+            entry.sha = fields[10]
+            entry.stage = (flags >> 12) & 3
+            entry.assume_valid = bool(flags & 0x8000)
+            entry.skip = entry.intent = False
+            name_at = pos + 62
+            if flags & 0x4000:
+                extended = struct.unpack_from(">H", data, name_at)[0]
+                entry.skip = bool(extended & 0x4000)
+                entry.intent = bool(extended & 0x2000)
+                name_at += 2
+            name_end = data.index(b"\0", name_at)
+            entry.path = data[name_at:name_end]
+            pos += ((name_end - pos) // 8 + 1) * 8  # Entries are NUL-padded to a multiple of 8
+            entries.append(entry)
+        root_tree = None
+        end = len(data) - 20  # Trailing checksum
+        while pos < end:
+            signature, size = struct.unpack_from(">4sI", data, pos)
+            body = data[pos + 8 : pos + 8 + size]
+            pos += 8 + size
+            if signature == b"TREE":
+                # Root entry: "\0<entry count> <subtrees>\n<sha>"; a count of -1 means invalidated.
+                header_end = body.index(b"\n")
+                entry_count = int(body[1:header_end].split(b" ")[0])
+                if body[:1] == b"\0" and entry_count >= 0:
+                    root_tree = body[header_end + 1 : header_end + 21]
+            elif signature not in _SKIPPABLE_EXTENSIONS and not signature[:1].isupper():
+                raise InspectUnsupported(f"Index extension {signature!r} is not supported.")
+        return entries, root_tree
+
+    # --- questions ---
+
+    def has_local_changes(self):
+        """What a non-empty `git status --porcelain` means: staged, unstaged or untracked changes."""
+        with self._lock:
+            config = self._check_layout()
+            self._refuse_content_rules(config)
+            index = self._load_index()
+            for path in index.attributes_files:
+                self._check_attributes(path)
+            if self._staged_changes(index.entries, index.root_tree):
+                return True
+            trust_filemode = _config_bool(config.get("core.filemode", [None])[-1], True)
+            if self._unstaged_changes(index, trust_filemode):
+                return True
+            show_untracked = config.get("status.showuntrackedfiles", ["normal"])[-1].lower()
+            if show_untracked in ("no", "false", "0"):
+                return False
+            return self._has_untracked(index.tracked, index.root, b"", time.time_ns() - RACY_WINDOW_NS)
+
+    def _refuse_content_rules(self, config):
+        """Ignore rules and content filters change what git reports; leave those stores to git."""
+        if _config_bool(config.get("core.ignorecase", [None])[-1], False):
+            raise InspectUnsupported("core.ignoreCase is set.")
+        if config.get("core.autocrlf", ["false"])[-1].lower() not in ("false", "0", "no", "off"):
+            raise InspectUnsupported("core.autocrlf is set.")
+        excludes = config.get("core.excludesfile", [None])[-1] or os.path.join(_config_home(), "git", "ignore")
+        attributes = config.get("core.attributesfile", [None])[-1] or os.path.join(_config_home(), "git", "attributes")
+        for path in (os.path.expanduser(excludes), os.path.join(self.git_dir, "info", "exclude")):
+            if _has_rules(path):
+                raise InspectUnsupported(f"Ignore rules in {path} are not supported.")
+        for path in (os.path.expanduser(attributes), os.path.join(self.git_dir, "info", "attributes")):
+            self._check_attributes(path)
+
+    @staticmethod
+    def _check_attributes(path):
+        """`pass git init` writes `*.gpg diff=gpg`, which is harmless; content-changing attributes are not."""
+        content = _read_file(path)
+        for line in (content or b"").decode("utf-8", "surrogateescape").splitlines():
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            if fields[0].startswith("[attr]"):
+                raise InspectUnsupported(f"Attribute macros in {path} are not supported.")
+            for attribute in fields[1:]:
+                if attribute.startswith("-"):
+                    continue  # Unsetting text/eol/filter only turns conversions off
+                if attribute.lstrip("!").split("=", 1)[0] in _CONTENT_ATTRIBUTES:
+                    raise InspectUnsupported(f"Content attributes in {path} are not supported.")
+
+    def _staged_changes(self, entries, cached_root_tree):
+        head = self._read_ref("HEAD")
+        if any(entry.stage or entry.intent for entry in entries):
+            return True  # Unmerged paths or `git add -N`
+        if head is None:
+            return bool(entries)
+        head_tree = bytes.fromhex(self.read_object(head)[1][5:45].decode("ascii"))
+        if cached_root_tree is not None:
+            # The index's cache-tree is valid: comparing root tree ids answers it without a walk.
+            return cached_root_tree != head_tree
+        tracked = {entry.path: (entry.mode, entry.sha) for entry in entries}
+        return tracked != self._tree_entries(head_tree, b"", {})
+
+    @staticmethod
+    def _unstaged_changes(index, trust_filemode):
+        """Stats every tracked file; only files whose stat data no longer matches the index are hashed."""
+        lstat = os.lstat
+        for path, expected, mode_bits, mode_mask, entry in index.checks:
+            try:
+                st = lstat(path)
+            except (FileNotFoundError, NotADirectoryError):
+                return True
+            if not trust_filemode:
+                mode_mask = 0o170000
+            if st.st_mode & mode_mask != mode_bits & mode_mask:
+                return True  # File type or executable bit changed
+            if (st.st_mtime_ns, st.st_ctime_ns, st.st_ino & 0xFFFFFFFF, st.st_size & 0xFFFFFFFF) == expected:
+                continue
+            if st.st_size & 0xFFFFFFFF != entry.size and entry.size:
+                return True
+            content = os.readlink(path) if stat.S_ISLNK(entry.mode) else _read_file(path)
+            if content is None or sha1(b"blob %d\0" % len(content) + content).digest() != entry.sha:
+                return True
+        return False
+
+    def _has_untracked(self, tracked, root, prefix, trusted_before):
+        """
+        True if any file under `prefix` is missing from the index (empty directories don't count).
+        Like git's untracked cache, a directory found clean is not listed again while its mtime
+        stays the same: adding a file to a directory always changes the directory's mtime.
+        """
+        try:
+            st = os.lstat(root + prefix)
+            scan = None
+            cached = self._clean_dirs.get(prefix)
+            if cached is not None and cached[0] == (st.st_mtime_ns, st.st_ino):
+                subdirs = cached[1]
+            else:
+                with os.scandir(root + prefix) as scan:
+                    entries = list(scan)
+        except OSError as e:
+            raise InspectUnsupported(str(e)) from e
+        if scan is not None:
+            subdirs = self._untracked_in(tracked, root, prefix, entries)
+            if subdirs is None:
+                return True
+            if st.st_mtime_ns < trusted_before:  # Not "racily clean": no same-tick change can hide
+                self._clean_dirs[prefix] = ((st.st_mtime_ns, st.st_ino), subdirs)
+        return any(self._has_untracked(tracked, root, subdir, trusted_before) for subdir in subdirs)
+
+    def _untracked_in(self, tracked, root, prefix, entries):
+        """Subdirectories of one listed directory, or None if it directly holds an untracked file."""
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            if name == b".git":
+                if prefix:
+                    raise InspectUnsupported("Nested repositories are not supported.")
+                continue
+            path = prefix + name
+            if name in (b".gitignore", b".gitattributes") and path not in tracked:
+                if name == b".gitignore":
+                    raise InspectUnsupported("Ignore rules in .gitignore are not supported.")
+                self._check_attributes(root + path)
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(path + b"/")
+            elif path not in tracked:
+                return None
+        return subdirs
+
+    def ahead_behind(self):
+        """
+        Same numbers as `git rev-list --left-right --count HEAD...@{u}`, or None when HEAD has no
+        upstream (detached, unborn, not configured, or the tracking ref doesn't exist yet).
+        """
+        with self._lock:
+            config = self._check_layout()
+            branch = self._head_branch()
+            if branch is None:
+                return None
+            upstream = self._upstream_ref(config, branch)
+            local_sha = self._read_ref(f"refs/heads/{branch}")
+            upstream_sha = self._read_ref(upstream) if upstream else None
+            if local_sha is None or upstream_sha is None:
+                return None
+            self._refresh_packs()
+            return self._count_apart(local_sha, upstream_sha)
+
+    def _count_apart(self, left, right):
+        """Walks both histories newest-first, painting commits by which tip reaches them."""
+        flags = {left: _LEFT}
+        flags[right] = flags.get(right, 0) | _RIGHT
+        queue = []
+        for sha in {left, right}:
+            heapq.heappush(queue, (-self._commit(sha)[0], sha))
+        slop = _WALK_SLOP
+        while queue:
+            if all(flags[sha] == _BOTH for _, sha in queue):
+                slop -= 1
+                if slop < 0:
+                    break
+            else:
+                slop = _WALK_SLOP
+            _, sha = heapq.heappop(queue)
+            flag = flags[sha]
+            for parent in self._commit(sha)[1]:
+                parent_flags = flags.get(parent, 0)
+                if parent_flags | flag != parent_flags:
+                    # New reachability: (re)visit so it propagates to the parent's own ancestors.
+                    flags[parent] = parent_flags | flag
+                    heapq.heappush(queue, (-self._commit(parent)[0], parent))
+        ahead = sum(1 for value in flags.values() if value == _LEFT)
+        behind = sum(1 for value in flags.values() if value == _RIGHT)
+        return ahead, behind
@@ -0,0 +1,91 @@
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+
+
+class EngineUnavailable(Exception):
+    """Raised when a decryption engine cannot be used here; callers fall back to `pass show`."""
+
+
+def gpg_binary():
+    """The gpg executable `pass` itself would pick: gpg2 when present, gpg otherwise."""
+    binary = shutil.which("gpg2") or shutil.which("gpg")
+    if binary is None:
+        raise EngineUnavailable("gpg is not installed.")
+    return binary
+
+
+def gpg_options():
+    """The options `pass` passes to every gpg call, including $PASSWORD_STORE_GPG_OPTS."""
+    options = shlex.split(os.environ.get("PASSWORD_STORE_GPG_OPTS", ""))
+    return options + ["--quiet", "--yes", "--compress-algo=none", "--no-encrypt-to", "--batch", "--use-agent"]
+
+
+class GpgEngine:
+    """Calls gpg directly, skipping the bash startup and option parsing of the `pass` script."""
+
+    name = "gpg"
+
+    def __init__(self):
+        self.binary = gpg_binary()
+        self.command = [self.binary, "-d", *gpg_options()]
+
+    def decrypt_file(self, path):
+        result = subprocess.run([*self.command, path], capture_output=True, check=True)
+        return result.stdout.decode("utf-8")
+
+    def encrypt_file(self, plaintext, recipients, path):
+        """Encrypts `plaintext` to every recipient into `path`, the way `pass insert` does."""
+        recipient_args = [arg for recipient in recipients for arg in ("-r", recipient)]
+        subprocess.run(
+            [self.binary, "-e", *recipient_args, "-o", path, *gpg_options()],
+            input=plaintext.encode("utf-8"),
+            capture_output=True,
+            check=True,
+        )
+
+
+class GpgmeEngine:
+    """Decrypts in-process through the gpgme Python bindings (`gpg` module), talking to gpg-agent."""
+
+    name = "gpgme"
+
+    def __init__(self):
+        try:
+            import gpg
+        except ImportError as e:
+            raise EngineUnavailable("gpgme bindings (python-gpg) are not installed.") from e
+        self._gpg = gpg
+        self._local = threading.local()  # gpgme contexts must not be shared between threads
+
+    def _context(self):
+        context = getattr(self._local, "context", None)
+        if context is None:
+            context = self._local.context = self._gpg.Context()
+        return context
+
+    def decrypt_file(self, path):
+        with open(path, "rb") as f:
+            plaintext, _, _ = self._context().decrypt(f, verify=False)
+        return plaintext.decode("utf-8")
+
+
+def create_engine(name):
+    """
+    Returns the engine called `name`, or None for "pass" (keep using `pass show`).
+    "auto" prefers gpgme and settles for a direct gpg call. Raises EngineUnavailable.
+    """
+    if name == "pass":
+        return None
+    if name == "gpgme":
+        return GpgmeEngine()
+    if name == "gpg":
+        return GpgEngine()
+    if name == "auto":
+        try:
+            return GpgmeEngine()
+        except EngineUnavailable:
+            return GpgEngine()
+    raise EngineUnavailable(f"Unknown decryption engine '{name}'.")
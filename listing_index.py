@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Bump when the on-disk record layout changes; older files are simply rebuilt.
+INDEX_FORMAT_VERSION = 1
+# A directory modified this recently may still change within the same mtime tick, so its record is
+# never trusted on the next run (same idea as git's "racily clean" index entries).
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def read_directory(path):
+    """Returns (subdirectories, secret names) of one directory, following symlinks like `find -L`."""
+    dirs = []
+    files = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            name = entry.name
+            try:
+                if entry.is_dir():
+                    if not name.startswith("."):  # .git, .extensions, ... are never entered
+                        dirs.append(name)
+                elif name.endswith(".gpg") and entry.is_file():
+                    files.append(name[: -len(".gpg")])
+            except OSError:
+                continue  # Dangling symlink or entry removed while we were walking
+    dirs.sort()
+    return dirs, files
+
+
+def store_key(store_path):
+    """Short stable name for a store, used to keep per-store cache and state files apart."""
+    return hashlib.sha1(os.path.realpath(store_path).encode("utf-8")).hexdigest()[:16]
+
+
+def store_file(directory, prefix, store_path, extension=".json"):
+    """Path of one store's `prefix` file in `directory`, named after a hash of the store's real path."""
+    return os.path.join(directory, f"{prefix}-{store_key(store_path)}{extension}")
+
+
+def write_private_json(path, data, fsync=False):
+    """
+    Replaces `path` with `data` as JSON, atomically (temporary file, then rename) and readable by its
+    owner only: secret names are private too. With `fsync`, the data is on disk before the rename.
+    Raises OSError, after removing the temporary file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _identity(stat_result):
+    return (stat_result.st_dev, stat_result.st_ino)
+
+
+class ListingIndex:
+    """
+    Directory listings of a password store, persisted between runs.
+    Every directory's record remembers the mtime/inode it was read at; a scan stats each directory
+    and only re-reads the ones whose record no longer matches. Adding or removing a secret changes
+    its directory's mtime, so a mostly unchanged store is listed without reading its directories.
+    With `cache_path=None` nothing is persisted and every scan is a plain single-pass walk.
+    """
+
+    def __init__(self, store_path, cache_path=None):
+        self.store_path = store_path
+        self.cache_path = cache_path
+        self._records = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_cache_path(store_path, cache_dir):
+        return store_file(cache_dir, "listing", store_path)
+
+    def scan(self, rebuild=False):
+        """Returns {namespace: [resource, ...]}; `rebuild` ignores every stored record."""
+        return dict(self.iter_scan(rebuild))
+
+    def iter_scan(self, rebuild=False):
+        """
+        Yields (namespace, sorted resources) in namespace order as the walk reaches them.
+        The index is only updated once the walk completes; closing the generator early keeps the old one.
+        """
+        with self._lock:
+            previous = {} if rebuild else self._load()
+            current = {}
+
+            root_stat = os.stat(self.store_path)
+            ancestors = {_identity(root_stat)}
+            root_dirs, _ = self._read(previous, current, "", self.store_path, root_stat)
+            for namespace in root_dirs:
+                path = os.path.join(self.store_path, namespace)
+                resources = []
+                try:
+                    self._collect(previous, current, namespace, path, "", ancestors, resources)
+                except OSError:
+                    continue
+                resources.sort()
+                yield namespace, resources
+
+            self._records = current
+            if current != previous:
+                self._save(current)
+
+    def _collect(self, previous, current, rel_path, path, prefix, ancestors, resources):
+        stat_result = os.stat(path)
+        identity = _identity(stat_result)
+        if identity in ancestors:
+            return  # Symlink loop back into one of our own parents
+        dirs, files = self._read(previous, current, rel_path, path, stat_result)
+        resources.extend(prefix + name for name in files)
+        ancestors.add(identity)
+        for name in dirs:
+            try:
+                self._collect(
+                    previous,
+                    current,
+                    f"{rel_path}/{name}",
+                    os.path.join(path, name),
+                    f"{prefix}{name}/",
+                    ancestors,
+                    resources,
+                )
+            except OSError:
+                continue
+        ancestors.discard(identity)
+
+    def _read(self, previous, current, rel_path, path, stat_result):
+        record = previous.get(rel_path)
+        stamp = [stat_result.st_mtime_ns, stat_result.st_ino, stat_result.st_dev]
+        if record is None or record["stamp"] != stamp:
+            dirs, files = read_directory(path)
+            if time.time_ns() - stat_result.st_mtime_ns < RACY_WINDOW_NS:
+                stamp = None
+            record = {"stamp": stamp, "dirs": dirs, "files": files}
+        current[rel_path] = record
+        return record["dirs"], record["files"]
+
+    def _load(self):
+        if self._records is not None:
+            return self._records
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_FORMAT_VERSION or data.get("store") != self.store_path:
+            return {}
+        return data.get("records", {})
+
+    def _save(self, records):
+        if not self.cache_path:
+            return
+        try:
+            write_private_json(
+                self.cache_path, {"version": INDEX_FORMAT_VERSION, "store": self.store_path, "records": records}
+            )
+        except OSError:
+            pass  # The index is only an accelerator; a read-only cache dir must not break listing.
+
+
+def scan_store(store_path):
+    """Uncached single-pass walk of the store: {namespace: [resource, ...]}."""
+    return ListingIndex(store_path).scan()
@@ -0,0 +1,46 @@
+import json
+
+from listing_index import store_file, write_private_json
+
+# Bump when the file layout changes; snapshots in an older layout are ignored.
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def snapshot_path(store_path, cache_dir):
+    return store_file(cache_dir, "snapshot", store_path)
+
+
+def load_snapshot(path, store_path):
+    """
+    ({namespace: [resource, ...]}, {namespace: color}) as last saved for this store, or None if there
+    is no usable snapshot.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != SNAPSHOT_FORMAT_VERSION or data.get("store") != store_path:
+        return None
+    namespaces = data.get("namespaces")
+    colors = data.get("colors")
+    if not isinstance(namespaces, dict) or not isinstance(colors, dict):
+        return None
+    return namespaces, colors
+
+
+def save_snapshot(path, store_path, namespace_resources, namespace_colors):
+    """
+    Writes the names the GUI lists (never any contents) so the next start can show them at once.
+    Failures are ignored: the snapshot only makes the first paint faster.
+    """
+    data = {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "store": store_path,
+        "namespaces": namespace_resources,
+        "colors": namespace_colors,
+    }
+    try:
+        write_private_json(path, data)
+    except OSError:
+        pass
@@ -0,0 +1,170 @@
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+
+from listing_index import store_file
+
+# Bump when the decrypted layout changes; older blobs are simply dropped and rebuilt.
+INDEX_FORMAT_VERSION = 1
+# Fields whose key has one of these words are treated as secret and never indexed. Keys are split into
+# words at anything but letters and digits and at camelCase humps: "api_key" and "apiKey" are secret,
+# "keyboard layout" and "passport" aren't. Common run-together keys are listed whole.
+SECRET_FIELD_WORDS = frozenset(
+    {
+        "pass", "password", "passwd", "passphrase", "passcode", "pwd", "pin", "secret", "otp", "totp",
+        "otpauth", "token", "key", "apikey", "privatekey", "cvv", "cvc",
+    }
+)  # fmt: skip
+_KEY_WORDS = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+")
+# Changes are written out at most this many seconds after they are made (and when the session closes),
+# which is also how much indexing progress a crash can lose.
+SAVE_DELAY_SECONDS = 5.0
+
+
+def metadata_fields(data):
+    """
+    The searchable part of a parsed secret ([["secret", ...], [key, value], ...]): its key/value
+    lines without the first-line secret and without fields whose key looks secret (password, otpauth, ...).
+    """
+    fields = []
+    for key, value in data[1:]:
+        words = {word.lower() for word in _KEY_WORDS.findall(key)}
+        if SECRET_FIELD_WORDS.isdisjoint(words):
+            fields.append([key, value])
+    return fields
+
+
+def metadata_text(fields):
+    """Lower-cased "key: value" lines of `fields`, what search matches against."""
+    return "\n".join(f"{key}: {value}" for key, value in fields).lower()
+
+
+def file_stamp(path):
+    """(mtime_ns, size) of a .gpg file, or None if it is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class MetadataIndex:
+    """
+    The non-secret fields of every secret seen so far, kept as one gpg-encrypted blob so searching
+    them never needs a decryption per file. The blob is decrypted once, on first use; after that
+    the index is updated in memory as secrets are shown, saved and deleted, and re-encrypted
+    SAVE_DELAY_SECONDS after the first unsaved change (or on flush()).
+
+    Every entry remembers the (mtime, size) of the .gpg file its fields came from, and entries
+    whose file changed or disappeared are dropped instead of being served stale.
+    `engine` is a GpgEngine; `recipients` returns the key ids the blob is encrypted to.
+    """
+
+    def __init__(self, store_path, index_path, engine, recipients):
+        self.store_path = store_path
+        self.index_path = index_path
+        self.engine = engine
+        self.recipients = recipients
+        self._entries = None  # "namespace/resource" -> {"namespace", "resource", "stamp": [mtime_ns, size], "fields"}
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def default_path(store_path, cache_dir):
+        return store_file(cache_dir, "metadata", store_path, ".gpg")
+
+    def entries(self):
+        """[{"namespace", "resource", "fields"}, ...] of the entries whose .gpg file is unchanged since indexing."""
+        with self._lock:
+            entries = self._load()
+            result = []
+            for name, entry in list(entries.items()):
+                if file_stamp(self._secret_path(entry)) != entry["stamp"]:
+                    del entries[name]
+                    self._changed()
+                    continue
+                result.append({key: entry[key] for key in ("namespace", "resource", "fields")})
+            return result
+
+    def is_current(self, namespace, resource):
+        """Whether the secret's fields are indexed from its current .gpg file."""
+        with self._lock:
+            entry = self._load().get(f"{namespace}/{resource}")
+            return entry is not None and entry["stamp"] == file_stamp(self._secret_path(entry))
+
+    def update(self, namespace, resource, stamp, data):
+        """Indexes a secret decrypted (or written) from a .gpg file with `stamp`."""
+        if stamp is None:
+            return
+        entry = {"namespace": namespace, "resource": resource, "stamp": stamp, "fields": metadata_fields(data)}
+        with self._lock:
+            entries = self._load()
+            if entries.get(f"{namespace}/{resource}") != entry:
+                entries[f"{namespace}/{resource}"] = entry
+                self._changed()
+
+    def remove(self, namespace, resource):
+        with self._lock:
+            if self._load().pop(f"{namespace}/{resource}", None) is not None:
+                self._changed()
+
+    def flush(self):
+        """Writes pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._dirty:
+                self._save()
+
+    def _secret_path(self, entry):
+        return os.path.join(self.store_path, entry["namespace"], f"{entry['resource']}.gpg")
+
+    def _changed(self):
+        self._dirty = True
+        if self._timer is not None:
+            return  # A save is already scheduled; steady indexing still checkpoints every SAVE_DELAY_SECONDS
+        self._timer = threading.Timer(SAVE_DELAY_SECONDS, self._flush_when_idle)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_when_idle(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Saving the metadata index failed, will retry on the next change: {e}", file=sys.stderr)
+
+    def _load(self):
+        if self._entries is not None:
+            return self._entries
+        self._entries = {}
+        if not os.path.exists(self.index_path):
+            return self._entries
+        try:
+            data = json.loads(self.engine.decrypt_file(self.index_path))
+        except Exception:
+            return self._entries  # Unreadable (other key, corrupted): start over, the next save replaces it
+        if data.get("version") == INDEX_FORMAT_VERSION and data.get("store") == self.store_path:
+            self._entries = data.get("entries", {})
+        return self._entries
+
+    def _save(self):
+        payload = json.dumps(
+            {"version": INDEX_FORMAT_VERSION, "store": self.store_path, "entries": self._entries},
+            separators=(",", ":"),
+        )
+        directory = os.path.dirname(self.index_path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metadata-", suffix=".tmp")
+        os.close(fd)
+        try:
+            self.engine.encrypt_file(payload, self.recipients(), tmp_path)
+            os.replace(tmp_path, self.index_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._dirty = False
@@ -0,0 +1,89 @@
+from array import array
+from bisect import bisect_left
+
+# Length of the indexed substrings. Shorter query terms can't be looked up and are scanned instead.
+GRAM_SIZE = 3
+
+
+def grams(text):
+    """The distinct GRAM_SIZE-character substrings of `text`."""
+    return {text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class NgramIndex:
+    """
+    Inverted index from every trigram to the ids of the strings containing it, for substring search
+    that only looks at strings sharing the query's trigrams instead of scanning them all.
+
+    Strings get increasing integer ids from add(), so posting lists (array("I"), 4 bytes per entry)
+    stay sorted by appending. remove() drops an id from the lists of its trigrams; ids are never
+    reused. Callers pass strings already normalized (lower-cased) the way they will be searched.
+    """
+
+    def __init__(self):
+        self._postings = {}  # gram -> array("I") of ids, ascending
+        self._texts = []  # id -> text, None once removed
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, text):
+        """Indexes `text` and returns its id."""
+        doc_id = len(self._texts)
+        self._texts.append(text)
+        self._count += 1
+        postings = self._postings
+        for gram in grams(text):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = posting = array("I")
+            posting.append(doc_id)
+        return doc_id
+
+    def remove(self, doc_id):
+        text = self._texts[doc_id]
+        if text is None:
+            return
+        self._texts[doc_id] = None
+        self._count -= 1
+        for gram in grams(text):
+            posting = self._postings[gram]
+            del posting[bisect_left(posting, doc_id)]
+            if not posting:
+                del self._postings[gram]
+
+    def stats(self):
+        """(number of distinct trigrams, bytes held by the posting lists)."""
+        postings = self._postings.values()
+        return len(postings), sum(posting.itemsize * len(posting) for posting in postings)
+
+    def search(self, term):
+        """
+        Ascending ids of the strings containing `term`, or None if `term` is shorter than GRAM_SIZE
+        (the index can't narrow it down). The rarest trigram's posting list is intersected with the
+        others, and the survivors are checked for the whole term, so the work grows with the number
+        of candidates rather than with the number of strings.
+        """
+        needed = grams(term)
+        if not needed:
+            return None
+        postings = []
+        for gram in needed:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = [doc_id for doc_id in candidates if _contains(posting, doc_id)]
+            if not candidates:
+                return []
+        texts = self._texts
+        return [doc_id for doc_id in candidates if term in texts[doc_id]]
+
+
+def _contains(posting, doc_id):
+    index = bisect_left(posting, doc_id)
+    return index < len(posting) and posting[index] == doc_id
@@ -1,8 +1,11 @@
+import inspect
 import json
 import os
-import subprocess
 import sys
-from collections import defaultdict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pass_store import InvalidRecord, PassStore, error_message
 
 # --- CONFIGURATION ---
 # Respect the PASSWORD_STORE_DIR environment variable, just like `pass` does.
@@ -12,243 +15,393 @@ if store_dir_from_env:
 else:
     PASSWORD_STORE_PATH = os.path.expanduser("~/.password-store")
 
+# Caches (never secret contents) live under $XDG_CACHE_HOME/pass-kb.
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "pass-kb")
+# Set PASS_KB_LISTING_INDEX=0 to always walk the whole store instead of reusing the on-disk index.
+LISTING_INDEX_ENABLED = os.environ.get("PASS_KB_LISTING_INDEX", "1") != "0"
+
+# How `show` decrypts: "pass" (run `pass show`), "gpg" (call gpg directly), "gpgme" (in-process
+# bindings) or "auto" (gpgme, else gpg). Every engine falls back to `pass show` when it can't be used.
+DECRYPT_ENGINE = os.environ.get("PASS_KB_DECRYPT_ENGINE", "pass")
+
+# Write-behind commits (PASS_KB_COALESCE_COMMITS=1): saves made through `serve` land in the working
+# tree at once but are committed together after PASS_KB_COMMIT_IDLE seconds without further saves.
+COALESCE_COMMITS = os.environ.get("PASS_KB_COALESCE_COMMITS") == "1"
+COMMIT_IDLE_SECONDS = float(os.environ.get("PASS_KB_COMMIT_IDLE", "30"))
+# git-status refreshes remote-tracking refs with a fetch at most this often (seconds).
+FETCH_INTERVAL_SECONDS = float(os.environ.get("PASS_KB_FETCH_INTERVAL", "300"))
+FETCH_TIMEOUT_SECONDS = 30
+# git-status reads the repository in-process where it can; PASS_KB_GIT_INSPECT=0 always runs git.
+GIT_INSPECT_ENABLED = os.environ.get("PASS_KB_GIT_INSPECT", "1") != "0"
+# Small state that must outlive a crash (the pending-commit journal) lives under $XDG_STATE_HOME/pass-kb.
+STATE_DIR = os.path.join(os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state"), "pass-kb")
+
+# PASS_KB_METADATA_INDEX=1 keeps the non-secret fields of shown/saved secrets in a gpg-encrypted
+# index under CACHE_DIR, so search can match them without decrypting every file.
+METADATA_INDEX_ENABLED = os.environ.get("PASS_KB_METADATA_INDEX") == "1"
+
+# Default size of the decryption pool used by `show-many`.
+SHOW_WORKERS = int(os.environ.get("PASS_KB_SHOW_WORKERS", "4"))
+
+# Wire protocol spoken by `serve`. Bump when request/response frames change incompatibly.
+PROTOCOL_VERSION = 1
+# How many requests `serve` works on at once.
+SERVE_WORKERS = 8
+
+_store = None
+
 # --- HELPER FUNCTIONS ---
 
 
+def encode(obj, pretty=False):
+    """Serializes a response; compact unless a human asked for --pretty."""
+    if pretty:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
+
+
 def handle_error(e, status_msg="error"):
     """Prints a JSON error message to stderr and exits."""
-    message = e.stderr.strip() if isinstance(e, subprocess.CalledProcessError) and e.stderr else str(e)
-    print(json.dumps({"status": status_msg, "message": message}, indent=2), file=sys.stderr)
+    print(encode({"status": status_msg, "message": error_message(e)}), file=sys.stderr)
     sys.exit(1)
 
 
-# --- COMMAND IMPLEMENTATIONS ---
+def get_store():
+    """The PassStore configured from the environment, shared by every command of this process."""
+    global _store
+    if _store is None:
+        _store = PassStore(
+            PASSWORD_STORE_PATH,
+            cache_dir=CACHE_DIR if LISTING_INDEX_ENABLED else None,
+            state_dir=STATE_DIR,
+            decrypt_engine=DECRYPT_ENGINE,
+            show_workers=SHOW_WORKERS,
+            git_inspect=GIT_INSPECT_ENABLED,
+            fetch_interval=FETCH_INTERVAL_SECONDS,
+            fetch_timeout=FETCH_TIMEOUT_SECONDS,
+            coalesce_commits=COALESCE_COMMITS,
+            commit_idle_seconds=COMMIT_IDLE_SECONDS,
+            metadata_dir=CACHE_DIR if METADATA_INDEX_ENABLED else None,
+        )
+    return _store
 
 
-def list_secrets():
-    """Lists secrets by finding .gpg files in the real password store."""
-    try:
-        # FIX: Handle case where password store does not exist.
-        if not os.path.isdir(PASSWORD_STORE_PATH):
-            print(json.dumps([]))  # Return empty list if store is not initialized
-            return
+# --- COMMAND IMPLEMENTATIONS ---
+# Each command takes the decoded request payload (or None) and returns a JSON-serializable result,
+# or a generator of result batches for streaming commands. They only translate between payloads
+# and PassStore calls; errors are raised and the CLI and `serve` front-ends below report them.
 
-        # Add -L to follow symbolic links, as the password store can be a symlink.
-        cmd = ["find", "-L", PASSWORD_STORE_PATH, "-type", "f", "-name", "*.gpg"]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        paths = result.stdout.strip().split("\n")
 
-        namespaces_map = defaultdict(list)
-        base_path = os.path.join(PASSWORD_STORE_PATH, "")
+def list_secrets(data=None):
+    """
+    Lists secrets by walking the .gpg files of the real password store.
+    Only directories changed since the last listing are re-read; {"rebuild": true} rescans everything.
+    With {"stream": true} it streams one {"namespace", "resources"} item per namespace as the walk
+    reaches it, in the same order as the full list.
+    """
+    data = data or {}
+    namespaces = get_store().iter_list(rebuild=bool(data.get("rebuild")))
+    if data.get("stream"):
+        return _batches(namespaces)
+    return list(namespaces)
 
-        for path in paths:
-            if not path:
-                continue
-            relative_path = path.replace(base_path, "", 1)
-            resource_path = relative_path.replace(".gpg", "", 1)
-            if os.path.sep not in resource_path:
-                continue
-            parts = resource_path.split(os.path.sep, 1)
-            namespaces_map[parts[0]].append(parts[1])
 
-        dir_cmd = ["find", "-L", PASSWORD_STORE_PATH, "-mindepth", "1", "-maxdepth", "1", "-type", "d"]
-        dir_result = subprocess.run(dir_cmd, capture_output=True, text=True, check=True)
+def show_secret(data):
+    """Shows a secret, decrypting it with the configured engine or by calling `pass show`."""
+    return get_store().show(data["namespace"], data["resource"])
 
-        for dir_path in dir_result.stdout.strip().split("\n"):
-            if not dir_path:
-                continue
-            namespace = os.path.basename(dir_path)
-            if namespace not in namespaces_map:
-                namespaces_map[namespace] = []
 
-        output_json = [{"namespace": ns, "resources": res} for ns, res in sorted(namespaces_map.items())]
-        print(json.dumps(output_json, indent=2))
+def _batches(items):
+    """Streams a PassStore generator as one-item batches; closing the stream closes the generator."""
+    try:
+        for item in items:
+            yield [item]
+    finally:
+        items.close()
 
-    except Exception as e:
-        handle_error(e)
 
+def show_many(data):
+    """
+    Decrypts {"items": [{"namespace", "resource"}, ...]} on a pool of {"workers": n} threads and
+    streams one result per secret as soon as it is decrypted, in completion order.
+    """
+    return _batches(get_store().show_many(data["items"], data.get("workers")))
 
-def show_secret():
-    """Shows a secret by calling `pass show`."""
-    try:
-        data = json.load(sys.stdin)
-        secret_path = os.path.join(data["namespace"], data["resource"])
-        result = subprocess.run(["pass", "show", secret_path], capture_output=True, text=True, check=True)
-        content = result.stdout.strip()
-        lines = content.split("\n")
-
-        # The first line is always the secret
-        secret_data = [["secret", lines[0]]]
-
-        # Subsequent lines are key-value pairs
-        for line in lines[1:]:
-            if ":" in line:
-                key, value = line.split(":", 1)
-                secret_data.append([key.strip(), value.strip()])
-            # You could add an else here to handle non-kv lines if needed
-
-        print(json.dumps(secret_data, indent=2))
-    except Exception as e:
-        handle_error(e)
 
+def secret_metadata(data=None):
+    """
+    The metadata index: {"enabled": bool, "entries": [{"namespace", "resource", "fields": [[key, value], ...]}]}.
+    Fields are the key/value lines of secrets shown or saved so far, minus the secret and secret-looking fields.
+    """
+    store = get_store()
+    return {"enabled": store.metadata_index() is not None, "entries": store.metadata()}
 
-def create_secret():
-    """Creates a secret by calling `pass insert`."""
-    try:
-        data = json.load(sys.stdin)
-        secret_path = os.path.join(data["namespace"], data["resource"])
-        if "/" in data["resource"] or "'" in data["resource"]:
-            raise ValueError("Resource name cannot contain slashes.")
-        subprocess.run(["pass", "insert", "--multiline", secret_path], input=data["content"], text=True, check=True)
-        print(json.dumps({"status": "success", "path": secret_path}, indent=2))
-    except Exception as e:
-        handle_error(e)
+
+def create_secret(data):
+    """Creates (or overwrites) a secret by calling `pass insert`."""
+    path = get_store().insert(data["namespace"], data["resource"], data["content"])
+    return {"status": "success", "path": path}
 
 
-def edit_secret():
+def edit_secret(data):
     """Edits a secret by calling `pass edit`."""
-    try:
-        data = json.load(sys.stdin)
-        secret_path = os.path.join(data["namespace"], data["resource"])
-        subprocess.run(["pass", "edit", secret_path], check=True)
-        print(
-            json.dumps({"status": "success", "message": f"Successfully launched editor for '{secret_path}'"}, indent=2)
-        )
-    except Exception as e:
-        handle_error(e)
+    get_store().edit(data["namespace"], data["resource"])
+    secret_path = os.path.join(data["namespace"], data["resource"])
+    return {"status": "success", "message": f"Successfully launched editor for '{secret_path}'"}
 
 
-def delete_secret():
+def delete_secret(data):
     """Deletes a secret by calling `pass rm --force`."""
-    try:
-        data = json.load(sys.stdin)
-        secret_path = os.path.join(data["namespace"], data["resource"])
-        subprocess.run(["pass", "rm", "--force", secret_path], check=True)
-        print(json.dumps({"status": "success", "message": f"Secret '{secret_path}' deleted."}, indent=2))
-    except Exception as e:
-        handle_error(e)
+    get_store().remove(data["namespace"], data["resource"])
+    secret_path = os.path.join(data["namespace"], data["resource"])
+    return {"status": "success", "message": f"Secret '{secret_path}' deleted."}
 
 
-def git_push():
+def import_secrets(data):
+    """
+    Bulk import of a stream of {"namespace", "resource", "content"} records, committed once at the end;
+    {"force": true} overwrites existing secrets. Streams one event per record, then a "done" event.
+    """
+    return _batches(get_store().import_secrets(data["records"], bool(data.get("force")), data.get("workers")))
+
+
+def git_push(data=None):
     """Push local changes to remote git repository."""
-    try:
-        result = subprocess.run(["pass", "git", "push"], capture_output=True, text=True, check=True)
-        output = result.stdout.strip() + result.stderr.strip()
-        print(
-            json.dumps({"status": "success", "message": "Successfully pushed to remote.", "output": output}, indent=2)
-        )
-    except subprocess.CalledProcessError as e:
-        # Check if it's just "Everything up-to-date"
-        if "up-to-date" in e.stderr.lower() or "up-to-date" in e.stdout.lower():
-            print(
-                json.dumps(
-                    {"status": "success", "message": "Already up to date.", "output": e.stderr + e.stdout}, indent=2
-                )
-            )
-        else:
-            handle_error(e)
-    except Exception as e:
-        handle_error(e)
+    return {"status": "success", **get_store().git_push()}
 
 
-def git_pull():
+def git_pull(data=None):
     """Pull changes from remote git repository."""
+    return {"status": "success", **get_store().git_pull()}
+
+
+def git_status(data=None):
+    """
+    Check git status of password store.
+    {"fetch": "auto"} fetches only when the remote-tracking info is older than FETCH_INTERVAL_SECONDS,
+    "force" fetches anyway and "never" stays local.
+    """
     try:
-        result = subprocess.run(["pass", "git", "pull", "--rebase"], capture_output=True, text=True, check=True)
-        output = result.stdout.strip() + result.stderr.strip()
-        print(
-            json.dumps({"status": "success", "message": "Successfully pulled from remote.", "output": output}, indent=2)
-        )
-    except subprocess.CalledProcessError as e:
-        # Check if it's just "Already up to date"
-        if "up to date" in e.stderr.lower() or "up to date" in e.stdout.lower():
-            print(
-                json.dumps(
-                    {"status": "success", "message": "Already up to date.", "output": e.stderr + e.stdout}, indent=2
-                )
-            )
-        else:
-            handle_error(e)
+        return {"status": "success", **get_store().git_status((data or {}).get("fetch", "auto"))}
     except Exception as e:
-        handle_error(e)
+        # If git is not configured, return a neutral status
+        return {
+            "status": "success",
+            "has_local_changes": False,
+            "ahead": 0,
+            "behind": 0,
+            "has_remote": False,
+            "needs_push": False,
+            "needs_pull": False,
+            "error": error_message(e),
+        }
 
 
-def git_status():
-    """Check git status of password store."""
+def watch_store(data=None):
+    """
+    Streams listing deltas (added/removed/renamed entries) as the store changes on disk, via inotify.
+    Yields batches; an empty batch is an idle heartbeat that lets the caller stop the stream.
+    """
+    return get_store().watch()
+
+
+def read_records(stream):
+    """
+    Lazily decodes newline-delimited JSON records, so an import can start before its input ends.
+    A line that isn't valid JSON becomes an InvalidRecord, reported as that record's error.
+    """
+    for line in stream:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield InvalidRecord(f"Invalid JSON: {e}")
+
+
+# Command name -> (implementation, what the CLI reads from stdin: None, "json" or "records")
+COMMANDS = {
+    "list": (list_secrets, None),
+    "show": (show_secret, "json"),
+    "show-many": (show_many, "json"),
+    "metadata": (secret_metadata, None),
+    "create": (create_secret, "json"),
+    "edit": (edit_secret, "json"),
+    "delete": (delete_secret, "json"),
+    "git-push": (git_push, None),
+    "git-pull": (git_pull, None),
+    "git-status": (git_status, None),
+    "watch": (watch_store, None),
+    "import": (import_secrets, "records"),
+}
+# Streams that never end on their own; closing the backend cancels them instead of waiting.
+OPEN_ENDED_COMMANDS = frozenset({"watch"})
+# Commands that don't change the store, so running them twice is harmless.
+READ_ONLY_COMMANDS = frozenset({"list", "show", "show-many", "metadata", "git-status", "watch"})
+
+
+# --- FRONT-ENDS ---
+
+
+def run_command(command, pretty=False, data=None):
+    """
+    Runs a single command the classic way: payload from stdin, JSON result on stdout.
+    Streaming commands print one JSON line per item instead, as the items are produced.
+    """
+    handler, input_kind = COMMANDS[command]
     try:
-        # Check if there are uncommitted changes
-        result = subprocess.run(["pass", "git", "status", "--porcelain"], capture_output=True, text=True, check=True)
-        has_local_changes = bool(result.stdout.strip())
-
-        # Check if local is ahead/behind remote
-        subprocess.run(["pass", "git", "fetch"], capture_output=True, text=True)
-        rev_list_result = subprocess.run(
-            ["pass", "git", "rev-list", "--left-right", "--count", "HEAD...@{u}"], capture_output=True, text=True
-        )
+        if input_kind == "json":
+            data = json.load(sys.stdin)
+        elif input_kind == "records":
+            data = {**(data or {}), "records": read_records(sys.stdin)}
+        result = handler(data)
+        if inspect.isgenerator(result):
+            for batch in result:
+                for item in batch:
+                    print(encode(item), flush=True)
+            return
+    except KeyboardInterrupt:
+        return
+    except Exception as e:
+        handle_error(e)
+    finally:
+        get_store().close()  # Writes out what this one command changed (metadata index)
+    print(encode(result, pretty))
 
-        ahead = 0
-        behind = 0
-        has_remote = True
 
-        if rev_list_result.returncode == 0:
-            counts = rev_list_result.stdout.strip().split()
-            if len(counts) == 2:
-                ahead = int(counts[0])
-                behind = int(counts[1])
-        else:
-            # No remote configured or can't reach it
-            has_remote = False
+def dispatch_request(request, respond, cancelled=None):
+    """
+    Runs one decoded request and reports it through `respond(frame)`. Never raises.
+    Streaming commands (generators) send a {"status": "stream"} frame per non-empty batch before
+    the final frame, and stop early once `cancelled` is set; the final frame of a stream cut short
+    that way is {"status": "cancelled"}, so it can't be mistaken for a complete one.
+    """
+    request_id = request.get("id")
 
-        status_info = {
-            "status": "success",
-            "has_local_changes": has_local_changes,
-            "ahead": ahead,
-            "behind": behind,
-            "has_remote": has_remote,
-            "needs_push": ahead > 0 or has_local_changes,
-            "needs_pull": behind > 0,
-        }
+    def frame(**fields):
+        return {"v": PROTOCOL_VERSION, "id": request_id, **fields}
 
-        print(json.dumps(status_info, indent=2))
+    try:
+        if request.get("v") != PROTOCOL_VERSION:
+            raise ValueError(f"Unsupported protocol version {request.get('v')!r}, expected {PROTOCOL_VERSION}.")
+        command = request.get("command")
+        if command not in COMMANDS:
+            raise ValueError(f"Command '{command}' not implemented yet.")
+        handler, _ = COMMANDS[command]
+        result = handler(request.get("data"))
+        if inspect.isgenerator(result):
+            try:
+                for batch in result:
+                    if cancelled is not None and cancelled.is_set():
+                        respond(frame(status="cancelled"))
+                        return
+                    if batch:
+                        respond(frame(status="stream", result=batch))
+            finally:
+                result.close()
+            result = None
+        respond(frame(status="success", result=result))
     except Exception as e:
-        # If git is not configured, return a neutral status
-        print(
-            json.dumps(
-                {
-                    "status": "success",
-                    "has_local_changes": False,
-                    "ahead": 0,
-                    "behind": 0,
-                    "has_remote": False,
-                    "needs_push": False,
-                    "needs_pull": False,
-                    "error": str(e),
-                },
-                indent=2,
-            )
-        )
+        respond(frame(status="error", message=error_message(e)))
+
+
+def serve():
+    """
+    Long-lived mode speaking versioned JSON lines on stdin/stdout.
+    Request:  {"v": 1, "id": 7, "command": "show", "data": {...}}
+    Response: {"v": 1, "id": 7, "status": "success", "result": ...}
+          or  {"v": 1, "id": 7, "status": "error", "message": "..."}
+    Streaming commands first send any number of {"v": 1, "id": 7, "status": "stream", "result": [...]}
+    frames; {"command": "cancel", "data": {"id": 7}} ends such a stream early, with a final
+    {"v": 1, "id": 7, "status": "cancelled"} frame.
+    Requests are handled concurrently, so responses may arrive out of order; clients match them by id.
+    A failing request only produces an error frame. Runs until stdin is closed.
+    """
+    requests_in = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    responses_out = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    output_lock = threading.Lock()
+    streams = {}  # request id -> (Event that cancels it, command)
+    streams_lock = threading.Lock()
+
+    # `pass`, `git` and editors inherit fds 0/1. Keep them away from the protocol pipes so a stray
+    # prompt or commit summary can neither swallow a request nor corrupt the response stream.
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.dup2(2, 1)
+
+    def respond(frame):
+        line = encode(frame) + "\n"
+        with output_lock:
+            responses_out.write(line)
+            responses_out.flush()
+
+    def work(request, cancelled):
+        try:
+            dispatch_request(request, respond, cancelled)
+        finally:
+            with streams_lock:
+                streams.pop(request.get("id"), None)
+
+    def cancel(request):
+        target = (request.get("data") or {}).get("id")
+        with streams_lock:
+            event, _ = streams.get(target, (None, None))
+        if event is not None:
+            event.set()
+        respond({"v": PROTOCOL_VERSION, "id": request.get("id"), "status": "success", "result": event is not None})
+
+    # Saves journaled by a backend that crashed are committed first, even if coalescing is now off.
+    get_store().open_session()
+
+    with ThreadPoolExecutor(max_workers=SERVE_WORKERS) as pool:
+        for line in requests_in:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object.")
+            except ValueError as e:
+                respond({"v": PROTOCOL_VERSION, "id": None, "status": "error", "message": f"Malformed request: {e}"})
+                continue
+            if request.get("command") == "cancel":
+                cancel(request)
+                continue
+            cancelled = threading.Event()
+            with streams_lock:
+                streams[request.get("id")] = (cancelled, request.get("command"))
+            pool.submit(work, request, cancelled)
+
+        # stdin closed: end open-ended streams so the pool can drain and the process exit. Finite
+        # ones (show-many, import, list) run to completion.
+        with streams_lock:
+            for event, command in streams.values():
+                if command in OPEN_ENDED_COMMANDS:
+                    event.set()
+
+    get_store().close()
 
 
 def main():
     """Main command router."""
     if len(sys.argv) < 2:
-        print(
-            f"Usage: python {sys.argv[0]} [list|show|create|edit|delete|git-push|git-pull|git-status]", file=sys.stderr
-        )
+        commands = "|".join([*COMMANDS, "serve"])
+        flags = "[--pretty] [--rebuild] [--stream] [--force] [--fetch|--no-fetch]"
+        print(f"Usage: python {sys.argv[0]} [{commands}] {flags}", file=sys.stderr)
         sys.exit(1)
     command = sys.argv[1]
-    actions = {
-        "list": list_secrets,
-        "show": show_secret,
-        "create": create_secret,
-        "edit": edit_secret,
-        "delete": delete_secret,
-        "git-push": git_push,
-        "git-pull": git_pull,
-        "git-status": git_status,
-    }
-    if command in actions:
-        actions[command]()
+    pretty = "--pretty" in sys.argv[2:]
+    if command == "serve":
+        serve()
+    elif command == "list":
+        run_command(command, pretty, {"rebuild": "--rebuild" in sys.argv[2:], "stream": "--stream" in sys.argv[2:]})
+    elif command == "import":
+        run_command(command, pretty, {"force": "--force" in sys.argv[2:]})
+    elif command == "git-status":
+        fetch = "force" if "--fetch" in sys.argv[2:] else "never" if "--no-fetch" in sys.argv[2:] else "auto"
+        run_command(command, pretty, {"fetch": fetch})
+    elif command in COMMANDS:
+        run_command(command, pretty)
     else:
         print(f"Command '{command}' not implemented yet.", file=sys.stderr)
         sys.exit(1)
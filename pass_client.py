@@ -1,15 +1,19 @@
+import bisect
+import queue
 import sys
+import threading
+import time
 
-from PySide6.QtCore import QEvent, Qt, QThread, QTimer, Signal
+from PySide6.QtCore import SLOT, QEvent, QObject, Qt, QThread, QTimer, Signal, Slot
 from PySide6.QtGui import QKeyEvent
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QApplication,
     QDialog,
     QHBoxLayout,
     QLabel,
     QLineEdit,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QMainWindow,
     QPushButton,
     QStackedWidget,
@@ -18,13 +22,34 @@ from PySide6.QtWidgets import (
 )
 from qt_material import apply_stylesheet
 
+try:
+    from PySide6.QtDBus import QDBusConnection
+except ImportError:  # Qt built without D-Bus: no lock notifications
+    QDBusConnection = None
+
 from backend_utils import (
-    get_list_from_backend,
-    get_secret_from_backend,
+    BACKGROUND_INDEX_ENABLED,
+    INDEX_WORKERS,
+    PREFETCH_DELAY_MS,
+    PREFETCH_ENABLED,
+    cancel_secret_load,
+    get_metadata_from_backend,
     git_pull_from_backend,
     git_push_to_backend,
     git_status_from_backend,
-    save_secret_to_backend,
+    iter_list_from_backend,
+    load_listing_snapshot,
+    load_secret,
+    prefetch_secret,
+    prefetched_secret,
+    save_listing_snapshot,
+    save_secret,
+    show_many_from_backend,
+    shutdown_backend,
+    start_backend,
+    wait_for_interactive_shows,
+    watch_store_from_backend,
+    wipe_secret_cache,
 )
 from components.confirmation_dialog import ConfirmationDialog
 from components.hotkey_cheatsheet_dialog import HotkeyCheatsheetDialog
@@ -32,11 +57,25 @@ from components.hotkey_help import HotkeyHelpWidget
 from components.password_generator_dialog import PasswordGeneratorDialog
 from components.secret_create_view import SecretCreateWidget
 from components.secret_detail_view import SecretDetailWidget
-from components.secret_list_item import SecretListItem
+from components.secret_list_item import SecretListDelegate
+from components.secret_list_model import SecretListModel
+from fuzzy_matcher import FuzzyMatcher
 from hotkey_manager import HotkeyManager
+from metadata_index import metadata_fields, metadata_text
+from pass_store import parse_secret
 from ui_theme import CATPPUCCIN_COLORS, extra
 from utils import generate_password
 
+# Search rank of entries that match only on an indexed field: after every name match.
+METADATA_MATCH_SCORE = 1 << 30
+# Typing is debounced by one millisecond per this many entries, so large stores rank once per burst of keys
+SEARCH_DEBOUNCE_ENTRIES_PER_MS = 2000
+SEARCH_DEBOUNCE_MAX_MS = 120
+# Footer status while the list is still being filled, and while rows from before (the last session's
+# snapshot, or the list before a resync) are shown but the store is being listed again
+LISTING_STATUS = "Loading secrets…"
+STALE_LISTING_STATUS = "List may be out of date, refreshing…"
+
 
 class GitSyncWorker(QThread):
     """Worker thread for asynchronous git operations."""
@@ -89,13 +128,244 @@ class GitSyncWorker(QThread):
             self.finished.emit(False, str(e), self.operation_type)
 
 
+class ListingWorker(QThread):
+    """Streams the store listing from the backend, one namespace at a time."""
+
+    namespace_loaded = Signal(int, dict)  # generation, {"namespace": ..., "resources": [...]}
+    metadata_loaded = Signal(int, dict)  # generation, get_metadata_from_backend() once the listing is complete
+    failed = Signal(int, str)  # generation, message
+
+    def __init__(self, generation):
+        super().__init__()
+        self.generation = generation
+
+    def run(self):
+        namespaces = iter_list_from_backend()
+        try:
+            for ns_item in namespaces:
+                if self.isInterruptionRequested():
+                    break
+                self.namespace_loaded.emit(self.generation, ns_item)
+            else:
+                self.metadata_loaded.emit(self.generation, get_metadata_from_backend())
+        except Exception as e:
+            self.failed.emit(self.generation, str(e))
+        finally:
+            namespaces.close()  # Cancels the stream if we stopped early
+
+
+class IndexerWorker(QThread):
+    """
+    Fills the metadata index in the background: decrypts, in small show-many batches, every secret
+    the index doesn't cover yet. What is already indexed is skipped, so a restarted indexer resumes
+    where the last one checkpointed. Waits while the user is opening a secret, and can be paused.
+    """
+
+    progress = Signal(int, int, int, float)  # generation, indexed, total, secrets per second
+    indexed = Signal(int, list)  # generation, [[namespace, resource, fields], ...] of the last batch
+
+    def __init__(self, generation, entries, already_indexed):
+        super().__init__()
+        self.generation = generation
+        self.total = len(entries)
+        self.pending = [entry for entry in entries if entry not in already_indexed]
+        self.batch_size = max(1, INDEX_WORKERS) * 4  # Small batches: an interactive show never waits long
+        self._running = threading.Event()
+        self._running.set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def is_paused(self):
+        return not self._running.is_set()
+
+    def run(self):
+        done = self.total - len(self.pending)
+        self.progress.emit(self.generation, done, self.total, 0.0)
+        started = time.monotonic()
+        decrypted = 0
+        for start in range(0, len(self.pending), self.batch_size):
+            if self.is_paused():
+                while not self._running.wait(0.2) and not self.isInterruptionRequested():
+                    pass
+                started, decrypted = time.monotonic(), 0  # Throughput restarts after a pause
+            while not wait_for_interactive_shows(0.2) and not self.isInterruptionRequested():
+                pass
+            if self.isInterruptionRequested():
+                return
+            items = [{"namespace": ns, "resource": res} for ns, res in self.pending[start : start + self.batch_size]]
+            batch = []
+            try:
+                for result in show_many_from_backend(items, INDEX_WORKERS):
+                    if result.get("status") == "success":
+                        batch.append([result["namespace"], result["resource"], metadata_fields(result["data"])])
+            except Exception as e:
+                print(f"Background indexing stopped: {e}", file=sys.stderr)
+                return
+            done += len(items)
+            decrypted += len(items)
+            self.indexed.emit(self.generation, batch)
+            self.progress.emit(self.generation, done, self.total, decrypted / max(time.monotonic() - started, 1e-6))
+
+
+class SearchWorker(QThread):
+    """
+    Ranks the list for the search bar off the GUI thread. The worker keeps its own copy of the entry
+    list and FuzzyMatcher, kept in step with all_secrets through reset()/insert()/remove() messages
+    processed in order. Searches queued behind each other are coalesced: only the newest one runs.
+    Every result says how many of those changes it reflects, so the GUI can apply the ones it missed.
+    """
+
+    # generation, changes applied, query, [(rank, entry), ...] (object: passed through as is, tuples and all)
+    results = Signal(int, int, str, object)
+
+    def __init__(self):
+        super().__init__()
+        self.requests = queue.Queue()
+
+    def reset(self, entries=()):
+        self.requests.put(("reset", list(entries)))
+
+    def insert(self, index, entry):
+        self.requests.put(("insert", index, entry))
+
+    def remove(self, index):
+        self.requests.put(("remove", index))
+
+    def search(self, generation, query, metadata):
+        """Ranks the entries for `query`; `metadata` is the window's entry text -> indexed fields dict."""
+        self.requests.put(("search", generation, query, metadata))
+
+    def stop(self):
+        self.requests.put(None)
+
+    def run(self):
+        matcher = FuzzyMatcher()
+        entries = []
+        applied = 0
+        while True:
+            pending = [self.requests.get()]
+            while True:
+                try:
+                    pending.append(self.requests.get_nowait())
+                except queue.Empty:
+                    break
+            search = None
+            for request in pending:
+                if request is None:
+                    return
+                kind = request[0]
+                if kind == "search":
+                    search = request  # Replaces any older search still queued
+                    continue
+                applied += 1
+                if kind == "reset":
+                    entries = request[1]
+                    matcher.reset([entry[0] for entry in entries])
+                elif kind == "insert":
+                    entries.insert(request[1], request[2])
+                    matcher.insert(request[1], request[2][0])
+                elif kind == "remove":
+                    del entries[request[1]]
+                    matcher.remove(request[1])
+            if search is not None:
+                _, generation, query, metadata = search
+                ranked = self._rank(matcher, entries, dict(metadata), query)  # dict(): snapshot, the GUI keeps writing
+                self.results.emit(generation, applied, query, ranked)
+
+    @staticmethod
+    def _rank(matcher, entries, metadata, text):
+        """[(rank, entry), ...] of the entries matching the search `text`, best first."""
+        if not text.strip():
+            return [((0, entry[0]), entry) for entry in entries]
+        indices, scores = matcher.search(text)
+        matched = [entries[index] for index in indices]
+        ranked = [((score, entry[0]), entry) for score, entry in zip(scores, matched)]
+        # Entries that only match on an indexed field follow the name matches, in list order.
+        needle = text.lower()
+        by_name = {entry_text for (_, entry_text), _ in ranked}
+        for entry_text in sorted(t for t, fields in metadata.items() if needle in fields):
+            index = bisect.bisect_left(entries, (entry_text,))
+            if entry_text not in by_name and index < len(entries) and entries[index][0] == entry_text:
+                ranked.append(((METADATA_MATCH_SCORE, entry_text), entries[index]))
+        return ranked
+
+
+class StoreWatchBridge(QObject):
+    """Carries listing deltas from the backend reader thread into the GUI thread."""
+
+    delta = Signal(dict)
+
+
+class SecretLoadBridge(QObject):
+    """Carries finished secret loads from backend threads into the GUI thread."""
+
+    loaded = Signal(int, object)  # generation, the finished Future
+
+
+class SecretSaveBridge(QObject):
+    """Carries finished saves from backend threads into the GUI thread."""
+
+    saved = Signal(object, object)  # (namespace, resource, content, listed by the save, callback), the finished Future
+
+
+class ScreenLockBridge(QObject):
+    """Emits `locked` when the desktop's screen saver / lock screen activates (ActiveChanged over D-Bus)."""
+
+    locked = Signal()
+
+    # (interface, object path) pairs of the screen saver services desktops expose
+    SCREEN_SAVERS = [
+        ("org.freedesktop.ScreenSaver", "/org/freedesktop/ScreenSaver"),
+        ("org.freedesktop.ScreenSaver", "/ScreenSaver"),
+        ("org.gnome.ScreenSaver", "/org/gnome/ScreenSaver"),
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        if QDBusConnection is None:
+            return
+        bus = QDBusConnection.sessionBus()
+        if not bus.isConnected():
+            return
+        for interface, path in self.SCREEN_SAVERS:
+            bus.connect("", path, interface, "ActiveChanged", self, SLOT("_on_active_changed(bool)"))
+
+    @Slot(bool)
+    def _on_active_changed(self, active):
+        if active:
+            self.locked.emit()
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.all_secrets = []
+        self.search_worker = SearchWorker()  # Holds its own copy of all_secrets to rank
+        self.search_generation = 0  # Bumped by every search; only the newest one's results are shown
+        self.search_changes = 0  # Changes to all_secrets sent to the search worker
+        self.search_log = None  # [(change number, kind, entry or text), ...] while a search is running
         self.namespace_colors = {}
         self.namespace_resources = {}  # {namespace: [resource1, resource2, ...]}
+        self.metadata_enabled = False
+        self.secret_metadata = {}  # Entry text -> lower-cased "key: value" lines of its indexed fields
         self.current_selected_item = None
+        self.listing_generation = 0  # Bumped by every reload; rows from older listings are dropped
+        self.listing_workers = []
+        self.listing_seen = None  # {namespace: {resource, ...}} reported so far by the listing in progress
+        self.listing_complete = False  # A listing finished this session, so the list is worth snapshotting
+        self.prefetch = None  # ((namespace, resource), Future) of the highlighted secret, with PASS_KB_PREFETCH=1
+        self.secret_load = None  # (generation, (namespace, resource), Future, from prefetch) of the secret being opened
+        self.secret_load_generation = 0  # Bumped by every open; a superseded load's result is dropped
+        self.indexer = None  # Current IndexerWorker, with PASS_KB_BACKGROUND_INDEX=1
+        self.indexer_workers = []  # Including stopped ones that haven't returned yet
+        self.index_progress = None  # Last (indexed, total, rate)
+        # Warm backend child, reused by every call for the life of the window. It starts in the background:
+        # the window is painted and takes keys at once, and the listing fills it in when the backend is up.
+        self.backend_ready = start_backend()
         self.setWindowTitle("Pass Keyboard Control")
         self.resize(720, 720)
         self.setMaximumSize(720, 720)
@@ -166,6 +436,19 @@ class MainWindow(QMainWindow):
         self.status_label.setMinimumWidth(120)
         footer_layout.addWidget(self.status_label)
 
+        # Background indexing progress (right of the status) - hidden when idle
+        self.index_label = QLabel("")
+        self.index_label.setStyleSheet("""
+            color: #6c7086;
+            font-size: 10px;
+            padding: 0px;
+            background-color: transparent;
+        """)
+        self.index_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.index_label.setToolTip("Background indexing (Ctrl+P to pause/resume)")
+        self.index_label.hide()
+        footer_layout.addWidget(self.index_label)
+
         main_layout.addWidget(footer_widget)
 
         # --- Search View ---
@@ -228,10 +511,18 @@ class MainWindow(QMainWindow):
         self.sync_status_timer.timeout.connect(self._check_git_status_async)
         self.sync_status_timer.start(30000)  # Check every 30 seconds
 
-        self.results_list = QListWidget()
-        self.results_list.setStyleSheet(
-            "QListWidget::item { border: none; padding: 0px; } QListWidget::item:selected { background-color: rgba(137, 180, 250, 0.2); border-left: 3px solid #89b4fa; } QListWidget::item:hover { background-color: rgba(137, 180, 250, 0.1); }"
-        )
+        # Rows are painted by the delegate from the model; no widget exists per row
+        self.results_model = SecretListModel(self.namespace_colors, self)
+        self.results_delegate = SecretListDelegate(self)
+        self.results_delegate.view_requested.connect(self._on_item_activated)
+        self.results_list = QListView()
+        self.results_list.setModel(self.results_model)
+        self.results_list.setItemDelegate(self.results_delegate)
+        self.results_list.setUniformItemSizes(True)
+        self.results_list.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.results_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.results_list.setMouseTracking(True)  # Hover highlight
+        self.results_list.setStyleSheet("QListView::item { border: none; padding: 0px; }")
         search_layout.addWidget(self.results_list)
         self.stack.addWidget(self.search_view)
 
@@ -247,7 +538,7 @@ class MainWindow(QMainWindow):
 
         # --- Create View ---
         self.create_widget = SecretCreateWidget(
-            back_callback=self._show_search_view_from_create,
+            back_callback=self._show_search_view,
             save_callback=self._save_secret,
             show_status_callback=self.show_status,
             namespace_colors=self.namespace_colors,
@@ -259,10 +550,22 @@ class MainWindow(QMainWindow):
         self.stack.addWidget(self.create_widget)
 
         # --- Initial Load & Connections ---
+        self._show_listing_snapshot()
         self.load_data_and_populate()
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(self._submit_search)
+        self.search_worker.results.connect(self._on_search_results)
+        self.search_worker.start()
         self.search_bar.textChanged.connect(self._on_search_changed)
-        self.results_list.itemActivated.connect(self._on_item_activated)
-        self.results_list.currentItemChanged.connect(self._on_selection_changed)
+        self.results_list.activated.connect(self._on_item_activated)
+        self.results_list.selectionModel().currentChanged.connect(self._on_selection_changed)
+
+        # Prefetch: decrypt the highlighted secret once the selection rests, so Enter opens it at once
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(PREFETCH_DELAY_MS)
+        self.prefetch_timer.timeout.connect(self._prefetch_selected)
 
         self.installEventFilter(self)
         self._register_hotkeys()
@@ -271,6 +574,27 @@ class MainWindow(QMainWindow):
         # Check git status on startup (async)
         QTimer.singleShot(1000, self._check_git_status_async)
 
+        # Follow changes made outside the GUI (pass in a terminal, git pull from cron, ...)
+        self.store_watch_bridge = StoreWatchBridge()
+        self.store_watch_bridge.delta.connect(self._apply_store_delta)
+        self.store_watch = None
+        self.backend_ready.add_done_callback(self._watch_store)
+
+        # Secrets open without blocking: the detail view shows a skeleton until the decrypt finishes
+        self.secret_load_bridge = SecretLoadBridge()
+        self.secret_load_bridge.loaded.connect(self._on_secret_loaded)
+        self.secret_save_bridge = SecretSaveBridge()
+        self.secret_save_bridge.saved.connect(self._on_secret_saved)
+
+        # Decrypted secrets cached for quick re-opening don't survive the window being hidden or the screen locking
+        self.screen_lock_bridge = ScreenLockBridge(self)
+        self.screen_lock_bridge.locked.connect(wipe_secret_cache)
+
+    def hideEvent(self, event):
+        self._drop_prefetch()
+        wipe_secret_cache()
+        super().hideEvent(event)
+
     def _register_hotkeys(self):
         self.hotkey_manager.register("ctrl+g", self.handle_simple_generate, priority=20)
         self.hotkey_manager.register("ctrl+shift+g", self.handle_advanced_generate, priority=20)
@@ -280,6 +604,7 @@ class MainWindow(QMainWindow):
         self.hotkey_manager.register("ctrl+s", self.handle_save, priority=10)
         self.hotkey_manager.register("ctrl+r", self.handle_sync, priority=10)
         self.hotkey_manager.register("ctrl+n", self.handle_add_field, priority=8)
+        self.hotkey_manager.register("ctrl+p", self.handle_toggle_indexing, priority=10)
         self.hotkey_manager.register("down", self.handle_search_nav, priority=5)
         self.hotkey_manager.register("up", self.handle_search_nav, priority=5)
         self.hotkey_manager.register("return", self.handle_search_activate, priority=5)
@@ -442,6 +767,9 @@ class MainWindow(QMainWindow):
         return True
 
     def handle_esc(self, event):
+        if self.secret_load is not None and self.stack.currentWidget() == self.details_widget:
+            self._show_search_view()  # Cancels the decrypt in flight
+            return True
         return False
 
     def handle_save(self, event):
@@ -454,6 +782,20 @@ class MainWindow(QMainWindow):
             return True
         return False
 
+    def handle_toggle_indexing(self, event):
+        """Handle Ctrl+P: pause/resume background indexing."""
+        if self.indexer is None or not self.indexer.isRunning():
+            return False
+        if self.indexer.is_paused():
+            self.indexer.resume()
+            self.show_status("Indexing resumed", "info")
+        else:
+            self.indexer.pause()
+            self.show_status("Indexing paused", "info")
+        if self.index_progress is not None:
+            self._on_index_progress(self.indexer.generation, *self.index_progress)
+        return True
+
     def handle_add_field(self, event):
         if self.stack.currentWidget() == self.search_view:
             self._show_create_view()
@@ -472,103 +814,416 @@ class MainWindow(QMainWindow):
 
     def handle_search_activate(self, event):
         if self.stack.currentWidget() == self.search_view and self.results_list.hasFocus():
-            if self.results_list.currentItem():
-                self._on_item_activated(self.results_list.currentItem())
+            if self.results_list.currentIndex().isValid():
+                self._on_item_activated(self.results_list.currentIndex())
                 return True
         return False
 
     def load_data_and_populate(self):
-        backend_data = get_list_from_backend()
-        if backend_data is None:
-            self.results_list.addItem("Error: Could not load secrets.")
+        """
+        Lists the store again and reconciles the list with it: new rows appear namespace by namespace
+        while the backend is still walking the store, and rows it no longer has are removed once the
+        walk is complete (see _drop_unlisted()). Text typed meanwhile filters rows as they arrive.
+        """
+        for worker in self.listing_workers:
+            worker.requestInterruption()
+        self._stop_indexer()
+        self.listing_generation += 1
+        self.listing_seen = {}
+        self.show_status(STALE_LISTING_STATUS if self.all_secrets else LISTING_STATUS, "info")
+
+        worker = ListingWorker(self.listing_generation)
+        worker.namespace_loaded.connect(self._on_namespace_loaded)
+        worker.metadata_loaded.connect(self._on_metadata_loaded)
+        worker.failed.connect(self._on_listing_failed)
+        worker.finished.connect(self._prune_listing_workers)
+        self.listing_workers.append(worker)
+        worker.start()
+
+    def _on_namespace_loaded(self, generation, ns_item):
+        if generation != self.listing_generation:
+            return  # A newer reload started since
+        namespace = ns_item.get("namespace", "Unknown")
+        self.listing_seen.setdefault(namespace, set()).update(ns_item.get("resources", []))
+        self._namespace_color(namespace)
+        resources = self.namespace_resources.setdefault(namespace, [])
+        known = set(resources)  # The store watcher may have added some already
+        entries = []
+        for resource in ns_item.get("resources", []):
+            if resource not in known:
+                bisect.insort(resources, resource)
+                entries.append(self._secret_entry(namespace, resource))
+        self._insert_secrets(entries)
+
+    def _on_metadata_loaded(self, generation, metadata):
+        if generation != self.listing_generation:
             return
-        self.all_secrets = []
-        self.namespace_resources = {}  # Reset namespace resources
-        namespaces_seen = []
-
-        for ns_item in backend_data:
-            namespace = ns_item.get("namespace", "Unknown")
-
-            if namespace not in self.namespace_colors:
-                if namespace not in namespaces_seen:
-                    namespaces_seen.append(namespace)
-                color_index = namespaces_seen.index(namespace) % len(CATPPUCCIN_COLORS)
-                self.namespace_colors[namespace] = CATPPUCCIN_COLORS[color_index]
-
-            # Build namespace_resources dictionary
-            resources = ns_item.get("resources", [])
-            self.namespace_resources[namespace] = resources
-
-            for resource_name in resources:
-                plain_text = f"[{namespace}]: {resource_name}"
-                item_data = {"namespace": namespace, "resource": resource_name}
-                self.all_secrets.append((plain_text, item_data))
-
-        self.all_secrets.sort()
-        self._populate_list(self.all_secrets)
-
-    def _populate_list(self, secrets_to_display):
-        self.results_list.clear()
-        for _, secret_data in secrets_to_display:
-            item = QListWidgetItem()
-            item.setData(Qt.UserRole, secret_data)
-
-            ns_color = self.namespace_colors.get(secret_data["namespace"], extra["secondaryTextColor"])
-
-            list_item_widget = SecretListItem(
-                secret_data["namespace"],
-                secret_data["resource"],
-                ns_color,
-                view_callback=lambda checked=False, i=item: self._view_secret_from_item(i),
-            )
-
-            item.setSizeHint(list_item_widget.sizeHint())
-
-            self.results_list.addItem(item)
-            self.results_list.setItemWidget(item, list_item_widget)
+        self._drop_unlisted()
+        self._clear_listing_status()
+        self.metadata_enabled = metadata.get("enabled", False)
+        self.secret_metadata = {
+            self._secret_entry(entry["namespace"], entry["resource"])[0]: metadata_text(entry["fields"])
+            for entry in metadata.get("entries", [])
+        }
+        if self.search_bar.text() and self.secret_metadata:
+            self._submit_search()  # Field matches may add rows to the current search
+        if self.metadata_enabled and BACKGROUND_INDEX_ENABLED:
+            self._start_indexer()
+
+    def _start_indexer(self):
+        entries = []
+        already_indexed = set()
+        for text, item_data in self.all_secrets:
+            entry = (item_data["namespace"], item_data["resource"])
+            entries.append(entry)
+            if text in self.secret_metadata:
+                already_indexed.add(entry)
+        self.indexer = IndexerWorker(self.listing_generation, entries, already_indexed)
+        self.indexer.progress.connect(self._on_index_progress)
+        self.indexer.indexed.connect(self._on_index_batch)
+        self.indexer.finished.connect(self._prune_indexer_workers)
+        self.indexer_workers.append(self.indexer)
+        self.indexer.start()
+
+    def _stop_indexer(self):
+        """Asks the indexer to stop after its current batch, without waiting for it."""
+        if self.indexer is not None:
+            self.indexer.requestInterruption()
+            self.indexer.resume()
+            self.indexer = None
+            self.index_progress = None
+            self.index_label.hide()
+
+    def _shutdown_indexers(self):
+        self._stop_indexer()
+        for worker in self.indexer_workers:
+            worker.wait(2000)
+
+    def _prune_indexer_workers(self):
+        self.indexer_workers = [worker for worker in self.indexer_workers if not worker.isFinished()]
+
+    def _on_index_batch(self, generation, batch):
+        if self.indexer is None or generation != self.indexer.generation:
+            return
+        needle = self.search_bar.text().lower()
+        refilter = False
+        for namespace, resource, fields in batch:
+            text = metadata_text(fields)
+            self.secret_metadata[self._secret_entry(namespace, resource)[0]] = text
+            refilter = refilter or (needle and needle in text)
+        if refilter:
+            self._submit_search()  # Newly indexed fields match the current search
+
+    def _on_index_progress(self, generation, done, total, rate):
+        if self.indexer is None or generation != self.indexer.generation:
+            return
+        self.index_progress = (done, total, rate)
+        if done >= total:
+            self.index_label.hide()
+            return
+        state = "Indexing paused" if self.indexer is not None and self.indexer.is_paused() else "Indexing"
+        speed = f"  {rate:.0f}/s" if rate else ""
+        self.index_label.setText(f"{state} {done}/{total}{speed}")
+        self.index_label.show()
+
+    def _remember_metadata(self, namespace, resource, data):
+        """Keeps search in step with the backend's metadata index after a secret was shown or saved."""
+        if self.metadata_enabled and data:
+            self.secret_metadata[self._secret_entry(namespace, resource)[0]] = metadata_text(metadata_fields(data))
+
+    def _on_listing_failed(self, generation, message):
+        if generation == self.listing_generation:
+            self.listing_seen = None  # Keep the rows shown: better stale than missing
+            self._clear_listing_status()
+            print(f"Error fetching list from backend: {message}", file=sys.stderr)
+            self.show_status("Error: Could not load secrets.", "error")
+
+    def _clear_listing_status(self):
+        if self.status_label.text() in (LISTING_STATUS, STALE_LISTING_STATUS):  # Unless something else was reported
+            self.show_status("")
+
+    def _drop_unlisted(self):
+        """Ends a reconcile: removes the rows the completed listing didn't report, e.g. secrets deleted since."""
+        seen, self.listing_seen = self.listing_seen, None
+        for namespace in list(self.namespace_resources):
+            listed = seen.get(namespace)
+            if listed is None:
+                self._remove_store_entry(namespace, None)
+                self.namespace_colors.pop(namespace, None)  # Or the snapshot keeps bringing it back
+                continue
+            for resource in [resource for resource in self.namespace_resources[namespace] if resource not in listed]:
+                self._remove_store_entry(namespace, resource)
+        self.listing_complete = True
+
+    def _show_listing_snapshot(self):
+        """Fills the list with the names listed when the app last exited, until the first listing reconciles them."""
+        snapshot = load_listing_snapshot()
+        if snapshot is None:
+            return
+        namespace_resources, namespace_colors = snapshot
+        self.namespace_colors.update(namespace_colors)
+        for namespace, resources in namespace_resources.items():
+            self.namespace_resources[namespace] = sorted(resources)
+        entries = (self._secret_entry(ns, name) for ns, names in self.namespace_resources.items() for name in names)
+        self.all_secrets = sorted(entries, key=lambda entry: entry[0])
+        self._search_change("reset", list(self.all_secrets))
+        self.results_model.set_rows([((0, entry[0]), entry) for entry in self.all_secrets], "")
+
+    def _save_listing_snapshot(self):
+        if self.listing_complete and self.listing_seen is None:  # Never a half-done listing
+            save_listing_snapshot(self.namespace_resources, self.namespace_colors)
+
+    def _watch_store(self, backend_ready):
+        """Subscribes to the store watch once the backend is up; runs on the thread that started it."""
+        if backend_ready.exception() is None:
+            self.store_watch = watch_store_from_backend(self.store_watch_bridge.delta.emit)
+
+    def _prune_listing_workers(self):
+        self.listing_workers = [worker for worker in self.listing_workers if not worker.isFinished()]
+
+    def _namespace_color(self, namespace):
+        if namespace not in self.namespace_colors:
+            color_index = len(self.namespace_colors) % len(CATPPUCCIN_COLORS)
+            self.namespace_colors[namespace] = CATPPUCCIN_COLORS[color_index]
+        return self.namespace_colors[namespace]
+
+    def _insert_secret(self, entry):
+        self._insert_secrets([entry])
+
+    def _insert_secrets(self, entries):
+        """Adds entries to all_secrets and those matching the search to the visible rows, keeping both sorted."""
+        ranked = []
+        for entry in entries:
+            # Entries are unique by their text, so (text,) sorts right before its entry and dicts are never compared.
+            # Namespaces mostly arrive in order, so appending is the common case.
+            if not self.all_secrets or self.all_secrets[-1][0] < entry[0]:
+                index = len(self.all_secrets)
+            else:
+                index = bisect.bisect_left(self.all_secrets, (entry[0],))
+            self.all_secrets.insert(index, entry)
+            self._search_change("insert", entry, index)
+            rank = self._rank_secret(self.results_model.query, entry)
+            if rank is not None:
+                ranked.append((rank, entry))
+        ranked.sort(key=lambda ranked_entry: ranked_entry[0])
+        self.results_model.insert_entries(ranked)
+
+    @staticmethod
+    def _secret_entry(namespace, resource):
+        return (f"[{namespace}]: {resource}", {"namespace": namespace, "resource": resource})
+
+    def _apply_store_delta(self, delta):
+        """Applies one added/removed/renamed listing delta without rebuilding the whole list."""
+        kind = delta.get("type")
+        if kind == "resync":
+            self.load_data_and_populate()
+        elif kind == "added":
+            self._add_store_entry(delta["namespace"], delta["resource"])
+        elif kind == "removed":
+            self._remove_store_entry(delta["namespace"], delta["resource"])
+        elif kind == "renamed":
+            self._remove_store_entry(delta["namespace"], delta["resource"])
+            self._add_store_entry(delta["new_namespace"], delta["new_resource"])
+
+    def _add_store_entry(self, namespace, resource):
+        if self.listing_seen is not None:  # Appeared after the listing walked its directory: not stale
+            seen = self.listing_seen.setdefault(namespace, set())
+            if resource is not None:
+                seen.add(resource)
+        if namespace not in self.namespace_resources:
+            self.namespace_resources[namespace] = []
+            self._namespace_color(namespace)
+        if resource is None:  # A new, still empty namespace
+            return
+        resources = self.namespace_resources[namespace]
+        if resource in resources:
+            return
+        bisect.insort(resources, resource)
+        self._insert_secret(self._secret_entry(namespace, resource))
+
+    def _remove_store_entry(self, namespace, resource):
+        if resource is None:  # The namespace directory itself went away
+            for name in self.namespace_resources.pop(namespace, []):
+                self.secret_metadata.pop(self._secret_entry(namespace, name)[0], None)
+                self._remove_secret_row(self._secret_entry(namespace, name)[0])
+            return
+        resources = self.namespace_resources.get(namespace, [])
+        if resource in resources:
+            resources.remove(resource)
+            self.secret_metadata.pop(self._secret_entry(namespace, resource)[0], None)
+            self._remove_secret_row(self._secret_entry(namespace, resource)[0])
+
+    def _remove_secret_row(self, plain_text):
+        index = bisect.bisect_left(self.all_secrets, (plain_text,))
+        if index < len(self.all_secrets) and self.all_secrets[index][0] == plain_text:
+            del self.all_secrets[index]
+            self._search_change("remove", plain_text, index)
+        self.results_model.remove_entry(plain_text)
 
     def _on_selection_changed(self, current, previous):
-        if previous:
-            prev_widget = self.results_list.itemWidget(previous)
-            if isinstance(prev_widget, SecretListItem):
-                prev_widget.set_selected(False)
-
-        if current:
-            curr_widget = self.results_list.itemWidget(current)
-            if isinstance(curr_widget, SecretListItem):
-                curr_widget.set_selected(True)
-
+        # The delegate draws the view button on the current row; the view repaints both rows itself
         self.current_selected_item = current
+        if PREFETCH_ENABLED:
+            self._drop_prefetch(keep=self._item_key(current))
+            self.prefetch_timer.start()  # Restarted on every move: only a resting selection is prefetched
+
+    @staticmethod
+    def _item_key(index):
+        item_data = index.data(Qt.UserRole) if index is not None else None
+        return (item_data["namespace"], item_data["resource"]) if item_data else None
+
+    def _prefetch_selected(self):
+        key = self._item_key(self.results_list.currentIndex())
+        if key is None or (self.prefetch is not None and self.prefetch[0] == key):
+            return
+        self._drop_prefetch()
+        self.prefetch = (key, prefetch_secret(*key))
+
+    def _drop_prefetch(self, keep=None):
+        """Cancels the prefetch (unless it is for `keep`) and forgets its result."""
+        if self.prefetch is None or self.prefetch[0] == keep:
+            return
+        self.prefetch[1].cancel()
+        self.prefetch = None
+
+    def _start_secret_load(self, key, future, from_prefetch):
+        generation = self.secret_load_generation
+        self.secret_load = (generation, key, future, from_prefetch)
+        future.add_done_callback(lambda done: self.secret_load_bridge.loaded.emit(generation, done))
+
+    def _on_secret_loaded(self, generation, future):
+        if self.secret_load is None or self.secret_load[0] != generation:
+            return  # Cancelled, or another secret was opened since
+        _, (namespace, resource), _, from_prefetch = self.secret_load
+        if from_prefetch:
+            secret = prefetched_secret(future, namespace, resource)
+            if secret is None:  # The prefetch failed or the file changed since: decrypt it now
+                self._start_secret_load((namespace, resource), load_secret(namespace, resource), False)
+                return
+        else:
+            secret = future.result()
+        self.secret_load = None
+        self._remember_metadata(namespace, resource, secret)
+        self.details_widget.populate_data(secret, f"[{namespace}] {resource}", namespace, resource)
+
+    def _cancel_secret_load(self):
+        """Gives up on the secret being opened, if any; its result is dropped when it arrives."""
+        if self.secret_load is None:
+            return
+        _, _, future, from_prefetch = self.secret_load
+        self.secret_load = None
+        if from_prefetch:
+            future.cancel()
+        else:
+            cancel_secret_load(future)
+
+    def _rank_secret(self, text, entry):
+        """The rank of one entry for the search `text` (see SearchWorker._rank()), or None if it doesn't match."""
+        if not text.strip():
+            return (0, entry[0])
+        score = FuzzyMatcher.score(text, entry[0])
+        if score is not None:
+            return (score, entry[0])
+        if text.lower() in self.secret_metadata.get(entry[0], ""):
+            return (METADATA_MATCH_SCORE, entry[0])
+        return None
 
     def _on_search_changed(self, text):
-        if not text:
-            filtered_secrets = self.all_secrets
+        # Debounced: on a large store, a burst of keystrokes is ranked once
+        self.search_timer.start(min(SEARCH_DEBOUNCE_MAX_MS, len(self.all_secrets) // SEARCH_DEBOUNCE_ENTRIES_PER_MS))
+
+    def _submit_search(self):
+        self.search_timer.stop()
+        self.search_generation += 1
+        if self.search_log is None:
+            self.search_log = []
+        self.search_worker.search(self.search_generation, self.search_bar.text(), self.secret_metadata)
+
+    def _on_search_results(self, generation, applied, query, ranked):
+        if generation != self.search_generation:
+            return  # A newer search is on its way
+        self.results_model.set_rows(ranked, query)
+        # Entries added or removed while the worker was ranking are missing from its result
+        for change, kind, value in self.search_log:
+            if change <= applied:
+                continue
+            if kind == "reset":
+                ranked = [(self._rank_secret(query, entry), entry) for entry in value]
+                ranked = sorted((rank, entry) for rank, entry in ranked if rank is not None)
+                self.results_model.set_rows(ranked, query)
+            elif kind == "insert":
+                rank = self._rank_secret(query, value)
+                if rank is not None:
+                    self.results_model.insert_entry(rank, value)
+            elif kind == "remove":
+                self.results_model.remove_entry(value)
+        self.search_log = None
+
+    def _search_change(self, kind, value, index=None):
+        """
+        Forwards a change of all_secrets to the search worker: "reset" to a list of entries (a copy),
+        "insert" an entry or "remove" a text.
+        """
+        self.search_changes += 1
+        if self.search_log is not None:
+            self.search_log.append((self.search_changes, kind, value))
+        if kind == "reset":
+            self.search_worker.reset(value)
+        elif kind == "insert":
+            self.search_worker.insert(index, value)
         else:
-            filtered_secrets = [s_tuple for s_tuple in self.all_secrets if text.lower() in s_tuple[0].lower()]
-        self._populate_list(filtered_secrets)
+            self.search_worker.remove(index)
 
-    def _on_item_activated(self, item: QListWidgetItem):
-        item_data = item.data(Qt.UserRole)
-        if item_data:
-            self._view_secret(item_data)
+    def _shutdown_search(self):
+        self.search_worker.stop()
+        self.search_worker.wait(2000)
 
-    def _view_secret_from_item(self, item):
-        item_data = item.data(Qt.UserRole)
+    def _on_item_activated(self, index):
+        item_data = index.data(Qt.UserRole)
         if item_data:
             self._view_secret(item_data)
 
     def _view_secret(self, item_data):
-        secret_details = get_secret_from_backend(item_data["namespace"], item_data["resource"])
-        self.details_widget.populate_data(
-            secret_details,
-            f"[{item_data['namespace']}] {item_data['resource']}",
-            item_data["namespace"],
-            item_data["resource"],
-        )
+        """Opens the detail view at once and fills it when the secret is decrypted (see _on_secret_loaded())."""
+        key = (item_data["namespace"], item_data["resource"])
+        self._cancel_secret_load()
+        self.secret_load_generation += 1
+        self.details_widget.show_loading(f"[{key[0]}] {key[1]}", *key)
         self._show_details_view()
+        if self.prefetch is not None and self.prefetch[0] == key:
+            future = self.prefetch[1]
+            self.prefetch = None
+            self._start_secret_load(key, future, True)
+        else:
+            self._start_secret_load(key, load_secret(*key), False)
 
-    def _save_secret(self, namespace, resource, data):
-        return save_secret_to_backend(namespace, resource, data)
+    def _save_secret(self, namespace, resource, data, on_saved):
+        """
+        Writes a secret without blocking and calls on_saved(result) in the GUI thread when the backend
+        is done. A secret that isn't listed yet is listed at once, and taken out again if the save fails,
+        together with its namespace if listing it created one.
+        """
+        listed = resource not in self.namespace_resources.get(namespace, ())
+        new_namespace = namespace not in self.namespace_resources
+        new_color = namespace not in self.namespace_colors
+        if listed:
+            self._add_store_entry(namespace, resource)
+        save = (namespace, resource, data, listed, new_namespace, new_color, on_saved)
+        future = save_secret(namespace, resource, data)
+        future.add_done_callback(lambda done: self.secret_save_bridge.saved.emit(save, done))
+
+    def _on_secret_saved(self, save, future):
+        namespace, resource, data, listed, new_namespace, new_color, on_saved = save
+        result = future.result()
+        if result.get("status") == "success":
+            self._remember_metadata(namespace, resource, parse_secret(data))
+        elif listed:
+            self._remove_store_entry(namespace, resource)
+            if new_namespace and not self.namespace_resources.get(namespace, True):  # Nothing else arrived in it
+                self._remove_store_entry(namespace, None)
+                if new_color:
+                    self.namespace_colors.pop(namespace, None)
+        on_saved(result)
 
     def _show_search_view(self):
         if self.details_widget.is_dirty:
@@ -577,6 +1232,7 @@ class MainWindow(QMainWindow):
             if self._exec_dialog_with_hotkeys(dialog) != QDialog.Accepted:
                 return
 
+        self._cancel_secret_load()
         self.update_help_text("search")
         self.stack.setCurrentIndex(0)
         self.search_bar.setFocus()
@@ -587,6 +1243,8 @@ class MainWindow(QMainWindow):
         self.stack.setCurrentIndex(1)
         if self.details_widget.field_rows:
             self.details_widget._focus_field(0)
+        else:
+            self.details_widget.setFocus()  # Still loading: keep keys (Esc) away from the hidden list
 
     def _show_create_view(self):
         # Update namespaces and resources before showing
@@ -599,10 +1257,6 @@ class MainWindow(QMainWindow):
         self.create_widget.namespace_main_container.setFocus()
         self.create_widget._on_tags_focus_in()
 
-    def _show_search_view_from_create(self):
-        self.load_data_and_populate()
-        self._show_search_view()
-
     def _handle_sync(self):
         """Handle git synchronization (pull then push) asynchronously."""
         if self.git_worker and self.git_worker.isRunning():
@@ -686,17 +1340,36 @@ class MainWindow(QMainWindow):
                 tooltip.append(f"Behind remote by {status.get('behind', 0)} commits")
             if needs_push:
                 tooltip.append(f"Ahead of remote by {status.get('ahead', 0)} commits")
-            self.sync_status_indicator.setToolTip("\n".join(tooltip))
         else:
             # Everything synced - green dot
             self.sync_status_indicator.setStyleSheet("color: #a6e3a1; font-size: 16px;")
-            self.sync_status_indicator.setToolTip("Synced with remote")
+            tooltip = ["Synced with remote"]
+        tooltip.append(self._remote_age_text(status.get("remote_age")))
+        if status.get("fetch_error"):
+            tooltip.append(f"Last fetch failed: {status['fetch_error']}")
+        self.sync_status_indicator.setToolTip("\n".join(tooltip))
+
+    @staticmethod
+    def _remote_age_text(age):
+        """How fresh the ahead/behind numbers are: the backend fetches at most every few minutes."""
+        if age is None:
+            return "Remote never checked"
+        if age < 60:
+            return "Remote checked just now"
+        if age < 3600:
+            return f"Remote checked {age // 60} min ago"
+        return f"Remote checked {age // 3600} h ago"
 
 
 def main():
     app = QApplication(sys.argv)
     apply_stylesheet(app, theme="dark_blue.xml", extra=extra)
     window = MainWindow()
+    # In connection order: the workers stop sending requests before the backend closes, last
+    app.aboutToQuit.connect(window._shutdown_indexers)
+    app.aboutToQuit.connect(window._shutdown_search)
+    app.aboutToQuit.connect(window._save_listing_snapshot)
+    app.aboutToQuit.connect(shutdown_backend)
     window.show()
     sys.exit(app.exec())
 
@@ -0,0 +1,767 @@
+import functools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from git_inspect import GitInspector, InspectUnsupported
+from gpg_engine import EngineUnavailable, GpgEngine, create_engine
+from listing_index import ListingIndex, store_file, write_private_json
+from metadata_index import MetadataIndex, file_stamp
+from store_watcher import StoreWatcher
+
+# Upper bound for the decryption/encryption pools of show_many() and import_secrets().
+MAX_WORKERS = 32
+# Answer of PassStore._inspect() when the in-process repository reader can't decide and git must run.
+_ASK_GIT = object()
+
+
+class PassStoreError(Exception):
+    """Base class of every error raised by PassStore."""
+
+
+class StoreNotInitialized(PassStoreError):
+    """The store directory or its .gpg-id is missing (`pass init` was never run)."""
+
+
+class InvalidSecretName(PassStoreError, ValueError):
+    """A namespace/resource that is empty, malformed or would point outside the store."""
+
+
+class InvalidRecord(PassStoreError, ValueError):
+    """An import record that couldn't be decoded or isn't a JSON object."""
+
+
+class SecretNotFound(PassStoreError, LookupError):
+    """The requested secret has no .gpg file in the store."""
+
+
+class SecretExists(PassStoreError, FileExistsError):
+    """A secret would be overwritten without being asked to."""
+
+
+class CommandFailed(PassStoreError):
+    """`pass`, `git` or `gpg` exited with an error; the message is its stderr."""
+
+    def __init__(self, message, returncode=None, stdout="", stderr=""):
+        super().__init__(message)
+        self.returncode = returncode
+        self.stdout = stdout or ""
+        self.stderr = stderr or ""
+
+
+def error_message(e):
+    """Extracts a human readable message from an exception, preferring subprocess stderr."""
+    if isinstance(e, subprocess.CalledProcessError) and e.stderr:
+        stderr = e.stderr.decode("utf-8", "replace") if isinstance(e.stderr, bytes) else e.stderr
+        return stderr.strip()
+    return str(e)
+
+
+def run(command, **kwargs):
+    """subprocess.run(check=True) that raises CommandFailed carrying the tool's own error message."""
+    try:
+        return subprocess.run(command, check=True, **kwargs)
+    except subprocess.CalledProcessError as e:
+        stdout = e.stdout.decode("utf-8", "replace") if isinstance(e.stdout, bytes) else e.stdout
+        stderr = e.stderr.decode("utf-8", "replace") if isinstance(e.stderr, bytes) else e.stderr
+        message = error_message(e) or f"{os.path.basename(command[0])} exited with status {e.returncode}."
+        raise CommandFailed(message, e.returncode, stdout, stderr) from None
+
+
+def parse_secret(content):
+    """Splits decrypted content into [["secret", first line], [key, value], ...]."""
+    lines = content.strip().split("\n")
+
+    # The first line is always the secret
+    secret_data = [["secret", lines[0]]]
+
+    # Subsequent lines are key-value pairs
+    for line in lines[1:]:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            secret_data.append([key.strip(), value.strip()])
+        # You could add an else here to handle non-kv lines if needed
+
+    return secret_data
+
+
+class CommitCoalescer:
+    """
+    Write-behind commits for interactive saves. Paths are journaled before their file is written to the
+    working tree, and committed together in one commit after `idle_seconds` without another save,
+    before any other git operation, and when the session closes. The journal is a file, so saves
+    pending when the process crashed are committed by the next session instead of being forgotten;
+    journaled files that never got written are skipped then.
+    Callers must hold the store's write lock around add(), discard() and flush().
+    """
+
+    def __init__(self, store, journal_path, idle_seconds):
+        self.store = store
+        self.journal_path = journal_path
+        self.idle_seconds = idle_seconds
+        self._timer = None
+        self._paths = set(self._load())
+
+    def add(self, path):
+        """Journals `path` (fsynced) ahead of writing it. Returns False if it was already pending."""
+        added = path not in self._paths
+        if added:
+            self._paths.add(path)
+            self._save()
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.idle_seconds, self._flush_when_idle)
+        self._timer.daemon = True
+        self._timer.start()
+        return added
+
+    def discard(self, path):
+        """Takes back a path whose write failed."""
+        self._paths.discard(path)
+        self._save()
+
+    def flush(self):
+        """Commits every pending path now. Returns the commit id, or None if nothing was pending."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._paths:
+            return None
+        # A path journaled by a session that crashed before writing its file has nothing to commit
+        paths = sorted(path for path in self._paths if os.path.exists(os.path.join(self.store.path, path)))
+        if not paths:
+            self._paths.clear()
+            self._save()
+            return None
+        listing = "\n".join(f"- {path}" for path in paths)
+        noun = "secret" if len(paths) == 1 else "secrets"
+        commit = self.store.git_commit(paths, f"Update {len(paths)} {noun} in store.\n\n{listing}")
+        self._paths.clear()
+        self._save()
+        return commit
+
+    def _flush_when_idle(self):
+        with self.store.write_lock:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Deferred commit failed, will retry on the next save: {error_message(e)}", file=sys.stderr)
+
+    def _load(self):
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("paths", [])
+        except (OSError, ValueError):
+            return []
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.journal_path), mode=0o700, exist_ok=True)
+        if not self._paths:
+            try:
+                os.unlink(self.journal_path)
+            except FileNotFoundError:
+                pass
+            return
+        write_private_json(self.journal_path, {"store": self.store.path, "paths": sorted(self._paths)}, fsync=True)
+
+
+class PassStore:
+    """
+    A password store and its git repository, usable in-process: methods return plain Python
+    objects and raise PassStoreError subclasses. `pass_backend.py` is a thin CLI/JSON wrapper
+    around one of these.
+
+    Methods that change the store or its repository take `write_lock`, so they run one at a time
+    however many threads share the store. Decryption, listing and git-status run concurrently.
+    """
+
+    def __init__(
+        self,
+        path,
+        cache_dir=None,
+        state_dir=None,
+        decrypt_engine="pass",
+        show_workers=4,
+        git_inspect=True,
+        fetch_interval=300,
+        fetch_timeout=30,
+        coalesce_commits=False,
+        commit_idle_seconds=30,
+        metadata_dir=None,
+    ):
+        self.path = path
+        self.cache_dir = cache_dir  # None: the listing index is not persisted
+        self.state_dir = state_dir  # None: no write-behind journal
+        self.decrypt_engine_name = decrypt_engine
+        self.show_workers = show_workers
+        self.git_inspect = git_inspect
+        self.fetch_interval = fetch_interval
+        self.fetch_timeout = fetch_timeout
+        self.coalesce_commits = coalesce_commits
+        self.commit_idle_seconds = commit_idle_seconds
+        self.metadata_dir = metadata_dir  # None: no metadata index
+
+        self.write_lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._listing_index = None
+        self._decrypt_engine = None
+        self._git_inspector = None
+        self._commit_coalescer = None
+        self._metadata_index = None
+        self._fetch_lock = threading.Lock()
+        self._last_fetch_attempt = 0.0
+
+    # --- session ---
+
+    def open_session(self):
+        """
+        Starts a long-lived session: commits saves journaled by a session that crashed (even if
+        coalescing is now off) and, with `coalesce_commits`, starts deferring commits of new saves.
+        """
+        if self.state_dir is None:
+            return
+        journal_path = store_file(self.state_dir, "pending-commit", self.path)
+        coalescer = CommitCoalescer(self, journal_path, self.commit_idle_seconds)
+        self._flush_coalescer(coalescer)
+        if self.coalesce_commits:
+            self._commit_coalescer = coalescer
+
+    def close(self):
+        """Ends the session, committing any deferred saves and writing out the metadata index."""
+        coalescer, self._commit_coalescer = self._commit_coalescer, None
+        if coalescer is not None:
+            self._flush_coalescer(coalescer)
+        if self._metadata_index:
+            try:
+                self._metadata_index.flush()
+            except Exception as e:
+                print(f"Saving the metadata index failed: {error_message(e)}", file=sys.stderr)
+
+    def _flush_coalescer(self, coalescer):
+        with self.write_lock:
+            try:
+                coalescer.flush()
+            except Exception as e:
+                print(f"Deferred commit failed, kept in the journal: {error_message(e)}", file=sys.stderr)
+
+    def flush_pending_commits(self):
+        """Commits deferred saves before anything else touches git. Caller holds write_lock."""
+        if self._commit_coalescer is not None:
+            self._commit_coalescer.flush()
+
+    # --- listing ---
+
+    def listing_index(self):
+        """The store's listing index, shared by every listing of this store."""
+        with self._init_lock:
+            if self._listing_index is None:
+                cache_path = ListingIndex.default_cache_path(self.path, self.cache_dir) if self.cache_dir else None
+                self._listing_index = ListingIndex(self.path, cache_path)
+            return self._listing_index
+
+    def iter_list(self, rebuild=False):
+        """
+        Yields {"namespace", "resources"} per namespace, in namespace order, as the walk reaches it.
+        Only directories changed since the last listing are re-read; `rebuild` rescans everything.
+        A store that doesn't exist yet lists as empty.
+        """
+        if not os.path.isdir(self.path):
+            return
+        for namespace, resources in self.listing_index().iter_scan(rebuild=rebuild):
+            yield {"namespace": namespace, "resources": resources}
+
+    def list(self, rebuild=False):
+        """[{"namespace", "resources"}, ...] for the whole store."""
+        return list(self.iter_list(rebuild))
+
+    # --- reading ---
+
+    def secret_file(self, namespace, resource):
+        """Path of the .gpg file behind a secret, refusing names that would escape the store."""
+        store = os.path.join(os.path.abspath(self.path), "")
+        path = os.path.normpath(os.path.join(store, namespace, f"{resource}.gpg"))
+        if not path.startswith(store):
+            raise InvalidSecretName(f"'{namespace}/{resource}' is outside the password store.")
+        return path
+
+    def decrypt_engine(self):
+        """The configured decryption engine, or None when `pass show` should be used."""
+        with self._init_lock:
+            if self._decrypt_engine is None:
+                try:
+                    self._decrypt_engine = create_engine(self.decrypt_engine_name)
+                except EngineUnavailable as e:
+                    name = self.decrypt_engine_name
+                    print(f"Decryption engine '{name}' unavailable, using pass: {e}", file=sys.stderr)
+                if self._decrypt_engine is None:
+                    self._decrypt_engine = False
+            return self._decrypt_engine or None
+
+    def show(self, namespace, resource):
+        """Decrypts a secret with the configured engine, or `pass show`: [["secret", ...], [key, value], ...]."""
+        path = self.secret_file(namespace, resource)
+        secret_path = os.path.join(namespace, resource)
+        if not os.path.isfile(path):
+            raise SecretNotFound(f"Error: {secret_path} is not in the password store.")
+        stamp = file_stamp(path)  # Before decrypting: a concurrent write only makes the index entry look stale
+        data = None
+        engine = self.decrypt_engine()
+        if engine is not None:
+            try:
+                data = parse_secret(engine.decrypt_file(path))
+            except Exception:
+                pass  # `pass show` below reports the error the user would expect, or succeeds where we couldn't
+        if data is None:
+            data = parse_secret(run(["pass", "show", secret_path], capture_output=True, text=True).stdout)
+        self._index_metadata(namespace, resource, stamp, data)
+        return data
+
+    def show_many(self, items, workers=None):
+        """
+        Decrypts many {"namespace", "resource"} items on a pool of `workers` threads and yields one
+        result per secret as soon as it is decrypted, in completion order:
+        {"namespace", "resource", "status": "success", "data": [[key, value], ...]}
+        or {"namespace", "resource", "status": "error", "message": ...}.
+        Closing the generator drops what hasn't started and waits for running decryptions.
+        """
+        for item in items:
+            if not isinstance(item, dict) or "namespace" not in item or "resource" not in item:
+                raise InvalidSecretName("Every item needs a namespace and a resource.")
+        workers = max(1, min(int(workers or self.show_workers), MAX_WORKERS))
+
+        def show_one(item):
+            entry = {"namespace": item["namespace"], "resource": item["resource"]}
+            try:
+                entry.update(status="success", data=self.show(item["namespace"], item["resource"]))
+            except Exception as e:
+                entry.update(status="error", message=error_message(e))
+            return entry
+
+        pool = ThreadPoolExecutor(max_workers=workers)
+        futures = [pool.submit(show_one, item) for item in items]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+    # --- writing ---
+
+    def gpg_recipients(self, directory):
+        """
+        Key ids a secret in `directory` (relative to the store) is encrypted to, from the nearest .gpg-id
+        upwards, exactly like `pass`. $PASSWORD_STORE_KEY overrides the file.
+        """
+        if os.environ.get("PASSWORD_STORE_KEY"):
+            return os.environ["PASSWORD_STORE_KEY"].split()
+        if os.environ.get("PASSWORD_STORE_SIGNING_KEY"):
+            raise PassStoreError(
+                "Signed .gpg-id files are only verified by `pass insert`; unset PASSWORD_STORE_SIGNING_KEY."
+            )
+        store = os.path.abspath(self.path)
+        current = os.path.join(store, directory) if directory else store
+        while current != store and not os.path.isfile(os.path.join(current, ".gpg-id")):
+            current = os.path.dirname(current)
+        try:
+            with open(os.path.join(current, ".gpg-id"), "r", encoding="utf-8") as f:
+                recipients = [line.split("#", 1)[0].strip() for line in f]
+        except FileNotFoundError:
+            raise StoreNotInitialized("You must run `pass init` before you may use the password store.") from None
+        recipients = [recipient for recipient in recipients if recipient]
+        if not recipients:
+            raise StoreNotInitialized(f"{os.path.join(current, '.gpg-id')} lists no keys.")
+        return recipients
+
+    def write_secret(self, namespace, resource, content, engine, recipients_cache=None, force=True):
+        """
+        Encrypts `content` into the secret's .gpg file without committing it, and returns the path
+        relative to the store. The file is written next to its final name and renamed over it, so a
+        reader (or a crash) never sees a half-written secret.
+        """
+        path = self.secret_file(namespace, resource)
+        if not force and os.path.exists(path):
+            raise SecretExists(f"'{namespace}/{resource}' already exists.")
+        directory = os.path.dirname(path)
+        rel_directory = os.path.relpath(directory, os.path.abspath(self.path))
+        if recipients_cache is not None and rel_directory in recipients_cache:
+            recipients = recipients_cache[rel_directory]
+        else:
+            recipients = self.gpg_recipients(rel_directory)
+            if recipients_cache is not None:
+                recipients_cache[rel_directory] = recipients
+
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        os.close(fd)
+        try:
+            engine.encrypt_file(content, recipients, tmp_path)
+            os.replace(tmp_path, path)
+        except subprocess.CalledProcessError as e:
+            os.unlink(tmp_path)
+            raise CommandFailed(error_message(e) or "gpg failed to encrypt.", e.returncode) from None
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return os.path.relpath(path, os.path.abspath(self.path))
+
+    def git_commit(self, paths, message):
+        """
+        Stages `paths` (relative to the store) and commits them in one commit, if the store is a git
+        repository. Honors `pass.signcommits` like `pass` does. Returns the new commit id or None.
+        """
+        if not paths or not os.path.isdir(os.path.join(self.path, ".git")):
+            return None
+        git = ["git", "-C", self.path]
+        run(
+            [*git, "add", "-A", "--pathspec-from-file=-", "--pathspec-file-nul"],
+            input="\0".join(paths),
+            capture_output=True,
+            text=True,
+        )
+        if subprocess.run([*git, "diff", "--cached", "--quiet"], capture_output=True).returncode == 0:
+            return None  # Nothing actually changed
+        sign = subprocess.run([*git, "config", "--bool", "--get", "pass.signcommits"], capture_output=True, text=True)
+        commit = [*git, "commit", "-m", message]
+        if sign.stdout.strip() == "true":
+            commit.insert(3, "-S")
+        run(commit, capture_output=True, text=True)
+        return run([*git, "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+
+    def insert(self, namespace, resource, content):
+        """
+        Creates or overwrites a secret with `pass insert` and returns its "namespace/resource" path.
+        With write-behind commits the file is encrypted straight into the working tree and the
+        commit is left to the CommitCoalescer.
+        """
+        secret_path = os.path.join(namespace, resource)
+        self._check_new_name(namespace, resource)
+        with self.write_lock:
+            if self._commit_coalescer is not None:
+                path = os.path.relpath(self.secret_file(namespace, resource), os.path.abspath(self.path))
+                added = self._commit_coalescer.add(path)  # Before the write, so a crash during it can't lose it
+                try:
+                    self.write_secret(namespace, resource, content, GpgEngine())
+                except BaseException:
+                    if added:
+                        self._commit_coalescer.discard(path)
+                    raise
+            else:
+                run(["pass", "insert", "--multiline", secret_path], input=content, text=True)
+        path = self.secret_file(namespace, resource)
+        self._index_metadata(namespace, resource, file_stamp(path), parse_secret(content))
+        return secret_path
+
+    def _check_new_name(self, namespace, resource):
+        """Raises InvalidSecretName unless a secret may be written under this name (insert, import)."""
+        if not isinstance(namespace, str) or not isinstance(resource, str):
+            raise InvalidSecretName("Namespace and resource must be strings.")
+        if not namespace or not resource:
+            raise InvalidSecretName("Namespace and resource must not be empty.")
+        if "/" in resource or "'" in resource:
+            raise InvalidSecretName("Resource name cannot contain slashes.")
+        self.secret_file(namespace, resource)
+
+    def edit(self, namespace, resource):
+        """Opens a secret in `pass edit`, which runs $EDITOR."""
+        secret_path = os.path.join(namespace, resource)
+        self.secret_file(namespace, resource)
+        with self.write_lock:
+            self.flush_pending_commits()
+            run(["pass", "edit", secret_path])
+        self._drop_metadata(namespace, resource)  # We don't know what the editor wrote
+
+    def remove(self, namespace, resource):
+        """Deletes a secret with `pass rm --force`."""
+        secret_path = os.path.join(namespace, resource)
+        if not os.path.isfile(self.secret_file(namespace, resource)):
+            raise SecretNotFound(f"Error: {secret_path} is not in the password store.")
+        with self.write_lock:
+            self.flush_pending_commits()
+            run(["pass", "rm", "--force", secret_path])
+        self._drop_metadata(namespace, resource)
+
+    def import_secrets(self, records, force=False, workers=None):
+        """
+        Bulk import: encrypts {"namespace", "resource", "content"} records (any iterable, consumed
+        lazily) in parallel and records them all in a single git commit at the end. Existing secrets
+        are only overwritten with `force`. Yields {"event": "record", "index", "namespace",
+        "resource", "status", ...} per record as it completes, then {"event": "done", "imported",
+        "failed", "commit"}. A record may also be an InvalidRecord (an input line that couldn't be
+        decoded), which is reported as that record's error. Holds write_lock until the generator
+        finishes or is closed.
+        """
+        engine = GpgEngine()
+        workers = max(1, min(int(workers or self.show_workers), MAX_WORKERS))
+        recipients_cache = {}
+        written = []  # Appended to by the workers
+
+        def import_one(index, record):
+            entry = {"event": "record", "index": index}
+            try:
+                if isinstance(record, InvalidRecord):
+                    raise record
+                if not isinstance(record, dict):
+                    raise InvalidRecord("Record must be a JSON object.")
+                entry.update(namespace=record.get("namespace"), resource=record.get("resource"))
+                for field in ("namespace", "resource", "content"):
+                    if field not in record:
+                        raise InvalidSecretName(f"Missing field '{field}'.")
+                self._check_new_name(record["namespace"], record["resource"])
+                path = self.write_secret(
+                    record["namespace"], record["resource"], record["content"], engine, recipients_cache, force
+                )
+                written.append(path)
+                stamp = file_stamp(os.path.join(self.path, path))
+                self._index_metadata(record["namespace"], record["resource"], stamp, parse_secret(record["content"]))
+                entry.update(status="success", path=path)
+            except Exception as e:
+                entry.update(status="error", message=error_message(e))
+            return entry
+
+        def commit_written():
+            paths = sorted(written)
+            body = "\n".join(paths)
+            noun = "secret" if len(paths) == 1 else "secrets"
+            return self.git_commit(paths, f"Import {len(paths)} {noun} to store.\n\n{body}")
+
+        with self.write_lock:
+            pool = ThreadPoolExecutor(max_workers=workers)
+            in_flight = set()
+            failed = 0
+            finished = False
+            try:
+                # Records may come from a pipe of unknown length: keep only a couple of batches in flight.
+                for index, record in enumerate(records):
+                    in_flight.add(pool.submit(import_one, index, record))
+                    while len(in_flight) >= workers * 2:
+                        done = next(as_completed(in_flight))
+                        in_flight.discard(done)
+                        failed += done.result()["status"] == "error"
+                        yield done.result()
+                for future in as_completed(in_flight):
+                    failed += future.result()["status"] == "error"
+                    yield future.result()
+                pool.shutdown(wait=True)
+                finished = True
+                commit = commit_written()
+                yield {"event": "done", "imported": len(written), "failed": failed, "commit": commit}
+            finally:
+                if not finished:
+                    # Stopped early: still commit whatever already reached the working tree.
+                    for future in in_flight:
+                        future.cancel()
+                    pool.shutdown(wait=True)
+                    try:
+                        commit_written()
+                    except Exception as e:
+                        print(f"Import commit failed: {error_message(e)}", file=sys.stderr)
+
+    # --- metadata index ---
+
+    def metadata_index(self):
+        """The index of non-secret fields, or None when it is disabled or gpg can't be used."""
+        with self._init_lock:
+            if self._metadata_index is None:
+                self._metadata_index = False
+                if self.metadata_dir is not None:
+                    try:
+                        path = MetadataIndex.default_path(self.path, self.metadata_dir)
+                        recipients = functools.partial(self.gpg_recipients, "")
+                        self._metadata_index = MetadataIndex(self.path, path, GpgEngine(), recipients)
+                    except EngineUnavailable as e:
+                        print(f"Metadata index disabled: {e}", file=sys.stderr)
+            return self._metadata_index or None
+
+    def metadata(self):
+        """
+        The indexed fields (everything but the secret line and secret-looking fields) of every
+        secret seen so far: [{"namespace", "resource", "fields": [[key, value], ...]}, ...].
+        Empty when the index is disabled.
+        """
+        index = self.metadata_index()
+        return index.entries() if index is not None else []
+
+    def _index_metadata(self, namespace, resource, stamp, data):
+        index = self.metadata_index()
+        if index is None:
+            return
+        try:
+            index.update(namespace, resource, stamp, data)
+        except Exception as e:
+            # The index is only a search accelerator: never fail the operation that fed it.
+            print(f"Metadata index update failed: {error_message(e)}", file=sys.stderr)
+
+    def _drop_metadata(self, namespace, resource):
+        index = self.metadata_index()
+        if index is not None:
+            try:
+                index.remove(namespace, resource)
+            except Exception as e:
+                print(f"Metadata index update failed: {error_message(e)}", file=sys.stderr)
+
+    # --- git ---
+
+    def git_push(self):
+        """Pushes to the remote. Returns {"message", "output"}; raises CommandFailed."""
+        with self.write_lock:
+            self.flush_pending_commits()
+            try:
+                result = run(["pass", "git", "push"], capture_output=True, text=True)
+            except CommandFailed as e:
+                # Check if it's just "Everything up-to-date"
+                if "up-to-date" in e.stderr.lower() or "up-to-date" in e.stdout.lower():
+                    return {"message": "Already up to date.", "output": e.stderr + e.stdout}
+                raise
+        output = result.stdout.strip() + result.stderr.strip()
+        return {"message": "Successfully pushed to remote.", "output": output}
+
+    def git_pull(self):
+        """Pulls (rebasing) from the remote. Returns {"message", "output"}; raises CommandFailed."""
+        with self.write_lock:
+            self.flush_pending_commits()
+            try:
+                result = run(["pass", "git", "pull", "--rebase"], capture_output=True, text=True)
+            except CommandFailed as e:
+                # Check if it's just "Already up to date"
+                if "up to date" in e.stderr.lower() or "up to date" in e.stdout.lower():
+                    return {"message": "Already up to date.", "output": e.stderr + e.stdout}
+                raise
+        output = result.stdout.strip() + result.stderr.strip()
+        return {"message": "Successfully pulled from remote.", "output": output}
+
+    def _git(self, *args, timeout=None):
+        """Runs git on the store directly (what `pass git` ends up doing, minus the bash start-up)."""
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}  # Never hang on a credential prompt
+        return subprocess.run(["git", "-C", self.path, *args], capture_output=True, text=True, env=env, timeout=timeout)
+
+    def _inspect(self, question):
+        """Asks the in-process repository reader; _ASK_GIT means it can't answer and git must be run."""
+        if not self.git_inspect:
+            return _ASK_GIT
+        with self._init_lock:
+            if self._git_inspector is None:
+                self._git_inspector = GitInspector(self.path)
+        try:
+            return question(self._git_inspector)
+        except InspectUnsupported:
+            return _ASK_GIT
+        except Exception as e:
+            # Never let a reader bug turn into a wrong status: git itself is always the fallback.
+            print(f"git inspection failed, running git instead: {e!r}", file=sys.stderr)
+            return _ASK_GIT
+
+    def has_local_changes(self):
+        """Same answer as a non-empty `git status --porcelain`."""
+        answer = self._inspect(GitInspector.has_local_changes)
+        if answer is not _ASK_GIT:
+            return answer
+        result = self._git("status", "--porcelain")
+        if result.returncode != 0:
+            message = result.stderr.strip() or "git status failed."
+            raise CommandFailed(message, result.returncode, result.stdout, result.stderr)
+        return bool(result.stdout.strip())
+
+    def ahead_behind(self):
+        """(ahead, behind) of HEAD against its upstream, or None when there is no upstream."""
+        answer = self._inspect(GitInspector.ahead_behind)
+        if answer is not _ASK_GIT:
+            return answer
+        result = self._git("rev-list", "--left-right", "--count", "HEAD...@{u}")
+        counts = result.stdout.split()
+        if result.returncode != 0 or len(counts) != 2:
+            return None
+        return int(counts[0]), int(counts[1])
+
+    def last_fetch_time(self):
+        """When the remote-tracking refs were last refreshed: FETCH_HEAD is rewritten by every fetch/pull."""
+        git_dir = os.path.join(self.path, ".git")
+        if not os.path.isdir(git_dir):
+            git_dir = self._git("rev-parse", "--git-dir").stdout.strip()
+        try:
+            return os.stat(os.path.join(self.path, git_dir, "FETCH_HEAD")).st_mtime
+        except OSError:
+            return None
+
+    def fetch_if_due(self, mode="auto"):
+        """
+        Fetches unless the last fetch (or failed attempt) is younger than `fetch_interval` seconds.
+        mode is "auto", "force" or "never". Only one fetch runs at a time; a concurrent caller skips it.
+        Returns (fetched, error message or None).
+        """
+        if mode == "never":
+            return False, None
+        last_fetch = max(self.last_fetch_time() or 0, self._last_fetch_attempt)
+        if mode != "force" and time.time() - last_fetch < self.fetch_interval:
+            return False, None
+        if not self._fetch_lock.acquire(blocking=False):
+            return False, None  # Someone else is fetching right now
+        try:
+            self._last_fetch_attempt = time.time()
+            try:
+                result = self._git("fetch", "--quiet", timeout=self.fetch_timeout)
+            except subprocess.TimeoutExpired:
+                return False, "git fetch timed out"
+            if result.returncode != 0:
+                return False, (result.stderr.strip() or "git fetch failed").splitlines()[0]
+            return True, None
+        finally:
+            self._fetch_lock.release()
+
+    def git_status(self, fetch="auto"):
+        """
+        Local changes and distance to the upstream:
+        {"has_local_changes", "ahead", "behind", "has_remote", "needs_push", "needs_pull",
+         "fetched", "remote_age"[, "fetch_error"]}.
+        The working-tree check always runs; a fetch runs alongside it only when the remote-tracking
+        info is older than `fetch_interval` ("force" fetches anyway, "never" stays local).
+        "remote_age" tells how many seconds old the ahead/behind numbers are (None: never fetched).
+        Raises CommandFailed when the store is not a git repository.
+        """
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # Independent: the porcelain check doesn't care about remote refs, the fetch doesn't care about the index.
+            status_future = pool.submit(self.has_local_changes)
+            fetch_future = pool.submit(self.fetch_if_due, fetch)
+            has_local_changes = status_future.result()
+            fetched, fetch_error = fetch_future.result()
+
+        # Check if local is ahead/behind remote
+        counts = self.ahead_behind()
+        has_remote = counts is not None  # No upstream configured (or not fetched yet)
+        ahead, behind = counts or (0, 0)
+
+        last_fetch = self.last_fetch_time()
+        status_info = {
+            "has_local_changes": has_local_changes,
+            "ahead": ahead,
+            "behind": behind,
+            "has_remote": has_remote,
+            "needs_push": ahead > 0 or has_local_changes,
+            "needs_pull": behind > 0,
+            "fetched": fetched,
+            "remote_age": None if last_fetch is None else max(0, round(time.time() - last_fetch)),
+        }
+        if fetch_error:
+            status_info["fetch_error"] = fetch_error
+        return status_info
+
+    # --- watching ---
+
+    def watch(self):
+        """
+        Yields batches of listing deltas (added/removed/renamed entries) as the store changes on
+        disk, via inotify. An empty batch is an idle heartbeat that lets the caller stop watching.
+        """
+        if not os.path.isdir(self.path):
+            raise StoreNotInitialized(f"Password store {self.path} does not exist.")
+        watcher = StoreWatcher(self.path)
+        try:
+            yield from watcher.events()
+        finally:
+            watcher.close()
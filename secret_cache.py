@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SecretCache:
+    """
+    Short-lived in-memory cache of decrypted secrets ([[key, value], ...] as `show` returns them).
+
+    Every entry is tied to the stat stamp of the .gpg file it was decrypted from and is only served
+    while the file still has that stamp, for at most `ttl` seconds. At most `max_entries` secrets are
+    kept; the least recently used one goes first. Values are held in bytearrays that are zeroed
+    whenever an entry leaves the cache (expiry, eviction, invalidation or clear()), so plaintext
+    doesn't outlive its entry in the cache itself. Strings handed out by get() are copies that the
+    caller owns. Safe to use from several threads.
+    """
+
+    def __init__(self, ttl, max_entries, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (stamp, expires_at, [(bytearray key, bytearray value), ...])
+        self._lock = threading.Lock()
+        self._sweeper = None
+
+    def get(self, key, stamp):
+        """The cached secret for `key` if it was cached from a file with this `stamp` and hasn't expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != stamp or entry[1] <= self._clock():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return [[field.decode("utf-8"), value.decode("utf-8")] for field, value in entry[2]]
+
+    def put(self, key, stamp, data):
+        """Caches `data` for `key`, decrypted from a file with `stamp`, replacing any previous entry."""
+        fields = [(bytearray(field.encode("utf-8")), bytearray(value.encode("utf-8"))) for field, value in data]
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (stamp, self._clock() + self.ttl, fields)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+            if self._sweeper is None:
+                self._schedule_sweep(self.ttl)
+
+    def discard(self, key):
+        with self._lock:
+            self._drop(key)
+
+    def clear(self):
+        """Wipes and drops every entry (window hidden, screen locked, ...)."""
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+            if self._sweeper is not None:
+                self._sweeper.cancel()
+                self._sweeper = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for field, value in entry[2]:
+            field[:] = bytes(len(field))
+            value[:] = bytes(len(value))
+
+    def _schedule_sweep(self, delay):
+        # Expired entries are wiped by a timer too, not only when someone asks for them again.
+        self._sweeper = threading.Timer(max(delay, 0.0), self._sweep)
+        self._sweeper.daemon = True
+        self._sweeper.start()
+
+    def _sweep(self):
+        with self._lock:
+            self._sweeper = None
+            now = self._clock()
+            for key in [key for key, entry in self._entries.items() if entry[1] <= now]:
+                self._drop(key)
+            if self._entries:
+                self._schedule_sweep(min(entry[1] for entry in self._entries.values()) - now)
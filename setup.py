@@ -30,7 +30,17 @@ setup(
     py_modules=[
         'pass_client',
         'pass_backend',
+        'pass_store',
+        'secret_cache',
         'backend_utils',
+        'listing_index',
+        'metadata_index',
+        'fuzzy_matcher',
+        'ngram_index',
+        'listing_snapshot',
+        'gpg_engine',
+        'git_inspect',
+        'store_watcher',
         'ui_components',
         'ui_theme',
         'utils',
@@ -0,0 +1,246 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+
+from listing_index import read_directory
+
+# <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+# Events arriving this close together are folded into one batch, so an overwrite (delete + create)
+# nets out to nothing and a rename's two halves meet each other.
+SETTLE_SECONDS = 0.05
+
+
+class WatchError(Exception):
+    """Raised when inotify is unavailable or the store cannot be watched."""
+
+
+def _load_libc():
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise WatchError("inotify is not available on this platform.")
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+def _split_entry(rel_path):
+    """'ns/sub/res' -> ('ns', 'sub/res'); a bare 'ns' is the namespace itself (resource None)."""
+    namespace, _, resource = rel_path.partition("/")
+    return namespace, resource or None
+
+
+class StoreWatcher:
+    """
+    Recursively watches a password store with Linux inotify and reports what changed as deltas:
+    {"type": "added" | "removed", "namespace": ..., "resource": ...} and
+    {"type": "renamed", "namespace", "resource", "new_namespace", "new_resource"}.
+    A resource of None means the namespace directory itself. Hidden directories (.git) are not watched.
+    {"type": "resync"} means the kernel queue overflowed and the consumer should relist from scratch.
+    Directories named in an event are re-read and diffed against what the watcher last saw, so
+    the deltas reflect the store's actual state rather than raw event order.
+    """
+
+    def __init__(self, store_path):
+        self.store_path = store_path
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise WatchError(os.strerror(ctypes.get_errno()))
+        self._paths = {}  # wd -> set of relative dir paths ("" is the store root)
+        self._wds = {}  # relative dir path -> wd
+        self._contents = {}  # relative dir path -> (set of subdirs, set of secret names)
+        self._watch_tree("", [])
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def events(self, idle_timeout=1.0):
+        """
+        Yields lists of deltas as the store changes. Yields an empty list after `idle_timeout`
+        seconds without changes so the caller gets a chance to stop watching.
+        """
+        while self._fd >= 0:
+            readable, _, _ = select.select([self._fd], [], [], idle_timeout)
+            if not readable:
+                yield []
+                continue
+            raw_events = self._read_events()
+            # Let the rest of a burst (e.g. the second half of a rename) arrive before diffing.
+            while select.select([self._fd], [], [], SETTLE_SECONDS)[0]:
+                raw_events.extend(self._read_events())
+            yield self._process(raw_events)
+
+    def _read_events(self):
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset : offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            offset += length
+            events.append((wd, mask, cookie, name))
+        return events
+
+    def _process(self, raw_events):
+        if any(mask & IN_Q_OVERFLOW for _, mask, _, _ in raw_events):
+            self._reset()
+            return [{"type": "resync"}]
+
+        dirty = []
+        moves_from = {}
+        moves = []
+        for wd, mask, cookie, name in raw_events:
+            if mask & IN_IGNORED:
+                for rel_path in self._paths.pop(wd, ()):
+                    self._wds.pop(rel_path, None)
+                continue
+            for rel_path in self._paths.get(wd, ()):
+                if rel_path not in dirty:
+                    dirty.append(rel_path)
+                child = f"{rel_path}/{name}" if rel_path else name
+                if mask & IN_MOVED_FROM:
+                    moves_from[cookie] = (child, bool(mask & IN_ISDIR))
+                elif mask & IN_MOVED_TO and cookie in moves_from:
+                    moves.append((moves_from.pop(cookie), child))
+
+        added = []
+        removed = []
+        # Parents first, so a removed directory is forgotten before its own (now stale) children.
+        for rel_path in sorted(dirty, key=lambda p: p.count("/") if p else -1):
+            if rel_path in self._contents:
+                self._refresh(rel_path, added, removed)
+        return self._pair_renames(added, removed, moves)
+
+    def _pair_renames(self, added, removed, moves):
+        """Turns removed/added pairs that came from one rename into 'renamed' deltas."""
+        deltas = []
+        renamed_from = set()
+        renamed_to = set()
+        for (old_path, is_dir), new_path in moves:
+            if is_dir:
+                pairs = [
+                    (old, new_path + old[len(old_path) :])
+                    for old in removed
+                    if old == old_path or old.startswith(old_path + "/")
+                ]
+            else:
+                pairs = [(old_path[: -len(".gpg")], new_path[: -len(".gpg")])] if old_path.endswith(".gpg") else []
+            for old, new in pairs:
+                if old in removed and new in added and old not in renamed_from and new not in renamed_to:
+                    renamed_from.add(old)
+                    renamed_to.add(new)
+                    namespace, resource = _split_entry(old)
+                    new_namespace, new_resource = _split_entry(new)
+                    deltas.append(
+                        {
+                            "type": "renamed",
+                            "namespace": namespace,
+                            "resource": resource,
+                            "new_namespace": new_namespace,
+                            "new_resource": new_resource,
+                        }
+                    )
+        for kind, entries, skip in (("removed", removed, renamed_from), ("added", added, renamed_to)):
+            for rel_path in entries:
+                if rel_path not in skip:
+                    namespace, resource = _split_entry(rel_path)
+                    deltas.append({"type": kind, "namespace": namespace, "resource": resource})
+        return deltas
+
+    def _refresh(self, rel_path, added, removed):
+        """Re-reads one directory and records what appeared in / vanished from it."""
+        old_dirs, old_files = self._contents[rel_path]
+        try:
+            dirs, files = read_directory(self._abs(rel_path))
+        except OSError:
+            return  # The directory itself is gone; its parent's refresh forgets it
+        dirs, files = set(dirs), set(files)
+        self._contents[rel_path] = (dirs, files)
+        prefix = f"{rel_path}/" if rel_path else ""
+        if rel_path:  # Files in the store root belong to no namespace
+            added.extend(prefix + name for name in sorted(files - old_files))
+            removed.extend(prefix + name for name in sorted(old_files - files))
+        for name in sorted(old_dirs - dirs):
+            self._forget_tree(prefix + name, removed)
+        for name in sorted(dirs - old_dirs):
+            self._watch_tree(prefix + name, added)
+
+    def _watch_tree(self, rel_path, added, ancestors=None):
+        path = self._abs(rel_path)
+        try:
+            stat_result = os.stat(path)
+            identity = (stat_result.st_dev, stat_result.st_ino)
+            if ancestors and identity in ancestors:
+                return  # Symlink loop back into one of our own parents
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                if not rel_path:
+                    raise WatchError(f"Cannot watch {path}: {os.strerror(ctypes.get_errno())}")
+                return
+            dirs, files = read_directory(path)
+        except OSError:
+            return
+        # A directory reachable through two paths (symlinks) shares one wd.
+        self._paths.setdefault(wd, set()).add(rel_path)
+        self._wds[rel_path] = wd
+        self._contents[rel_path] = (set(dirs), set(files))
+        prefix = f"{rel_path}/" if rel_path else ""
+        if rel_path:  # Files in the store root belong to no namespace
+            if "/" not in rel_path:
+                added.append(rel_path)  # A new namespace
+            added.extend(prefix + name for name in sorted(files))
+        ancestors = (ancestors or set()) | {identity}
+        for name in dirs:
+            self._watch_tree(prefix + name, added, ancestors)
+
+    def _forget_tree(self, rel_path, removed):
+        contents = self._contents.pop(rel_path, None)
+        if contents is None:
+            return
+        dirs, files = contents
+        if "/" not in rel_path:
+            removed.append(rel_path)
+        removed.extend(f"{rel_path}/{name}" for name in sorted(files))
+        for name in sorted(dirs):
+            self._forget_tree(f"{rel_path}/{name}", removed)
+        wd = self._wds.pop(rel_path, None)
+        paths = self._paths.get(wd)
+        if paths is not None:
+            paths.discard(rel_path)
+            if not paths:
+                del self._paths[wd]
+                self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _reset(self):
+        for wd in list(self._paths):
+            self._libc.inotify_rm_watch(self._fd, wd)
+        self._paths.clear()
+        self._wds.clear()
+        self._contents.clear()
+        self._watch_tree("", [])
+
+    def _abs(self, rel_path):
+        return os.path.join(self.store_path, rel_path) if rel_path else self.store_path
@@ -0,0 +1,67 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from pass_store import PassStore
+
+
+@pytest.fixture
+def git_env(tmp_path, monkeypatch):
+    """
+    An empty HOME and a fixed identity, so neither git nor the code under test read the user's config.
+    Set in os.environ (for the code under test) and returned as a dict (for the test's own git calls).
+    """
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(home / ".config"))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for name in ("GIT_DIR", "GIT_WORK_TREE", "GIT_INDEX_FILE", "GIT_OBJECT_DIRECTORY"):
+        monkeypatch.delenv(name, raising=False)
+    for role in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{role}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{role}_EMAIL", "test@example.com")
+    return dict(os.environ)
+
+
+@pytest.fixture
+def gpg_key(tmp_path, monkeypatch):
+    """A throwaway GNUPGHOME holding one passphrase-less key; returns its fingerprint."""
+    if shutil.which("gpg") is None:
+        pytest.skip("gpg is not installed")
+    gnupghome = tmp_path / "gnupg"
+    gnupghome.mkdir(mode=0o700)
+    monkeypatch.setenv("GNUPGHOME", str(gnupghome))
+    monkeypatch.delenv("PASSWORD_STORE_KEY", raising=False)
+    monkeypatch.delenv("PASSWORD_STORE_SIGNING_KEY", raising=False)
+    gpg = ["gpg", "--batch", "--pinentry-mode", "loopback", "--passphrase", ""]
+    subprocess.run(
+        [*gpg, "--quick-gen-key", "Test <test@example.com>", "default", "default", "never"],
+        check=True,
+        capture_output=True,
+    )
+    listing = subprocess.run(["gpg", "--with-colons", "--list-keys"], check=True, capture_output=True, text=True)
+    fingerprint = next(line.split(":")[9] for line in listing.stdout.splitlines() if line.startswith("fpr:"))
+    yield fingerprint
+    subprocess.run(["gpgconf", "--kill", "gpg-agent"], capture_output=True)
+
+
+@pytest.fixture
+def store_path(tmp_path, git_env, gpg_key):
+    """An initialized store (.gpg-id committed to a git repository) encrypting to `gpg_key`."""
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    path = tmp_path / "store"
+    path.mkdir()
+    (path / ".gpg-id").write_text(f"{gpg_key}\n")
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    subprocess.run(["git", "-C", str(path), "add", ".gpg-id"], check=True)
+    subprocess.run(["git", "-C", str(path), "commit", "-q", "-m", "Init"], check=True)
+    return str(path)
+
+
+@pytest.fixture
+def store(store_path):
+    return PassStore(store_path)
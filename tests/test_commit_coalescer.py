@@ -0,0 +1,71 @@
+"""Write-behind commits: saves are journaled before they are written and committed by the next session."""
+
+import json
+import os
+import subprocess
+
+import pytest
+
+from listing_index import store_file, write_private_json
+from pass_store import PassStore
+
+
+@pytest.fixture
+def state_dir(tmp_path):
+    return str(tmp_path / "state")
+
+
+def coalescing_store(store_path, state_dir):
+    store = PassStore(store_path, state_dir=state_dir, coalesce_commits=True, commit_idle_seconds=3600)
+    store.open_session()
+    return store
+
+
+def journaled(store_path, state_dir):
+    try:
+        with open(store_file(state_dir, "pending-commit", store_path), "r", encoding="utf-8") as f:
+            return json.load(f)["paths"]
+    except FileNotFoundError:
+        return []
+
+
+def last_commit(store_path):
+    git = ["git", "-C", store_path, "log", "-1", "--name-only", "--format=%s"]
+    return subprocess.run(git, check=True, capture_output=True, text=True).stdout.split()
+
+
+def test_path_is_journaled_before_the_write(store_path, state_dir, monkeypatch):
+    store = coalescing_store(store_path, state_dir)
+    seen = []
+
+    def crash(namespace, resource, content, engine, *args):
+        seen.extend(journaled(store_path, state_dir))
+        raise RuntimeError("crashed mid-write")
+
+    monkeypatch.setattr(store, "write_secret", crash)
+    with pytest.raises(RuntimeError):
+        store.insert("web", "github", "secret\n")
+    assert seen == ["web/github.gpg"]
+    assert journaled(store_path, state_dir) == []  # The write failed: nothing left to commit
+
+
+def test_saves_are_committed_together_on_close(store_path, state_dir):
+    store = coalescing_store(store_path, state_dir)
+    store.insert("web", "github", "one\n")
+    store.insert("mail", "work", "two\n")
+    assert journaled(store_path, state_dir) == ["mail/work.gpg", "web/github.gpg"]
+    store.close()
+    assert last_commit(store_path)[:4] == ["Update", "2", "secrets", "in"]
+    assert journaled(store_path, state_dir) == []
+
+
+def test_next_session_commits_what_a_crash_left(store_path, state_dir):
+    os.makedirs(os.path.join(store_path, "web"))
+    with open(os.path.join(store_path, "web", "github.gpg"), "w") as f:
+        f.write("written before the crash")
+    journal = store_file(state_dir, "pending-commit", store_path)
+    write_private_json(journal, {"store": store_path, "paths": ["web/github.gpg", "web/never-written.gpg"]})
+
+    coalescing_store(store_path, state_dir).close()
+    assert last_commit(store_path) == ["Update", "1", "secret", "in", "store.", "web/github.gpg"]
+    assert journaled(store_path, state_dir) == []
@@ -0,0 +1,86 @@
+"""git-status fetches at most every `fetch_interval` seconds, judged by FETCH_HEAD, unless forced."""
+
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from pass_store import PassStore
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def git(env, repo, *args):
+    return subprocess.run(["git", "-C", str(repo), *args], env=env, check=True, capture_output=True, text=True).stdout
+
+
+def push_commit(env, clone, name):
+    (clone / name).write_text(name)
+    git(env, clone, "add", name)
+    git(env, clone, "commit", "-q", "-m", f"Add {name}")
+    git(env, clone, "push", "-q")
+
+
+@pytest.fixture
+def remote(tmp_path, git_env):
+    """A bare repository reachable as a file:// remote, with one commit on main."""
+    remote = tmp_path / "remote.git"
+    git(git_env, tmp_path, "init", "-q", "--bare", "-b", "main", str(remote))
+    seed = tmp_path / "seed"
+    git(git_env, tmp_path, "clone", "-q", remote.as_uri(), str(seed))
+    git(git_env, seed, "checkout", "-q", "-b", "main")
+    (seed / ".gpg-id").write_text("key\n")
+    git(git_env, seed, "add", ".gpg-id")
+    git(git_env, seed, "commit", "-q", "-m", "Init")
+    git(git_env, seed, "push", "-q", "-u", "origin", "main")
+    return remote
+
+
+@pytest.fixture
+def other_clone(tmp_path, git_env, remote):
+    """Someone else's clone, pushing commits the store hasn't fetched yet."""
+    clone = tmp_path / "other"
+    git(git_env, tmp_path, "clone", "-q", remote.as_uri(), str(clone))
+    return clone
+
+
+@pytest.fixture
+def store_dir(tmp_path, git_env, remote):
+    store = tmp_path / "store"
+    git(git_env, tmp_path, "clone", "-q", remote.as_uri(), str(store))
+    return store
+
+
+def test_second_status_within_the_interval_does_not_fetch(store_dir, other_clone, git_env):
+    store = PassStore(str(store_dir), fetch_interval=300)
+    first = store.git_status()
+    assert first["fetched"] and first["behind"] == 0
+
+    push_commit(git_env, other_clone, "new.gpg")
+    second = store.git_status()
+    assert not second["fetched"]
+    assert second["behind"] == 0  # Still the numbers of the first fetch
+    assert second["remote_age"] is not None and second["remote_age"] < 300
+
+
+def test_fresh_fetch_head_is_trusted_by_a_new_session(store_dir, other_clone, git_env):
+    PassStore(str(store_dir), fetch_interval=300).git_status()
+    push_commit(git_env, other_clone, "new.gpg")
+    assert not PassStore(str(store_dir), fetch_interval=300).git_status()["fetched"]
+
+    stale = time.time() - 600
+    os.utime(store_dir / ".git" / "FETCH_HEAD", (stale, stale))
+    status = PassStore(str(store_dir), fetch_interval=300).git_status()
+    assert status["fetched"] and status["behind"] == 1
+
+
+def test_forced_fetch_ignores_the_interval(store_dir, other_clone, git_env):
+    store = PassStore(str(store_dir), fetch_interval=300)
+    store.git_status()
+    push_commit(git_env, other_clone, "new.gpg")
+
+    status = store.git_status("force")
+    assert status["fetched"] and status["behind"] == 1
+    assert not store.git_status("never")["fetched"]
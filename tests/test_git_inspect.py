@@ -0,0 +1,128 @@
+"""GitInspector against git itself: the answers must match `git status` and `git rev-list`."""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from git_inspect import GitInspector
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def git(env, repo, *args):
+    return subprocess.run(["git", "-C", str(repo), *args], env=env, check=True, capture_output=True, text=True).stdout
+
+
+def commit(env, repo, name, content):
+    (repo / name).write_text(content)
+    git(env, repo, "add", name)
+    git(env, repo, "commit", "-q", "-m", f"Update {name}")
+
+
+@pytest.fixture
+def repo(tmp_path, git_env):
+    """A store cloned from a bare remote, with a couple of commits pushed and tracked upstream."""
+    remote = tmp_path / "remote.git"
+    git(git_env, tmp_path, "init", "-q", "--bare", "-b", "main", str(remote))
+    worktree = tmp_path / "store"
+    git(git_env, tmp_path, "clone", "-q", str(remote), str(worktree))
+    git(git_env, worktree, "checkout", "-q", "-b", "main")
+    (worktree / "web").mkdir()
+    commit(git_env, worktree, "web/github.gpg", "first")
+    commit(git_env, worktree, ".gpg-id", "key")
+    git(git_env, worktree, "push", "-q", "-u", "origin", "main")
+    return worktree
+
+
+def expected_changes(env, repo):
+    return bool(git(env, repo, "status", "--porcelain").strip())
+
+
+def expected_apart(env, repo):
+    try:
+        ahead, behind = git(env, repo, "rev-list", "--left-right", "--count", "HEAD...@{u}").split()
+    except subprocess.CalledProcessError:
+        return None
+    return int(ahead), int(behind)
+
+
+def check(env, repo):
+    # The inspector goes first: `git status` refreshes the index, which would hide racy entries.
+    inspector = GitInspector(str(repo))
+    changes, apart = inspector.has_local_changes(), inspector.ahead_behind()
+    assert changes == expected_changes(env, repo)
+    assert apart == expected_apart(env, repo)
+    return changes, apart
+
+
+def test_clean(repo, git_env):
+    assert check(git_env, repo) == (False, (0, 0))
+
+
+def untracked(env, repo):
+    (repo / "web" / "new.gpg").write_text("new")
+
+
+def staged(env, repo):
+    untracked(env, repo)
+    git(env, repo, "add", "web/new.gpg")
+
+
+def modified(env, repo):
+    (repo / "web" / "github.gpg").write_text("second")
+
+
+def modified_same_size(env, repo):
+    (repo / "web" / "github.gpg").write_text("FIRST")
+
+
+def chmodded(env, repo):
+    os.chmod(repo / "web" / "github.gpg", 0o755)
+
+
+def deleted(env, repo):
+    (repo / "web" / "github.gpg").unlink()
+
+
+@pytest.mark.parametrize("change", [untracked, staged, modified, modified_same_size, chmodded, deleted])
+def test_local_changes(repo, git_env, change):
+    change(git_env, repo)
+    assert check(git_env, repo)[0] is True
+
+
+@pytest.mark.parametrize("change", [None, modified, deleted])
+def test_after_gc(repo, git_env, change):
+    commit(git_env, repo, "web/mail.gpg", "mail")
+    git(git_env, repo, "gc", "-q", "--prune=now")
+    assert not list((repo / ".git" / "refs" / "heads").iterdir())  # Refs are packed too
+    if change is not None:
+        change(git_env, repo)
+    changes, apart = check(git_env, repo)
+    assert changes is (change is not None)
+    assert apart == (1, 0)
+
+
+def test_detached_head(repo, git_env):
+    commit(git_env, repo, "web/mail.gpg", "mail")
+    git(git_env, repo, "checkout", "-q", "--detach")
+    assert check(git_env, repo) == (False, None)
+
+
+def test_no_upstream(repo, git_env):
+    git(git_env, repo, "checkout", "-q", "-b", "local-only")
+    assert check(git_env, repo) == (False, None)
+
+
+def test_diverged(tmp_path, repo, git_env):
+    other = tmp_path / "other"
+    git(git_env, tmp_path, "clone", "-q", str(tmp_path / "remote.git"), str(other))
+    commit(git_env, other, "web/remote.gpg", "remote")
+    commit(git_env, other, "web/remote2.gpg", "remote")
+    git(git_env, other, "push", "-q", "origin", "main")
+    commit(git_env, repo, "web/local.gpg", "local")
+    git(git_env, repo, "fetch", "-q")
+    assert check(git_env, repo) == (False, (1, 2))
+    git(git_env, repo, "gc", "-q", "--prune=now")
+    assert check(git_env, repo) == (False, (1, 2))
@@ -0,0 +1,39 @@
+"""Bulk import: per-record events, and one commit for whatever reached the store."""
+
+import io
+import json
+import subprocess
+
+from pass_backend import read_records
+
+
+def records(*lines):
+    return read_records(io.StringIO("".join(f"{line}\n" for line in lines)))
+
+
+def test_undecodable_line_is_a_record_error(store):
+    good = [json.dumps({"namespace": "web", "resource": name, "content": f"{name}-secret\n"}) for name in "abc"]
+    events = list(store.import_secrets(records(good[0], good[1], "{not json", good[2]), workers=1))
+
+    by_index = {event["index"]: event for event in events if event["event"] == "record"}
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert [by_index[index]["status"] for index in (0, 1, 3)] == ["success"] * 3
+    assert by_index[2]["status"] == "error"
+    assert by_index[2]["message"].startswith("Invalid JSON:")
+    done = events[-1]
+    assert (done["event"], done["imported"], done["failed"]) == ("done", 3, 1)
+
+    git = ["git", "-C", store.path, "show", "--name-only", "--format=%s", done["commit"]]
+    subject, *paths = subprocess.run(git, check=True, capture_output=True, text=True).stdout.split("\n\n", 1)
+    assert subject == "Import 3 secrets to store."
+    assert sorted(paths[0].split()) == ["web/a.gpg", "web/b.gpg", "web/c.gpg"]
+
+    status = subprocess.run(["git", "-C", store.path, "status", "--porcelain"], check=True, capture_output=True)
+    assert status.stdout == b""
+
+
+def test_record_that_is_not_an_object(store):
+    events = list(store.import_secrets(records("[1, 2]")))
+    assert events[0]["status"] == "error"
+    assert events[0]["message"] == "Record must be a JSON object."
+    assert events[-1]["imported"] == 0 and events[-1]["commit"] is None
@@ -0,0 +1,20 @@
+"""Which fields of a secret the metadata index keeps for search."""
+
+import pytest
+
+from metadata_index import metadata_fields
+
+
+@pytest.mark.parametrize(
+    "key",
+    ["password", "Password", "PIN", "otpauth", "api_key", "apiKey", "API_KEY", "secret-question", "totp", "cvv"],
+)
+def test_secret_fields_are_dropped(key):
+    assert metadata_fields([["secret", "s3cret"], [key, "value"]]) == []
+
+
+@pytest.mark.parametrize(
+    "key", ["shipping", "keyboard layout", "passport", "monkey", "username", "url", "e-mail", "spinner"]
+)
+def test_fields_that_only_contain_a_secret_word_are_kept(key):
+    assert metadata_fields([["secret", "s3cret"], [key, "value"]]) == [[key, "value"]]